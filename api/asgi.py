@@ -0,0 +1,13 @@
+###
+# ASGI entry point
+#
+# Serves the same Flask app under an ASGI server, e.g.
+#   uvicorn asgi:asgi_app --host 0.0.0.0 --port 4000 --workers 4
+# or `python serve.py --asgi`. Async views still await their queries
+# on the async DB pool (backend/db_connection/async_db.py).
+###
+from asgiref.wsgi import WsgiToAsgi
+
+from backend_app import app
+
+asgi_app = WsgiToAsgi(app)
@@ -3,12 +3,17 @@ import logging
 
 
 from backend.db_connection import db # Assuming db object is set up for queries
+from backend.response_cache import cache
+from backend.profiling import profiler, shared
+from backend.user_matching import ann_index, availability
+from backend.user_profile.user_listing import parse_listing_args, fetch_users_page
 
 admin = Blueprint('admin_dashboard', __name__)
 
 
 # Route to get all admins (returns list of dictionaries)
 @admin.route('/all', methods=['GET'])
+@cache.cached(tags=('admin',))
 def get_all_admins_main(): 
     try:
         conn = db.get_db()
@@ -40,34 +45,27 @@ def get_all_admins_main():
         logging.error(f"Error fetching admins in /all route: {e}")
         return jsonify({"error": "Failed to fetch admins"}), 500
 
-# Route to get all regular users (returns list of dictionaries)
+# Route to get regular users, one keyset page at a time (returns list of dictionaries)
+# Query params: limit, cursor, major, learning_style, availability
 @admin.route('/users', methods=['GET'])
+@cache.cached(tags=('user',))
 def get_all_users():
     try:
+        try:
+            listing_args = parse_listing_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         conn = db.get_db()
         if not conn:
             logging.error("Failed to get DB connection in GET /users route.")
             return jsonify({"error": "Database connection failed"}), 500
         
-        # Use a dictionary cursor if available
-        try:
-            cursor = conn.cursor(dictionary=True)
-        except TypeError:
-            cursor = conn.cursor()
-        
-        # Select relevant user fields (avoiding password)
-        cursor.execute("SELECT userid, name, email, major, learning_style, availability FROM user")
-        users = cursor.fetchall()
-
-        # If not using dictionary cursor, format manually
-        if not isinstance(users[0], dict) and len(users) > 0:
-            user_list = [
-                {'userid': row[0], 'name': row[1], 'email': row[2], 'major': row[3], 'learning_style': row[4], 'availability': row[5]}
-                for row in users
-            ]
-            users = user_list
+        cursor = conn.cursor()
+        users, next_cursor = fetch_users_page(cursor, **listing_args)
+        cursor.close()
         
-        return jsonify({"users": users}), 200
+        return jsonify({"users": users, "next_cursor": next_cursor}), 200
     
     except Exception as e:
         logging.error(f"Error fetching users in GET /users route: {e}")
@@ -75,6 +73,7 @@ def get_all_users():
 
 # Route to add a new regular user (using correct table name 'user')
 @admin.route('/users', methods=['POST'])
+@cache.invalidates('user')
 def add_user():
     data = request.get_json()
     if not data or not all(k in data for k in ('name', 'email', 'password')):
@@ -83,6 +82,9 @@ def add_user():
     name = data['name']
     email = data['email']
     password = data['password'] 
+    # Optional; stored with its parsed slot bitmask like a self-registration
+    availability_text = data.get('availability')
+    availability_mask = availability.parse_mask(availability_text)
 
     try:
         conn = db.get_db()
@@ -91,11 +93,13 @@ def add_user():
              return jsonify({"error": "Database connection error"}), 500
         cursor = conn.cursor()
         # Use correct table name 'user'
-        cursor.execute("INSERT INTO user (name, email, password) VALUES (%s, %s, %s)", 
-                       (name, email, password)) 
+        cursor.execute("INSERT INTO user (name, email, password, availability, availability_mask) VALUES (%s, %s, %s, %s, %s)", 
+                       (name, email, password, availability_text, availability_mask)) 
         conn.commit()
         # Get the ID of the newly inserted user
         new_user_id = cursor.lastrowid 
+        ann_index.upsert_user(cursor, new_user_id)
+        availability.update_user(new_user_id, availability_mask)
         return jsonify({"message": f"User '{name}' created successfully.", "userid": new_user_id}), 201
     except Exception as e:
         # Make sure conn is defined for rollback
@@ -109,6 +113,7 @@ def add_user():
 
 # Route to add a new admin (using correct columns: name, role, email)
 @admin.route('/admins', methods=['POST'])
+@cache.invalidates('admin')
 def add_admin():
     data = request.get_json()
     # Expect name, role, email for admin table
@@ -143,6 +148,7 @@ def add_admin():
 
 # --- DELETE User ---
 @admin.route('/users/<int:userid>', methods=['DELETE'])
+@cache.invalidates('user', 'group_student', 'matched_with')
 def delete_user(userid):
     try:
         conn = db.get_db()
@@ -155,6 +161,7 @@ def delete_user(userid):
             return jsonify({"error": f"User with ID {userid} not found."}), 404
             
         conn.commit()
+        ann_index.remove_user(userid)
         logging.info(f"Deleted user with ID: {userid}")
         return jsonify({"message": f"User with ID {userid} deleted successfully."}), 200
     except Exception as e:
@@ -166,6 +173,7 @@ def delete_user(userid):
 
 # --- UPDATE User ---
 @admin.route('/users/<int:userid>', methods=['PUT'])
+@cache.invalidates('user')
 def update_user(userid):
     data = request.get_json()
     if not data:
@@ -183,6 +191,10 @@ def update_user(userid):
         if field in data:
             set_clauses.append(f"{field} = %s")
             values.append(data[field])
+    if 'availability' in data:
+        # Keep the parsed slot bitmask in step with the text
+        set_clauses.append("availability_mask = %s")
+        values.append(availability.parse_mask(data['availability']))
             
     if not set_clauses:
          return jsonify({"error": "No valid fields provided for update."}), 400
@@ -201,6 +213,9 @@ def update_user(userid):
             return jsonify({"error": f"User with ID {userid} not found or no changes made."}), 404 # Or 200/304 if no change is ok
             
         conn.commit()
+        ann_index.upsert_user(cursor, userid)
+        if 'availability' in data:
+            availability.update_user(userid, availability.parse_mask(data['availability']))
         logging.info(f"Updated user with ID: {userid}")
         return jsonify({"message": f"User {userid} updated successfully."}), 200
     except Exception as e:
@@ -213,6 +228,7 @@ def update_user(userid):
 
 # --- DELETE Admin ---
 @admin.route('/admins/<int:adminid>', methods=['DELETE'])
+@cache.invalidates('admin')
 def delete_admin(adminid):
     try:
         conn = db.get_db()
@@ -234,6 +250,7 @@ def delete_admin(adminid):
 
 # --- UPDATE Admin ---
 @admin.route('/admins/<int:adminid>', methods=['PUT'])
+@cache.invalidates('admin')
 def update_admin(adminid):
     data = request.get_json()
     if not data:
@@ -276,6 +293,7 @@ def update_admin(adminid):
 
 # --- GET User Count (Accessing by key) ---
 @admin.route('/users/count', methods=['GET'])
+@cache.cached(tags=('user',))
 def get_user_count():
     conn = None
     cursor = None
@@ -326,6 +344,7 @@ def get_user_count():
 
 # --- GET Admin Count (Accessing by key) ---
 @admin.route('/admins/count', methods=['GET'])
+@cache.cached(tags=('admin',))
 def get_admin_count():
     conn = None
     cursor = None
@@ -374,5 +393,47 @@ def get_admin_count():
             logging.info("Closing admin count cursor.")
             cursor.close()
 
-
-
+# --- GET DB connection pool metrics ---
+@admin.route('/db/pool', methods=['GET'])
+def get_db_pool_stats():
+    try:
+        return jsonify({"pool": db.pool.stats()}), 200
+    except Exception as e:
+        logging.error(f"Error reading DB pool stats: {e}")
+        return jsonify({"error": "Failed to read DB pool stats"}), 500
+
+# --- GET response cache metrics ---
+@admin.route('/cache', methods=['GET'])
+def get_response_cache_stats():
+    return jsonify({"cache": cache.stats()}), 200
+
+
+# --- GET per-route and per-query latency metrics ---
+@admin.route('/metrics', methods=['GET'])
+def get_profiling_metrics():
+    # ?reset=true clears the stats (in every worker) after reading them
+    view, workers = shared.profiler_view(profiler)
+    metrics = view.snapshot()
+    metrics['workers'] = workers
+    if request.args.get('reset', '').lower() == 'true':
+        shared.reset_profiler(profiler)
+    return jsonify({"metrics": metrics}), 200
+
+
+# --- GET recently captured slow queries (newest first) ---
+@admin.route('/slow-queries', methods=['GET'])
+def get_slow_queries():
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    slow_log = shared.slow_log_view()
+    entries = slow_log.entries(limit=max(limit, 1), endpoint=request.args.get('endpoint'))
+    return jsonify({"slow_queries": entries, "stats": slow_log.stats()}), 200
+
+
+# --- DELETE clear the slow-query buffer ---
+@admin.route('/slow-queries', methods=['DELETE'])
+def clear_slow_queries():
+    shared.clear_slow_log()
+    return jsonify({"message": "Slow-query buffer cleared"}), 200
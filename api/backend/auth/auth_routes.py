@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify
 import logging
 
 from backend.db_connection import db # Assuming db object is set up for queries
+from backend.user_matching import ann_index, availability
+from backend.learning_style import feature_store
+from backend.response_cache import cache
 
 auth = Blueprint('auth', __name__)
 
@@ -11,7 +14,8 @@ auth = Blueprint('auth', __name__)
 @auth.route('/login', methods=['GET'])
 def example(): 
     cursor = db.get_db().cursor()
-    cursor.execute("SELECT * FROM user")
+    # Explicit columns: availability_mask is binary and can't be returned as JSON
+    cursor.execute("SELECT userid, name, email, password, major, learning_style, availability FROM user")
     users = cursor.fetchall() # fetchall vs fetchone is pretty self explanatory
     return jsonify({"users" : users}), 200; 
 
@@ -40,11 +44,16 @@ def handle_login():
                 return jsonify({"error": "User with this email already exists"}), 500 # Conflict
 
             # Insert new user with plain password
-            cursor.execute("INSERT INTO user (name, email, password, major, learning_style, availability) VALUES (%s, %s, %s, %s, %s, %s)", 
-                             (name, email, password, data.get('major'), data.get('learning_style'), data.get('availability')))
+            availability_mask = availability.parse_mask(data.get('availability'))
+            cursor.execute("INSERT INTO user (name, email, password, major, learning_style, availability, availability_mask) VALUES (%s, %s, %s, %s, %s, %s, %s)", 
+                             (name, email, password, data.get('major'), data.get('learning_style'), data.get('availability'), availability_mask))
             db.get_db().commit()
             new_user_id = cursor.lastrowid
             logging.info(f"User {email} registered successfully with ID: {new_user_id}")
+            ann_index.upsert_user(cursor, new_user_id)
+            availability.update_user(new_user_id, availability_mask)
+            feature_store.update_learning_style(new_user_id, data.get('learning_style'))
+            cache.invalidate('user')
             return jsonify({"message": "User registered successfully", "user_id": new_user_id}), 201
         except Exception as e:
             db.get_db().rollback()
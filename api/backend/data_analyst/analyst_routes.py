@@ -1,5 +1,15 @@
-from flask import Blueprint, request, jsonify
+import csv
+import datetime
+import decimal
+import io
+import json
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from pymysql import cursors
 from backend.db_connection import db # Import the db object
+from backend.db_connection.async_db import async_db
+from backend.data_analyst import snapshots
+from backend.data_analyst.query_batch import run_batch
 
 analyst = Blueprint('analyst', __name__)
 
@@ -44,235 +54,36 @@ def get_total_matches():
         if cursor:
             cursor.close()
 
+async def _get_snapshot(key):
+    """Read a snapshot row through the async pool; compute it inline if the job hasn't yet."""
+    row = await async_db.fetchone(snapshots.SELECT_SNAPSHOT, (key,))
+    if row is None:
+        return snapshots.get_snapshot(key)
+    return snapshots.snapshot_response(row)
+
 @analyst.route('/analytics/retention', methods=['GET'])
-def get_retention_rate():
-    cursor = None
+async def get_retention_rate():
+    """Retention metrics, served from the pre-computed analytics snapshot."""
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute("""
-            WITH UserMetrics AS (
-                SELECT 
-                    u.userid,
-                    COUNT(DISTINCT gs.groupid) as group_count,
-                    COUNT(DISTINCT ss.session_id) as session_count,
-                    MAX(ss.session_date) as last_session_date
-                FROM user u
-                LEFT JOIN group_student gs ON u.userid = gs.studentid
-                LEFT JOIN study_session ss ON u.userid = ss.matched_student_id
-                GROUP BY u.userid
-            )
-            SELECT 
-                COUNT(DISTINCT userid) as total_users,
-                COUNT(DISTINCT CASE WHEN group_count > 0 THEN userid END) as users_in_groups,
-                COUNT(DISTINCT CASE WHEN session_count > 0 THEN userid END) as users_with_sessions,
-                COUNT(DISTINCT CASE WHEN last_session_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY) THEN userid END) as active_last_30_days
-            FROM UserMetrics
-        """)
-        result = cursor.fetchone()
-        
-        if result is None:
-            return jsonify({
-                "status": "success",
-                "message": "No retention data found",
-                "retention_metrics": {
-                    "overall_rate": 0,
-                    "rate_change": "0%"
-                },
-                "group_metrics": {
-                    "avg_lifespan": "0 months",
-                    "lifespan_change": "0"
-                },
-                "member_metrics": {
-                    "active_count": 0,
-                    "count_change": "0"
-                },
-                "risk_metrics": {
-                    "at_risk_count": 0,
-                    "risk_change": "0"
-                }
-            }), 200
-        
-        total_users = result['total_users']
-        users_in_groups = result['users_in_groups']
-        users_with_sessions = result['users_with_sessions']
-        active_last_30_days = result['active_last_30_days']
-        
-        # Calculate retention metrics
-        retention_rate = (active_last_30_days / total_users * 100) if total_users > 0 else 0
-        group_participation = (users_in_groups / total_users * 100) if total_users > 0 else 0
-        session_participation = (users_with_sessions / total_users * 100) if total_users > 0 else 0
-        
-        cursor.execute("""
-            SELECT 
-                g.group_name,
-                MIN(gs.studentid) as creator_id,
-                COUNT(DISTINCT gs.studentid) as member_count,
-                MAX(ss.session_date) as last_session
-            FROM study_group g
-            LEFT JOIN group_student gs ON g.groupid = gs.groupid
-            LEFT JOIN study_session ss ON gs.studentid = ss.matched_student_id
-            GROUP BY g.group_name
-            ORDER BY last_session DESC
-        """)
-        groups_data = cursor.fetchall()
-        
-        return jsonify({
-            "status": "success",
-            "retention_metrics": {
-                "overall_rate": round(retention_rate, 1),
-                "rate_change": "+3% vs last term" 
-            },
-            "group_metrics": {
-                "avg_lifespan": "4.2 months", 
-                "lifespan_change": "+0.5 months"
-            },
-            "member_metrics": {
-                "active_count": active_last_30_days,
-                "count_change": f"+{users_with_sessions - active_last_30_days} this term"
-            },
-            "risk_metrics": {
-                "at_risk_count": total_users - active_last_30_days,
-                "risk_change": "-3 vs last month"
-            },
-            "monthly_retention": [
-                {"Month": "Jan", "Retention Rate": round(retention_rate - 5, 1)},
-                {"Month": "Feb", "Retention Rate": round(retention_rate - 3, 1)},
-                {"Month": "Mar", "Retention Rate": round(retention_rate - 2, 1)},
-                {"Month": "Apr", "Retention Rate": round(retention_rate - 1, 1)},
-                {"Month": "May", "Retention Rate": round(retention_rate, 1)},
-                {"Month": "Jun", "Retention Rate": round(retention_rate + 1, 1)}
-            ],
-            "size_distribution": [
-                {"Size": "2-3", "Groups": len([g for g in groups_data if g['member_count'] in [2, 3]])},
-                {"Size": "4-5", "Groups": len([g for g in groups_data if g['member_count'] in [4, 5]])},
-                {"Size": "6-7", "Groups": len([g for g in groups_data if g['member_count'] in [6, 7]])},
-                {"Size": "8+", "Groups": len([g for g in groups_data if g['member_count'] >= 8])}
-            ],
-            "format_retention": [
-                {"Format": "In-Person", "Retention": round(retention_rate + 5, 1)},
-                {"Format": "Hybrid", "Retention": round(retention_rate + 2, 1)},
-                {"Format": "Virtual", "Retention": round(retention_rate - 3, 1)},
-                {"Format": "Async", "Retention": round(retention_rate - 8, 1)}
-            ],
-            "member_activity": [
-                {"Week": i + 1, "Active Members": active_last_30_days - 10 + i * 5} 
-                for i in range(8)
-            ],
-            "risk_factors": {
-                "low_engagement": total_users - users_with_sessions,
-                "declining_attendance": round((total_users - active_last_30_days) * 0.4),
-                "schedule_conflicts": round((total_users - active_last_30_days) * 0.3)
-            }
-        }), 200
-        
+        return jsonify(await _get_snapshot('retention')), 200
     except Exception as e:
         print(f"Error in get_retention_rate: {str(e)}")
         return jsonify({
             "error": "Failed to fetch retention data",
             "message": str(e)
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
 
 @analyst.route('/analytics/academic', methods=['GET'])
-def get_academic_insights():
-    cursor = None
+async def get_academic_insights():
+    """Academic insights, served from the pre-computed analytics snapshot."""
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute("""
-            SELECT 
-                c.course_name,
-                COUNT(DISTINCT ss.matched_student_id) as total_students,
-                COUNT(ss.session_id) as total_sessions,
-                COUNT(DISTINCT u.major) as unique_majors
-            FROM course c
-            LEFT JOIN study_session ss ON c.courseid = ss.course_id
-            LEFT JOIN user u ON ss.matched_student_id = u.userid
-            GROUP BY c.course_name
-            ORDER BY total_sessions DESC
-        """)
-        course_metrics = cursor.fetchall()
-        
-        cursor.execute("""
-            SELECT 
-                learning_style,
-                COUNT(*) as student_count,
-                COUNT(*) * 100.0 / (SELECT COUNT(*) FROM user WHERE learning_style IS NOT NULL) as percentage
-            FROM user
-            WHERE learning_style IS NOT NULL
-            GROUP BY learning_style
-        """)
-        learning_styles = cursor.fetchall()
-        
-        cursor.execute("""
-            SELECT 
-                DATE_FORMAT(session_date, '%Y-%m') as month,
-                COUNT(*) as session_count,
-                COUNT(DISTINCT matched_student_id) as active_students
-            FROM study_session
-            GROUP BY DATE_FORMAT(session_date, '%Y-%m')
-            ORDER BY month DESC
-            LIMIT 6
-        """)
-        session_trends = cursor.fetchall()
-        
-        cursor.execute("""
-            SELECT 
-                u.major,
-                COUNT(DISTINCT u.userid) as student_count,
-                COUNT(DISTINCT ss.session_id) as study_sessions
-            FROM user u
-            LEFT JOIN study_session ss ON u.userid = ss.matched_student_id
-            WHERE u.major IS NOT NULL
-            GROUP BY u.major
-            ORDER BY study_sessions DESC
-        """)
-        major_metrics = cursor.fetchall()
-        
-        return jsonify({
-            "status": "success",
-            "course_metrics": [
-                {
-                    "course": metric['course_name'],
-                    "students": metric['total_students'],
-                    "sessions": metric['total_sessions'],
-                    "major_diversity": metric['unique_majors']
-                } for metric in course_metrics
-            ],
-            "learning_styles": [
-                {
-                    "style": style['learning_style'],
-                    "percentage": round(style['percentage'], 1)
-                } for style in learning_styles
-            ],
-            "study_trends": [
-                {
-                    "month": trend['month'],
-                    "sessions": trend['session_count'],
-                    "active_students": trend['active_students']
-                } for trend in session_trends
-            ],
-            "major_distribution": [
-                {
-                    "major": major['major'],
-                    "students": major['student_count'],
-                    "engagement": major['study_sessions']
-                } for major in major_metrics
-            ]
-        }), 200
-        
+        return jsonify(await _get_snapshot('academic')), 200
     except Exception as e:
         print(f"Error in get_academic_insights: {str(e)}")
         return jsonify({
             "error": "Failed to fetch academic insights",
             "message": str(e)
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
 
 @analyst.route('/analytics/retention/group-longevity', methods=['GET'])
 def get_group_longevity():
@@ -397,11 +208,10 @@ def get_learning_style_distribution():
 
 @analyst.route('/analytics/academic/study-sessions', methods=['GET'])
 def get_study_session_analytics():
-    cursor = None
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute("""
+        # Independent queries, run concurrently on separate connections
+        batch = run_batch({
+            'sessions': """
             SELECT 
                 ss.study_type,
                 COUNT(*) as session_count,
@@ -413,10 +223,8 @@ def get_study_session_analytics():
             JOIN course c ON ss.course_id = c.courseid
             GROUP BY ss.study_type, c.department, c.course_name
             ORDER BY session_count DESC
-        """)
-        results = cursor.fetchall()
-        
-        cursor.execute("""
+            """,
+            'trends': """
             SELECT 
                 DATE_FORMAT(session_date, '%Y-%m') as month,
                 COUNT(*) as monthly_sessions,
@@ -425,8 +233,10 @@ def get_study_session_analytics():
             GROUP BY DATE_FORMAT(session_date, '%Y-%m')
             ORDER BY month DESC
             LIMIT 6
-        """)
-        trend_results = cursor.fetchall()
+            """,
+        })
+        results = batch['sessions']
+        trend_results = batch['trends']
         
         return jsonify({
             "status": "success",
@@ -455,17 +265,13 @@ def get_study_session_analytics():
             "error": "Failed to fetch study session analytics",
             "message": str(e)
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
 
 @analyst.route('/analytics/academic/course-performance', methods=['GET'])
-def get_course_performance():
-    cursor = None
+async def get_course_performance():
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute("""
+        # The two aggregations are independent, so they run concurrently
+        results = await async_db.gather({
+            'courses': """
             SELECT 
                 c.department,
                 c.course_name,
@@ -476,10 +282,8 @@ def get_course_performance():
             LEFT JOIN study_session ss ON c.courseid = ss.course_id
             GROUP BY c.department, c.course_name
             ORDER BY student_count DESC
-        """)
-        course_results = cursor.fetchall()
-        
-        cursor.execute("""
+            """,
+            'majors': """
             SELECT 
                 u.major,
                 COUNT(DISTINCT ss.course_id) as course_count,
@@ -488,8 +292,10 @@ def get_course_performance():
             JOIN study_session ss ON u.userid = ss.matched_student_id
             GROUP BY u.major
             ORDER BY course_count DESC
-        """)
-        major_results = cursor.fetchall()
+            """,
+        })
+        course_results = results['courses']
+        major_results = results['majors']
         
         return jsonify({
             "status": "success",
@@ -517,81 +323,18 @@ def get_course_performance():
             "error": "Failed to fetch course performance analytics",
             "message": str(e)
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
 
 @analyst.route('/analytics/study-groups/active', methods=['GET'])
 def get_active_study_groups():
-    cursor = None
+    """Active study group metrics, served from the pre-computed analytics snapshot."""
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute("""
-            WITH CurrentGroups AS (
-                SELECT 
-                    COUNT(DISTINCT sg.groupid) as total_groups,
-                    COUNT(DISTINCT CASE 
-                        WHEN ss.session_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY) 
-                        THEN sg.groupid 
-                    END) as active_groups
-                FROM study_group sg
-                LEFT JOIN group_student gs ON sg.groupid = gs.groupid
-                LEFT JOIN study_session ss ON gs.studentid = ss.matched_student_id
-            ),
-            LastMonthGroups AS (
-                SELECT COUNT(DISTINCT sg.groupid) as last_month_active
-                FROM study_group sg
-                JOIN group_student gs ON sg.groupid = gs.groupid
-                JOIN study_session ss ON gs.studentid = ss.matched_student_id
-                WHERE ss.session_date BETWEEN 
-                    DATE_SUB(CURDATE(), INTERVAL 60 DAY) AND
-                    DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-            )
-            SELECT 
-                cg.total_groups,
-                cg.active_groups,
-                COALESCE(cg.active_groups - lmg.last_month_active, 0) as monthly_change,
-                CASE 
-                    WHEN lmg.last_month_active > 0 
-                    THEN ROUND((cg.active_groups - lmg.last_month_active) * 100.0 / lmg.last_month_active, 1)
-                    ELSE 0 
-                END as change_percentage
-            FROM CurrentGroups cg
-            CROSS JOIN LastMonthGroups lmg
-        """)
-        result = cursor.fetchone()
-        
-        if result:
-            return jsonify({
-                "status": "success",
-                "metrics": {
-                    "total_groups": int(result['total_groups'] or 0),
-                    "active_groups": int(result['active_groups'] or 0),
-                    "monthly_change": int(result['monthly_change'] or 0),
-                    "change_percentage": float(result['change_percentage'] or 0)
-                }
-            }), 200
-        else:
-            return jsonify({
-                "status": "success",
-                "metrics": {
-                    "total_groups": 0,
-                    "active_groups": 0,
-                    "monthly_change": 0,
-                    "change_percentage": 0
-                }
-            }), 200
-            
+        return jsonify(snapshots.get_snapshot('active_groups')), 200
     except Exception as e:
         print(f"Error in get_active_study_groups: {str(e)}")
         return jsonify({
             "error": "Failed to fetch active study groups metrics",
             "message": str(e)
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
 
 @analyst.route('/analytics/matching/success-rate', methods=['GET'])
 def get_success_rate():
@@ -728,22 +471,12 @@ def get_matches_distribution():
     try:
         cursor = db.get_db().cursor()
         
+        # user_activity_counters is kept up to date by triggers (see migrations/versions/0003)
         query = """
-            WITH MatchCounts AS (
-                SELECT 
-                    u.userid,
-                    COUNT(DISTINCT CASE 
-                        WHEN m.user1_id = u.userid THEN m.user2_id
-                        WHEN m.user2_id = u.userid THEN m.user1_id
-                    END) as match_count
-                FROM user u
-                LEFT JOIN matched_with m ON u.userid = m.user1_id OR u.userid = m.user2_id
-                GROUP BY u.userid
-            )
             SELECT 
                 match_count as matches,
                 COUNT(*) as student_count
-            FROM MatchCounts
+            FROM user_activity_counters
             GROUP BY match_count
             ORDER BY match_count ASC
         """
@@ -777,25 +510,27 @@ def get_recent_matches():
         
         query = """
             WITH MatchedUsers AS (
+                -- Each match appears once per side in match_edge, so joining
+                -- sessions on e.user_id covers sessions of either user
                 SELECT 
-                    m.user1_id,
-                    m.user2_id,
-                    m.match_date,
+                    LEAST(e.user_id, e.peer_id) as user1_id,
+                    GREATEST(e.user_id, e.peer_id) as user2_id,
+                    e.match_date,
                     u1.name as user1_name,
                     u2.name as user2_name,
                     ss.course_id,
                     c.course_name,
-                    COALESCE(comp.matchscore, 85) as compatibility_score
-                FROM matched_with m
-                JOIN user u1 ON m.user1_id = u1.userid
-                JOIN user u2 ON m.user2_id = u2.userid
-                LEFT JOIN study_session ss ON 
-                    (ss.matched_student_id = m.user1_id OR ss.matched_student_id = m.user2_id)
+                    -- Symmetric in the two users, so both directions of a match score the same
+                    COALESCE(
+                        (SELECT MAX(mh.matchscore) FROM matchhistory mh
+                         WHERE mh.userid IN (e.user_id, e.peer_id)),
+                        85) as compatibility_score
+                FROM match_edge e
+                JOIN study_session ss ON ss.matched_student_id = e.user_id
+                JOIN user u1 ON u1.userid = LEAST(e.user_id, e.peer_id)
+                JOIN user u2 ON u2.userid = GREATEST(e.user_id, e.peer_id)
                 LEFT JOIN course c ON ss.course_id = c.courseid
-                LEFT JOIN matchhistory comp ON 
-                    (comp.userid = m.user1_id OR comp.userid = m.user2_id)
-                WHERE ss.session_id IS NOT NULL
-                ORDER BY m.match_date DESC
+                ORDER BY e.match_date DESC
                 LIMIT 3
             )
             SELECT DISTINCT
@@ -863,4 +598,77 @@ def get_matches_timeline():
         
     except Exception as e:
         print(f"Error in get_matches_timeline: {str(e)}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
\ No newline at end of file
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Tables analysts can bulk-export, with the columns to export in order
+EXPORT_DATASETS = {
+    'matched_with': ['user1_id', 'user2_id', 'match_date'],
+    'study_session': ['session_id', 'course_id', 'matched_student_id', 'study_type', 'session_date'],
+    'matchhistory': ['matchid', 'userid', 'matchscore', 'matchdate'],
+}
+
+# Rows written per chunk of the streamed response
+EXPORT_CHUNK_ROWS = 1000
+
+def _export_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+@analyst.route('/export/<string:dataset>', methods=['GET'])
+def export_dataset(dataset):
+    """
+    Stream a raw table dump as NDJSON (default) or CSV (?format=csv).
+    Rows are read through an unbuffered server-side cursor and written in chunks,
+    so memory use stays flat regardless of table size.
+    """
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({
+            "error": f"Unknown dataset '{dataset}'",
+            "datasets": sorted(EXPORT_DATASETS)
+        }), 404
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+
+    columns = EXPORT_DATASETS[dataset]
+    cursor = db.get_db().cursor(cursors.SSDictCursor)
+    try:
+        # Table and column names come from EXPORT_DATASETS, never from the request
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {dataset}")
+    except Exception as e:
+        cursor.close()
+        print(f"Error in export_dataset: {str(e)}")
+        return jsonify({"error": "Failed to export dataset", "message": str(e)}), 500
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        try:
+            if export_format == 'csv':
+                writer.writerow(columns)
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+                if not rows:
+                    break
+                for row in rows:
+                    if export_format == 'csv':
+                        writer.writerow([_export_value(row[c]) for c in columns])
+                    else:
+                        buffer.write(json.dumps({c: _export_value(row[c]) for c in columns}))
+                        buffer.write('\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            cursor.close()
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={dataset}.{export_format}'
+    return response
+
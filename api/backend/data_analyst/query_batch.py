@@ -0,0 +1,84 @@
+#------------------------------------------------------------
+# Concurrent execution of independent analyst queries.
+#
+# run_batch({'name': sql, ...}) runs every statement at the same time,
+# each on its own connection checked out of db.pool, and returns
+# {'name': rows}. A handler with several independent aggregations then
+# waits for its slowest query instead of their sum.
+#
+# The executor is shared by the process and has ANALYST_BATCH_WORKERS
+# threads, which also caps how many extra pool connections batches hold
+# at once; keep it well below DB_POOL_MAX_SIZE.
+#------------------------------------------------------------
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from backend.db_connection import db
+from backend import profiling
+
+BATCH_WORKERS = int(os.getenv('ANALYST_BATCH_WORKERS', '4'))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # One executor per process: a forked worker doesn't inherit the threads
+    global _executor, _executor_pid, _executor_lock
+    if _executor_pid != os.getpid():
+        _executor, _executor_pid, _executor_lock = None, os.getpid(), threading.Lock()
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='analyst-batch')
+    return _executor
+
+
+def _run_one(sql, args):
+    # Runs in its own copy of the caller's context; returns (rows, sql totals)
+    totals = profiling.start_task_sql_totals()
+    pool = db.pool
+    raw = pool.checkout()
+    conn = db.wrap_connection(raw) if db.wrap_connection else raw
+    failed = True
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, args)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        failed = False
+        return rows, totals
+    finally:
+        pool.checkin(raw, discard=failed)
+
+
+def run_batch(statements):
+    """
+    Run {name: sql or (sql, args)} concurrently on separate pooled connections and
+    return {name: rows}. Waits for every statement; if any failed, the first
+    failure (in statement order) is raised.
+    """
+    executor = _get_executor()
+    futures = {}
+    for name, statement in statements.items():
+        sql, args = statement if isinstance(statement, tuple) else (statement, None)
+        # Each task runs in a copy of the caller's context, so profiling still
+        # attributes its statements to the calling route
+        futures[name] = executor.submit(contextvars.copy_context().run, _run_one, sql, args)
+    wait(futures.values())
+    results = {}
+    for name, future in futures.items():
+        if future.exception() is None:
+            rows, totals = future.result()
+            # Added here, on the caller's thread, so the tasks don't race on g
+            profiling.add_request_sql_totals(totals)
+            results[name] = rows
+    for future in futures.values():
+        if future.exception() is not None:
+            raise future.exception()
+    return results
@@ -0,0 +1,399 @@
+#------------------------------------------------------------
+# Materialized analytics snapshots for the /a/analytics dashboard.
+#
+# The heavy multi-join aggregations behind the retention, academic and
+# active-group routes are computed here and stored as JSON payloads in
+# the analytics_snapshot table. A background thread refreshes them every
+# ANALYTICS_REFRESH_SECONDS, so the routes only read one row by primary
+# key. Every response carries the snapshot's computed_at timestamp.
+#------------------------------------------------------------
+import datetime
+import decimal
+import json
+import logging
+import os
+import threading
+import time
+
+from backend.db_connection import db
+from backend.data_analyst.query_batch import run_batch
+
+REFRESH_SECONDS = int(os.getenv('ANALYTICS_REFRESH_SECONDS', '300'))
+
+# MySQL named lock so only one worker process recomputes at a time
+REFRESH_LOCK_NAME = 'studybuddy_analytics_snapshot_refresh'
+
+
+def compute_retention(run):
+    """Retention metrics for /a/analytics/retention (its two queries run as one batch)."""
+    results = run({
+        # Per-user counts are maintained by triggers in user_activity_counters (migration 0003)
+        'users': """
+            SELECT
+                COUNT(*) as total_users,
+                COUNT(CASE WHEN group_count > 0 THEN 1 END) as users_in_groups,
+                COUNT(CASE WHEN session_count > 0 THEN 1 END) as users_with_sessions,
+                COUNT(CASE WHEN last_session_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY) THEN 1 END) as active_last_30_days
+            FROM user_activity_counters
+        """,
+        'groups': """
+            SELECT
+                g.group_name,
+                MIN(gs.studentid) as creator_id,
+                COUNT(DISTINCT gs.studentid) as member_count,
+                MAX(ss.session_date) as last_session
+            FROM study_group g
+            LEFT JOIN group_student gs ON g.groupid = gs.groupid
+            LEFT JOIN study_session ss ON gs.studentid = ss.matched_student_id
+            GROUP BY g.group_name
+            ORDER BY last_session DESC
+        """,
+    })
+    result = results['users'][0] if results['users'] else None
+    groups_data = results['groups']
+
+    if result is None:
+        return {
+            "status": "success",
+            "message": "No retention data found",
+            "retention_metrics": {
+                "overall_rate": 0,
+                "rate_change": "0%"
+            },
+            "group_metrics": {
+                "avg_lifespan": "0 months",
+                "lifespan_change": "0"
+            },
+            "member_metrics": {
+                "active_count": 0,
+                "count_change": "0"
+            },
+            "risk_metrics": {
+                "at_risk_count": 0,
+                "risk_change": "0"
+            }
+        }
+
+    total_users = result['total_users']
+    users_in_groups = result['users_in_groups']
+    users_with_sessions = result['users_with_sessions']
+    active_last_30_days = result['active_last_30_days']
+
+    # Calculate retention metrics
+    retention_rate = (active_last_30_days / total_users * 100) if total_users > 0 else 0
+    group_participation = (users_in_groups / total_users * 100) if total_users > 0 else 0
+    session_participation = (users_with_sessions / total_users * 100) if total_users > 0 else 0
+
+    return {
+        "status": "success",
+        "retention_metrics": {
+            "overall_rate": round(retention_rate, 1),
+            "rate_change": "+3% vs last term"
+        },
+        "group_metrics": {
+            "avg_lifespan": "4.2 months",
+            "lifespan_change": "+0.5 months"
+        },
+        "member_metrics": {
+            "active_count": active_last_30_days,
+            "count_change": f"+{users_with_sessions - active_last_30_days} this term"
+        },
+        "risk_metrics": {
+            "at_risk_count": total_users - active_last_30_days,
+            "risk_change": "-3 vs last month"
+        },
+        "monthly_retention": [
+            {"Month": "Jan", "Retention Rate": round(retention_rate - 5, 1)},
+            {"Month": "Feb", "Retention Rate": round(retention_rate - 3, 1)},
+            {"Month": "Mar", "Retention Rate": round(retention_rate - 2, 1)},
+            {"Month": "Apr", "Retention Rate": round(retention_rate - 1, 1)},
+            {"Month": "May", "Retention Rate": round(retention_rate, 1)},
+            {"Month": "Jun", "Retention Rate": round(retention_rate + 1, 1)}
+        ],
+        "size_distribution": [
+            {"Size": "2-3", "Groups": len([g for g in groups_data if g['member_count'] in [2, 3]])},
+            {"Size": "4-5", "Groups": len([g for g in groups_data if g['member_count'] in [4, 5]])},
+            {"Size": "6-7", "Groups": len([g for g in groups_data if g['member_count'] in [6, 7]])},
+            {"Size": "8+", "Groups": len([g for g in groups_data if g['member_count'] >= 8])}
+        ],
+        "format_retention": [
+            {"Format": "In-Person", "Retention": round(retention_rate + 5, 1)},
+            {"Format": "Hybrid", "Retention": round(retention_rate + 2, 1)},
+            {"Format": "Virtual", "Retention": round(retention_rate - 3, 1)},
+            {"Format": "Async", "Retention": round(retention_rate - 8, 1)}
+        ],
+        "member_activity": [
+            {"Week": i + 1, "Active Members": active_last_30_days - 10 + i * 5}
+            for i in range(8)
+        ],
+        "risk_factors": {
+            "low_engagement": total_users - users_with_sessions,
+            "declining_attendance": round((total_users - active_last_30_days) * 0.4),
+            "schedule_conflicts": round((total_users - active_last_30_days) * 0.3)
+        }
+    }
+
+
+def compute_academic(run):
+    """
+    Course, learning style, session trend and major metrics for /a/analytics/academic.
+    The four aggregations are independent and run as one batch.
+    """
+    results = run({
+        'course_metrics': """
+        SELECT
+            c.course_name,
+            COUNT(DISTINCT ss.matched_student_id) as total_students,
+            COUNT(ss.session_id) as total_sessions,
+            COUNT(DISTINCT u.major) as unique_majors
+        FROM course c
+        LEFT JOIN study_session ss ON c.courseid = ss.course_id
+        LEFT JOIN user u ON ss.matched_student_id = u.userid
+        GROUP BY c.course_name
+        ORDER BY total_sessions DESC
+        """,
+        'learning_styles': """
+        SELECT
+            learning_style,
+            COUNT(*) as student_count,
+            COUNT(*) * 100.0 / (SELECT COUNT(*) FROM user WHERE learning_style IS NOT NULL) as percentage
+        FROM user
+        WHERE learning_style IS NOT NULL
+        GROUP BY learning_style
+        """,
+        'session_trends': """
+        SELECT
+            DATE_FORMAT(session_date, '%Y-%m') as month,
+            COUNT(*) as session_count,
+            COUNT(DISTINCT matched_student_id) as active_students
+        FROM study_session
+        GROUP BY DATE_FORMAT(session_date, '%Y-%m')
+        ORDER BY month DESC
+        LIMIT 6
+        """,
+        'major_metrics': """
+        SELECT
+            u.major,
+            COUNT(DISTINCT u.userid) as student_count,
+            COUNT(DISTINCT ss.session_id) as study_sessions
+        FROM user u
+        LEFT JOIN study_session ss ON u.userid = ss.matched_student_id
+        WHERE u.major IS NOT NULL
+        GROUP BY u.major
+        ORDER BY study_sessions DESC
+        """,
+    })
+    course_metrics = results['course_metrics']
+    learning_styles = results['learning_styles']
+    session_trends = results['session_trends']
+    major_metrics = results['major_metrics']
+
+    return {
+        "status": "success",
+        "course_metrics": [
+            {
+                "course": metric['course_name'],
+                "students": metric['total_students'],
+                "sessions": metric['total_sessions'],
+                "major_diversity": metric['unique_majors']
+            } for metric in course_metrics
+        ],
+        "learning_styles": [
+            {
+                "style": style['learning_style'],
+                "percentage": round(style['percentage'], 1)
+            } for style in learning_styles
+        ],
+        "study_trends": [
+            {
+                "month": trend['month'],
+                "sessions": trend['session_count'],
+                "active_students": trend['active_students']
+            } for trend in session_trends
+        ],
+        "major_distribution": [
+            {
+                "major": major['major'],
+                "students": major['student_count'],
+                "engagement": major['study_sessions']
+            } for major in major_metrics
+        ]
+    }
+
+
+def compute_active_groups(run):
+    """Active study group counts for /a/analytics/study-groups/active."""
+    rows = run({'groups': """
+        WITH CurrentGroups AS (
+            SELECT
+                COUNT(DISTINCT sg.groupid) as total_groups,
+                COUNT(DISTINCT CASE
+                    WHEN ss.session_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+                    THEN sg.groupid
+                END) as active_groups
+            FROM study_group sg
+            LEFT JOIN group_student gs ON sg.groupid = gs.groupid
+            LEFT JOIN study_session ss ON gs.studentid = ss.matched_student_id
+        ),
+        LastMonthGroups AS (
+            SELECT COUNT(DISTINCT sg.groupid) as last_month_active
+            FROM study_group sg
+            JOIN group_student gs ON sg.groupid = gs.groupid
+            JOIN study_session ss ON gs.studentid = ss.matched_student_id
+            WHERE ss.session_date BETWEEN
+                DATE_SUB(CURDATE(), INTERVAL 60 DAY) AND
+                DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+        )
+        SELECT
+            cg.total_groups,
+            cg.active_groups,
+            COALESCE(cg.active_groups - lmg.last_month_active, 0) as monthly_change,
+            CASE
+                WHEN lmg.last_month_active > 0
+                THEN ROUND((cg.active_groups - lmg.last_month_active) * 100.0 / lmg.last_month_active, 1)
+                ELSE 0
+            END as change_percentage
+        FROM CurrentGroups cg
+        CROSS JOIN LastMonthGroups lmg
+    """})['groups']
+    result = rows[0] if rows else None
+
+    if result:
+        return {
+            "status": "success",
+            "metrics": {
+                "total_groups": int(result['total_groups'] or 0),
+                "active_groups": int(result['active_groups'] or 0),
+                "monthly_change": int(result['monthly_change'] or 0),
+                "change_percentage": float(result['change_percentage'] or 0)
+            }
+        }
+    else:
+        return {
+            "status": "success",
+            "metrics": {
+                "total_groups": 0,
+                "active_groups": 0,
+                "monthly_change": 0,
+                "change_percentage": 0
+            }
+        }
+
+
+# metric key -> function computing its payload. Each takes a batch runner,
+# run({name: sql}) -> {name: rows}; refresh() passes query_batch.run_batch,
+# which runs a metric's independent queries concurrently on pooled connections
+METRICS = {
+    'retention': compute_retention,
+    'academic': compute_academic,
+    'active_groups': compute_active_groups,
+}
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+SELECT_SNAPSHOT = """
+    SELECT payload, computed_at, TIMESTAMPDIFF(SECOND, computed_at, NOW()) AS age_seconds
+    FROM analytics_snapshot
+    WHERE metric_key = %s
+"""
+
+
+def refresh(conn, key):
+    """Recompute one metric and upsert its snapshot row."""
+    cursor = conn.cursor()
+    try:
+        payload = METRICS[key](run_batch)
+        cursor.execute("""
+            INSERT INTO analytics_snapshot (metric_key, payload, computed_at)
+            VALUES (%s, %s, NOW())
+            ON DUPLICATE KEY UPDATE payload = VALUES(payload), computed_at = VALUES(computed_at)
+        """, (key, json.dumps(payload, default=_json_default)))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def get_snapshot(key):
+    """
+    Return a metric's payload with its computed_at timestamp and age in seconds.
+    Falls back to computing it inline the first time, before the background job
+    has written a row.
+    """
+    conn = db.get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SELECT_SNAPSHOT, (key,))
+        row = cursor.fetchone()
+        if row is None:
+            refresh(conn, key)
+            cursor.execute(SELECT_SNAPSHOT, (key,))
+            row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return snapshot_response(row)
+
+
+def snapshot_response(row):
+    """Turn an analytics_snapshot row (as selected by SELECT_SNAPSHOT) into the route payload."""
+    payload = row['payload']
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    return dict(payload, computed_at=row['computed_at'].isoformat(),
+                age_seconds=max(int(row['age_seconds'] or 0), 0))
+
+
+def refresh_all():
+    """
+    Recompute every metric unless another worker already did so recently.
+    Needs an app context; returns True if this call refreshed the snapshots.
+    """
+    conn = db.get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (REFRESH_LOCK_NAME,))
+        if not cursor.fetchone()['acquired']:
+            return False
+        try:
+            cursor.execute("""
+                SELECT COUNT(*) AS fresh
+                FROM analytics_snapshot
+                WHERE computed_at >= NOW() - INTERVAL %s SECOND
+            """, (REFRESH_SECONDS // 2,))
+            if cursor.fetchone()['fresh'] >= len(METRICS):
+                return False
+            for key in METRICS:
+                refresh(conn, key)
+            return True
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (REFRESH_LOCK_NAME,))
+    finally:
+        cursor.close()
+
+
+_job_pid = None
+
+
+def start_refresh_job(app):
+    """Start the background refresh thread for this process (idempotent, fork-aware)."""
+    global _job_pid
+    if REFRESH_SECONDS <= 0 or _job_pid == os.getpid():
+        return
+    _job_pid = os.getpid()
+
+    def run():
+        while True:
+            try:
+                with app.app_context():
+                    refresh_all()
+            except Exception as e:
+                logging.error(f"Analytics snapshot refresh failed: {e}")
+            time.sleep(REFRESH_SECONDS)
+
+    threading.Thread(target=run, name='analytics-snapshot-refresh', daemon=True).start()
@@ -1,10 +1,285 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
+#
+# Connections come from a process-wide pool instead of being opened
+# per app context, so short queries don't pay for a TCP + auth
+# handshake every time. Blueprints keep calling db.get_db(); the
+# connection is checked out on first use in an app context and handed
+# back to the pool when the context tears down.
+#
+# The pool belongs to the process that created it. A forked child
+# (e.g. a gunicorn worker of a preloaded app) starts with a fresh,
+# empty pool instead of sharing the parent's sockets.
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
+import collections
+import logging
+import os
+import threading
+import time
+
+import pymysql
+from flask import g
 from pymysql import cursors
 
 
-# the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of pymysql connections.
+
+    - keeps at least min_size idle/in-use connections and never more than max_size
+    - pings idle connections on checkout and replaces dead ones
+    - closes connections older than max_lifetime seconds instead of reusing them
+    - discards connections that were returned after an error
+    """
+
+    def __init__(self, connect_args, min_size=2, max_size=10, max_lifetime=1800,
+                 timeout=10, ping_interval=30):
+        self.connect_args = connect_args
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._idle = collections.deque()   # (conn, created_at, last_used_at)
+        self._created_at = {}              # id(conn) -> created_at, for checked-out connections
+        self._size = 0
+        self._waiters = 0
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._failed_pings = 0
+        self._checkout_latencies = collections.deque(maxlen=1000)
+
+    def _connect(self):
+        conn = pymysql.connect(**self.connect_args)
+        self._created += 1
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def fill(self):
+        """Open connections until min_size is reached."""
+        with self._cond:
+            while self._size < self.min_size:
+                self._idle.append((self._connect(), time.monotonic(), time.monotonic()))
+                self._size += 1
+            self._cond.notify_all()
+
+    def checkout(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            self._waiters += 1
+            try:
+                while True:
+                    while self._idle:
+                        conn, created_at, last_used = self._idle.pop()
+                        if self._usable(conn, created_at, last_used):
+                            return self._hand_out(conn, created_at, started)
+                        self._close(conn)
+                        self._size -= 1
+                        self._discarded += 1
+                    if self._size < self.max_size:
+                        # Reserve the slot before connecting so we don't overshoot max_size
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.timeout}s "
+                            f"({self._size} open, max {self.max_size})")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters -= 1
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            return self._hand_out(conn, time.monotonic(), started)
+
+    def _usable(self, conn, created_at, last_used):
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - last_used > self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                self._failed_pings += 1
+                return False
+        return True
+
+    def _hand_out(self, conn, created_at, started):
+        self._created_at[id(conn)] = created_at
+        self._checkouts += 1
+        self._checkout_latencies.append(time.monotonic() - started)
+        return conn
+
+    def checkin(self, conn, discard=False):
+        """Return a connection; any open transaction is rolled back first."""
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            created_at = self._created_at.pop(id(conn), time.monotonic())
+            if discard or (self.max_lifetime and time.monotonic() - created_at > self.max_lifetime):
+                self._close(conn)
+                self._size -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._close(conn)
+                self._size -= 1
+
+    def stats(self):
+        with self._cond:
+            latencies = sorted(self._checkout_latencies)
+            in_use = self._size - len(self._idle)
+
+            def pct(p):
+                return round(latencies[int(p * (len(latencies) - 1))] * 1000, 3) if latencies else 0.0
+
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': in_use,
+                'waiters': self._waiters,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'connections_created': self._created,
+                'connections_discarded': self._discarded,
+                'failed_health_checks': self._failed_pings,
+                'checkout_latency_ms': {
+                    'avg': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                    'p50': pct(0.50),
+                    'p95': pct(0.95),
+                    'max': pct(1.0),
+                },
+            }
+
+
+class MySQLPool:
+    """
+    Drop-in replacement for flaskext.mysql.MySQL backed by a ConnectionPool.
+    Reads the same MYSQL_DATABASE_* settings plus MYSQL_POOL_* sizing options.
+    """
+
+    def __init__(self, app=None, **connect_args):
+        self.connect_args = connect_args
+        self.app = None
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        # Optional callable applied to connections handed out by get_db()
+        # (backend.profiling uses it to time statements)
+        self.wrap_connection = None
+        if app is not None:
+            self.init_app(app)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset_after_fork)
+
+    def reset_after_fork(self):
+        """
+        Forget the parent's pool in a forked child. Its connections are not closed:
+        the sockets are shared with the parent, and a QUIT sent from here would end
+        the parent's sessions too.
+        """
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('MYSQL_DATABASE_HOST', 'localhost')
+        app.config.setdefault('MYSQL_DATABASE_PORT', 3306)
+        app.config.setdefault('MYSQL_DATABASE_CHARSET', 'utf8mb4')
+        app.config.setdefault('MYSQL_POOL_MIN_SIZE', 2)
+        app.config.setdefault('MYSQL_POOL_MAX_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_MAX_LIFETIME', 1800)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_POOL_PING_INTERVAL', 30)
+        app.teardown_appcontext(self.teardown)
+
+    @property
+    def pool(self):
+        # Created lazily so the pool is built in the process that serves requests
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    config = self.app.config
+                    connect_args = dict(self.connect_args)
+                    connect_args.update(
+                        host=config['MYSQL_DATABASE_HOST'],
+                        port=config['MYSQL_DATABASE_PORT'],
+                        user=config.get('MYSQL_DATABASE_USER'),
+                        password=config.get('MYSQL_DATABASE_PASSWORD'),
+                        database=config.get('MYSQL_DATABASE_DB'),
+                        charset=config['MYSQL_DATABASE_CHARSET'],
+                    )
+                    pool = ConnectionPool(
+                        connect_args,
+                        min_size=int(config['MYSQL_POOL_MIN_SIZE']),
+                        max_size=int(config['MYSQL_POOL_MAX_SIZE']),
+                        max_lifetime=int(config['MYSQL_POOL_MAX_LIFETIME']),
+                        timeout=float(config['MYSQL_POOL_TIMEOUT']),
+                        ping_interval=float(config['MYSQL_POOL_PING_INTERVAL']),
+                    )
+                    try:
+                        pool.fill()
+                    except Exception as e:
+                        # The database may still be starting; connections are opened on demand
+                        logging.warning(f"Could not pre-fill MySQL pool: {e}")
+                    self._pool = pool
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def connect(self):
+        """Open a standalone (unpooled) connection."""
+        return pymysql.connect(**self.pool.connect_args)
+
+    def get_db(self):
+        """Return this app context's connection, checking one out of the pool on first use."""
+        if '_mysql_conn' not in g:
+            g._mysql_conn = self.pool.checkout()
+            g._mysql_conn_wrapped = self.wrap_connection(g._mysql_conn) if self.wrap_connection else g._mysql_conn
+        return g._mysql_conn_wrapped
+
+    def teardown(self, exception):
+        g.pop('_mysql_conn_wrapped', None)
+        conn = g.pop('_mysql_conn', None)
+        if conn is not None:
+            # A connection that saw an error may be mid-result or broken; don't reuse it
+            self.pool.checkin(conn, discard=exception is not None or not conn.open)
+
+
+# the parameter instructs the connection to return data
+# as a dictionary object.
+db = MySQLPool(cursorclass=cursors.DictCursor)
@@ -0,0 +1,127 @@
+#------------------------------------------------------------
+# Async MySQL access for Flask async views.
+#
+# Flask runs each `async def` view on a fresh event loop, so a driver
+# pool can't live on the request's loop. Instead one daemon thread per
+# process runs an event loop that owns an aiomysql pool; views await
+# statements submitted to it. Independent statements awaited together
+# with gather() run concurrently on separate pooled connections, so a
+# handler waits for its slowest query instead of the sum of all of
+# them, and the pool's connections aren't tied to request threads.
+#
+# Statements are recorded by backend.profiling like the synchronous
+# ones. Connections run in autocommit mode: this path is for reads.
+#------------------------------------------------------------
+import asyncio
+import os
+import threading
+import time
+
+import aiomysql
+from flask import g, has_request_context
+
+from backend.profiling import profiler, current_endpoint
+
+
+class AsyncMySQLPool:
+    """
+    aiomysql pool on a dedicated event-loop thread. Reads the same
+    MYSQL_DATABASE_* settings as MySQLPool plus MYSQL_ASYNC_POOL_* sizing.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._loop = None
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('MYSQL_ASYNC_POOL_MIN_SIZE', 1)
+        app.config.setdefault('MYSQL_ASYNC_POOL_MAX_SIZE', 10)
+        app.config.setdefault('MYSQL_ASYNC_CONNECT_TIMEOUT', 10)
+
+    def _reset_after_fork(self):
+        # The loop thread didn't survive the fork; start over in the child
+        self._loop = None
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the loop thread and create the pool for this process on first use."""
+        if self._pool is not None and self._pid == os.getpid():
+            return self._loop
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='async-db-loop', daemon=True).start()
+                self._loop, self._pool, self._pid = loop, None, os.getpid()
+            if self._pool is None:
+                config = self.app.config
+                create = aiomysql.create_pool(
+                    host=config['MYSQL_DATABASE_HOST'],
+                    port=config['MYSQL_DATABASE_PORT'],
+                    user=config.get('MYSQL_DATABASE_USER'),
+                    password=config.get('MYSQL_DATABASE_PASSWORD') or '',
+                    db=config.get('MYSQL_DATABASE_DB'),
+                    charset=config.get('MYSQL_DATABASE_CHARSET', 'utf8mb4'),
+                    minsize=int(config['MYSQL_ASYNC_POOL_MIN_SIZE']),
+                    maxsize=int(config['MYSQL_ASYNC_POOL_MAX_SIZE']),
+                    connect_timeout=float(config['MYSQL_ASYNC_CONNECT_TIMEOUT']),
+                    autocommit=True,
+                    pool_recycle=int(config.get('MYSQL_POOL_MAX_LIFETIME', 1800)),
+                )
+                self._pool = asyncio.run_coroutine_threadsafe(create, self._loop).result(
+                    float(config['MYSQL_ASYNC_CONNECT_TIMEOUT']) + 5)
+        return self._loop
+
+    async def _execute(self, sql, args):
+        # Runs on the pool's loop
+        async with self._pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                started = time.perf_counter()
+                await cursor.execute(sql, args)
+                rows = await cursor.fetchall()
+                return rows, time.perf_counter() - started
+
+    async def fetchall(self, sql, args=None):
+        """Run one statement on a pooled connection and return its rows (list of dicts)."""
+        loop = self._ensure_started()
+        endpoint = current_endpoint()
+        started = time.perf_counter()
+        try:
+            rows, elapsed = await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self._execute(sql, args), loop))
+        except Exception:
+            profiler.record_query(endpoint, sql, time.perf_counter() - started, 0, error=True)
+            raise
+        profiler.record_query(endpoint, sql, elapsed, len(rows))
+        if has_request_context() and '_profile_sql' in g:
+            g._profile_sql[0] += elapsed
+            g._profile_sql[1] += len(rows)
+            g._profile_sql[2] += 1
+        return list(rows)
+
+    async def fetchone(self, sql, args=None):
+        rows = await self.fetchall(sql, args)
+        return rows[0] if rows else None
+
+    async def gather(self, statements):
+        """
+        Run {name: sql or (sql, args)} concurrently, each on its own pooled
+        connection; returns {name: rows}. The first failure is raised.
+        """
+        names = list(statements)
+        queries = [statements[name] if isinstance(statements[name], tuple) else (statements[name], None)
+                   for name in names]
+        results = await asyncio.gather(*(self.fetchall(sql, args) for sql, args in queries))
+        return dict(zip(names, results))
+
+
+async_db = AsyncMySQLPool()
@@ -0,0 +1,177 @@
+#------------------------------------------------------------
+# In-memory learning-style feature store.
+#
+# Every user's four learning-style percentages live in one contiguous
+# float32 matrix (one row per user, columns in STYLE_KEYS order) keyed
+# by userid. Users without a learning_style_distribution row (table
+# created by migration 0005) get the default distribution for their
+# primary learning_style and are flagged as such. Batch lookups are a
+# fancy-index into the matrix, and cosine similarity against one user
+# is a single matrix-vector product.
+#
+# The store is loaded once per process, reloaded every
+# LEARNING_STYLE_TTL seconds to pick up writes made by other workers,
+# and updated in place on registration and profile updates. Users it
+# doesn't hold yet (registered through another worker since the last
+# load) are fetched from MySQL on first lookup.
+#------------------------------------------------------------
+import os
+import threading
+import time
+
+import numpy as np
+
+STYLE_KEYS = ('visual_percentage', 'auditory_percentage',
+              'reading_writing_percentage', 'kinesthetic_percentage')
+
+# Default distribution per primary learning style; 'visual' also covers unknown styles
+DEFAULT_DISTRIBUTIONS = {
+    'visual': dict(zip(STYLE_KEYS, (65.00, 15.00, 10.00, 10.00))),
+    'auditory': dict(zip(STYLE_KEYS, (15.00, 65.00, 10.00, 10.00))),
+    'kinesthetic': dict(zip(STYLE_KEYS, (10.00, 15.00, 10.00, 65.00))),
+}
+_DEFAULT_VECTORS = {style: np.array([d[k] for k in STYLE_KEYS], dtype=np.float32)
+                    for style, d in DEFAULT_DISTRIBUTIONS.items()}
+
+STORE_TTL_SECONDS = int(os.getenv('LEARNING_STYLE_TTL', '300'))
+
+
+def default_vector(learning_style):
+    """Default distribution for a primary learning style, as a float32 vector."""
+    style = learning_style.lower() if learning_style else 'visual'
+    return _DEFAULT_VECTORS.get(style, _DEFAULT_VECTORS['visual'])
+
+
+class LearningStyleStore:
+    """float32 (n, 4) distribution matrix plus a flag for rows holding defaults."""
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        self.user_ids = np.array([row['userid'] for row in rows], dtype=np.int64)
+        self.row_of = {uid: i for i, uid in enumerate(self.user_ids.tolist())}
+        self.matrix = np.zeros((len(rows), len(STYLE_KEYS)), dtype=np.float32)
+        self.is_default = np.zeros(len(rows), dtype=bool)
+        for i, row in enumerate(rows):
+            self._set(i, row)
+        self.loaded_at = time.time()
+        self.lock = threading.RLock()
+
+    def _set(self, i, row):
+        if row[STYLE_KEYS[0]] is not None:
+            self.matrix[i] = [float(row[k]) for k in STYLE_KEYS]
+            self.is_default[i] = False
+        else:
+            self.matrix[i] = default_vector(row['learning_style'])
+            self.is_default[i] = True
+
+    def __contains__(self, user_id):
+        return user_id in self.row_of
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def _row(self, user_id):
+        row = self.row_of.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            self.user_ids = np.append(self.user_ids, np.int64(user_id))
+            self.matrix = np.vstack([self.matrix, np.zeros((1, len(STYLE_KEYS)), dtype=np.float32)])
+            self.is_default = np.append(self.is_default, True)
+            self.row_of[user_id] = row
+        return row
+
+    def add_rows(self, rows):
+        """Add (or refresh) users from rows shaped like load_store's."""
+        with self.lock:
+            for row in rows:
+                self._set(self._row(row['userid']), row)
+
+    def set_learning_style(self, user_id, learning_style):
+        """Apply a changed primary learning style; only rows holding defaults change."""
+        with self.lock:
+            row = self._row(user_id)
+            if self.is_default[row]:
+                self.matrix[row] = default_vector(learning_style)
+
+    def lookup(self, user_ids):
+        """
+        Distributions for many users. Returns (found user ids, (m, 4) float32 rows,
+        is_default flags, missing user ids), found ids in request order.
+        """
+        with self.lock:
+            found = [uid for uid in user_ids if uid in self.row_of]
+            missing = [uid for uid in user_ids if uid not in self.row_of]
+            rows = np.fromiter((self.row_of[uid] for uid in found), dtype=np.int64, count=len(found))
+            return found, self.matrix[rows], self.is_default[rows], missing
+
+    def similarity(self, user_id, candidate_ids=None):
+        """
+        Cosine similarity of user_id's distribution with every user (or only
+        candidate_ids), excluding user_id itself. Returns (user ids, similarities).
+        """
+        with self.lock:
+            user_ids, matrix = self.user_ids, self.matrix
+            if candidate_ids is not None:
+                rows = np.flatnonzero(np.isin(user_ids, np.fromiter(candidate_ids, dtype=np.int64)))
+                user_ids, matrix = user_ids[rows], matrix[rows]
+            target = self.matrix[self.row_of[user_id]]
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(target)
+            scores = np.divide(matrix @ target, norms, out=np.zeros(len(user_ids), dtype=np.float32),
+                               where=norms > 0)
+            keep = user_ids != user_id
+            return user_ids[keep], scores[keep]
+
+    def most_similar(self, user_id, k, candidate_ids=None):
+        """Return [(user_id, similarity)] for the k most similar users, best first."""
+        user_ids, scores = self.similarity(user_id, candidate_ids)
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            user_ids, scores = user_ids[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return [(int(u), float(s)) for u, s in zip(user_ids[order], scores[order])]
+
+
+def _fetch_rows(cursor, user_ids=None):
+    """Distribution rows (or learning style, for the default) of every user or only user_ids."""
+    where = f"WHERE u.userid IN ({', '.join(['%s'] * len(user_ids))})" if user_ids is not None else ""
+    cursor.execute(f"""
+        SELECT u.userid, u.learning_style,
+               d.visual_percentage, d.auditory_percentage,
+               d.reading_writing_percentage, d.kinesthetic_percentage
+        FROM user u
+        LEFT JOIN learning_style_distribution d ON d.userid = u.userid
+        {where}
+        ORDER BY u.userid
+    """, tuple(user_ids or ()))
+    return cursor.fetchall()
+
+
+def load_store(cursor):
+    """Read every user's distribution (or learning style, for the default) from MySQL."""
+    return LearningStyleStore(_fetch_rows(cursor))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(cursor, user_ids=()):
+    """
+    Return the shared store, (re)loading it when missing or older than STORE_TTL_SECONDS.
+    Any of user_ids the store doesn't hold are fetched from MySQL and added first.
+    """
+    global _store
+    with _store_lock:
+        if _store is None or time.time() - _store.loaded_at > STORE_TTL_SECONDS:
+            _store = load_store(cursor)
+        store = _store
+    unknown = sorted({uid for uid in user_ids if uid not in store})
+    if unknown:
+        store.add_rows(_fetch_rows(cursor, unknown))
+    return store
+
+
+def update_learning_style(user_id, learning_style):
+    """Apply a profile's new primary learning style (no-op if the store is not loaded)."""
+    if _store is not None:
+        _store.set_learning_style(user_id, learning_style)
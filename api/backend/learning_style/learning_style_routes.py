@@ -1,32 +1,22 @@
+import numpy as np
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.response_cache import cache
+from backend.learning_style import feature_store
+from backend.learning_style.feature_store import DEFAULT_DISTRIBUTIONS, STYLE_KEYS
+from backend.validation import is_integral
 
 learning_style_bp = Blueprint('learning_style', __name__)
 
+# Limits for the batch lookup and similarity endpoints
+MAX_BATCH_USERS = 10000
+DEFAULT_SIMILAR_COUNT = 10
+MAX_SIMILAR_COUNT = 1000
+
 def get_default_distribution(learning_style):
-    """Get default distribution based on primary learning style."""
+    """Get default distribution based on primary learning style (shared dict, don't modify)."""
     style = learning_style.lower() if learning_style else 'visual'
-    distributions = {
-        'visual': {
-            'visual_percentage': 65.00,
-            'auditory_percentage': 15.00,
-            'reading_writing_percentage': 10.00,
-            'kinesthetic_percentage': 10.00
-        },
-        'auditory': {
-            'visual_percentage': 15.00,
-            'auditory_percentage': 65.00,
-            'reading_writing_percentage': 10.00,
-            'kinesthetic_percentage': 10.00
-        },
-        'kinesthetic': {
-            'visual_percentage': 10.00,
-            'auditory_percentage': 15.00,
-            'reading_writing_percentage': 10.00,
-            'kinesthetic_percentage': 65.00
-        }
-    }
-    return distributions.get(style, distributions['visual'])
+    return DEFAULT_DISTRIBUTIONS.get(style, DEFAULT_DISTRIBUTIONS['visual'])
 
 def get_default_profile(learning_style):
     """Get default profile based on primary learning style."""
@@ -49,39 +39,85 @@ def get_default_profile(learning_style):
 
 @learning_style_bp.route('/distribution/<int:user_id>', methods=['GET'])
 def get_learning_style_distribution(user_id):
-    """Get the learning style distribution for a user."""
+    """Get the learning style distribution for a user (all zeros if none is stored)."""
     cursor = None
     try:
         cursor = db.get_db().cursor()
-        cursor.execute("""
-            SELECT visual_percentage, auditory_percentage, 
-                   reading_writing_percentage, kinesthetic_percentage
-            FROM learning_style_distribution
-            WHERE userid = %s
-        """, (user_id,))
-        result = cursor.fetchone()
-        if result:
-            return jsonify({
-                'visual_percentage': float(result[0]),
-                'auditory_percentage': float(result[1]),
-                'reading_writing_percentage': float(result[2]),
-                'kinesthetic_percentage': float(result[3])
-            }), 200
+        found, rows, is_default, _ = feature_store.get_store(cursor, [user_id]).lookup([user_id])
+        if found and not is_default[0]:
+            return jsonify({key: round(float(v), 2) for key, v in zip(STYLE_KEYS, rows[0])}), 200
         # Return default empty distribution
-        return jsonify({
-            'visual_percentage': 0.0,
-            'auditory_percentage': 0.0,
-            'reading_writing_percentage': 0.0,
-            'kinesthetic_percentage': 0.0
-        }), 200
+        return jsonify({key: 0.0 for key in STYLE_KEYS}), 200
     except Exception as e:
         # Return empty distribution on error
-        return jsonify({
-            'visual_percentage': 0.0,
-            'auditory_percentage': 0.0,
-            'reading_writing_percentage': 0.0,
-            'kinesthetic_percentage': 0.0
-        }), 200
+        return jsonify({key: 0.0 for key in STYLE_KEYS}), 200
+    finally:
+        if cursor:
+            cursor.close()
+
+@learning_style_bp.route('/distribution:batch', methods=['POST'])
+def get_learning_style_distributions_batch():
+    """
+    Distributions for many users in one call. Body: {"user_ids": [1, 2, ...]}.
+    Users without a stored distribution get the default for their learning style
+    with "is_default": true; unknown ids are listed under "missing".
+    """
+    cursor = None
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('user_ids'), list):
+            return jsonify({"error": "Missing required field: user_ids (a list of user ids)"}), 400
+        if len(data['user_ids']) > MAX_BATCH_USERS:
+            return jsonify({"error": f"At most {MAX_BATCH_USERS} user ids per request"}), 400
+        if not all(is_integral(uid) for uid in data['user_ids']):
+            return jsonify({"error": "user_ids must be integers"}), 400
+        user_ids = list(dict.fromkeys(int(uid) for uid in data['user_ids']))
+
+        cursor = db.get_db().cursor()
+        found, rows, is_default, missing = feature_store.get_store(cursor, user_ids).lookup(user_ids)
+        rows = np.round(rows.astype(np.float64), 2).tolist()
+        distributions = [
+            dict(zip(STYLE_KEYS, row), userid=uid, is_default=bool(default))
+            for uid, row, default in zip(found, rows, is_default.tolist())
+        ]
+        return jsonify({"distributions": distributions, "missing": missing}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
+@learning_style_bp.route('/similarity', methods=['POST'])
+def get_learning_style_similarity():
+    """
+    Cosine similarity of one user's distribution with others.
+    Body: {"user_id": 1, "user_ids": [...] (optional, default everyone), "k": 10 (optional)}.
+    Returns the k most similar users, best first.
+    """
+    cursor = None
+    try:
+        data = request.get_json()
+        if not data or data.get('user_id') is None:
+            return jsonify({"error": "Missing required field: user_id"}), 400
+        candidate_ids = data.get('user_ids')
+        if candidate_ids is not None and (not isinstance(candidate_ids, list) or len(candidate_ids) > MAX_BATCH_USERS):
+            return jsonify({"error": f"user_ids must be a list of at most {MAX_BATCH_USERS} ids"}), 400
+        ids = [data['user_id']] + (candidate_ids or [])
+        if not all(is_integral(uid) for uid in ids) or not is_integral(data.get('k', DEFAULT_SIMILAR_COUNT)):
+            return jsonify({"error": "user_id, user_ids and k must be integers"}), 400
+        user_id = int(data['user_id'])
+        k = min(max(int(data.get('k', DEFAULT_SIMILAR_COUNT)), 1), MAX_SIMILAR_COUNT)
+        if candidate_ids is not None:
+            candidate_ids = [int(uid) for uid in candidate_ids]
+
+        cursor = db.get_db().cursor()
+        store = feature_store.get_store(cursor, [user_id] + (candidate_ids or []))
+        if user_id not in store:
+            return jsonify({"error": "User not found"}), 404
+        similar = store.most_similar(user_id, k, candidate_ids)
+        return jsonify([{"userid": uid, "similarity": round(score, 4)} for uid, score in similar]), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
     finally:
         if cursor:
             cursor.close()
@@ -119,6 +155,7 @@ def get_learning_profile(user_id):
             cursor.close()
 
 @learning_style_bp.route('/techniques/<string:learning_style>', methods=['GET'])
+@cache.cached(tags=('study_techniques',), ttl=3600)
 def get_study_techniques(learning_style):
     """Get study techniques for a specific learning style."""
     cursor = None
@@ -143,6 +180,7 @@ def get_study_techniques(learning_style):
             cursor.close()
 
 @learning_style_bp.route('/tools/<string:learning_style>', methods=['GET'])
+@cache.cached(tags=('study_tools',), ttl=3600)
 def get_study_tools(learning_style):
     """Get study tools for a specific learning style."""
     cursor = None
@@ -167,6 +205,7 @@ def get_study_tools(learning_style):
             cursor.close()
 
 @learning_style_bp.route('/recommendations/<string:learning_style>', methods=['GET'])
+@cache.cached(tags=('study_group_recommendations',), ttl=3600)
 def get_group_recommendations(learning_style):
     """Get study group recommendations for a specific learning style."""
     cursor = None
@@ -0,0 +1,199 @@
+#------------------------------------------------------------
+# Versioned schema migrations for study_buddy_system.
+#
+# database-files/01_study_buddy.sql only runs when the MySQL volume is
+# first created. Schema changes after that live here as numbered SQL
+# files in versions/ (NNNN_short_name.sql) and are applied in order by
+#
+#   python -m backend.migrations upgrade
+#
+# Applied versions are recorded in the schema_migrations table with a
+# checksum of the file, so `status` can report pending and edited
+# migrations. MySQL DDL commits implicitly, so a migration that fails
+# half way is not rolled back; re-running upgrade skips "already
+# exists" errors for tables, columns, indexes and triggers so it can be
+# finished.
+#------------------------------------------------------------
+import hashlib
+import logging
+import os
+import re
+import time
+
+import pymysql
+from pymysql import cursors
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), 'versions')
+
+_FILENAME = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+
+# MySQL errors meaning "this DDL already ran":
+# table exists, duplicate column, duplicate index, trigger exists
+_ALREADY_APPLIED_ERRORS = {1050, 1060, 1061, 1359}
+
+
+class MigrationError(Exception):
+    """Raised when a migration statement fails."""
+
+
+class Migration:
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    @property
+    def sql(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    @property
+    def checksum(self):
+        return hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+
+    def statements(self):
+        return split_statements(self.sql)
+
+
+def split_statements(sql):
+    """
+    Split a migration file into statements on `;`, ignoring semicolons inside
+    quotes and `--` / `#` comments. Statements containing their own `;`
+    (e.g. BEGIN ... END trigger bodies) are not supported; write triggers
+    with a single-statement body instead.
+    """
+    statements, current = [], []
+    quote = None
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            current.append(ch)
+            if ch == '\\':
+                current.append(sql[i + 1:i + 2])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ('"', "'", '`'):
+            quote = ch
+            current.append(ch)
+        elif sql.startswith('--', i) or ch == '#':
+            end = sql.find('\n', i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif ch == ';':
+            statements.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statements.append(''.join(current).strip())
+    return [s for s in statements if s]
+
+
+def discover(versions_dir=VERSIONS_DIR):
+    """Return every migration in versions_dir, ordered by version."""
+    migrations = []
+    for filename in sorted(os.listdir(versions_dir)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(match.group(1), match.group(2), os.path.join(versions_dir, filename)))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration version in {versions_dir}")
+    return migrations
+
+
+def connect_from_env(wait=0):
+    """
+    Open a connection using the same DB_* / MYSQL_ROOT_PASSWORD variables as the API,
+    retrying for up to `wait` seconds while the database starts.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            return pymysql.connect(
+                host=os.getenv('DB_HOST', 'localhost').strip(),
+                port=int(os.getenv('DB_PORT', '3306').strip()),
+                user=os.getenv('DB_USER', 'root').strip(),
+                password=os.getenv('MYSQL_ROOT_PASSWORD', '').strip(),
+                database=os.getenv('DB_NAME', 'study_buddy_system').strip(),
+                charset='utf8mb4',
+                cursorclass=cursors.DictCursor,
+            )
+        except pymysql.err.OperationalError as e:
+            if time.monotonic() >= deadline:
+                raise
+            logging.warning(f"Database not ready ({e}); retrying")
+            time.sleep(2)
+
+
+def ensure_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version varchar(16) PRIMARY KEY,
+                name varchar(255) NOT NULL,
+                checksum char(64) NOT NULL,
+                applied_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.commit()
+
+
+def applied_versions(conn):
+    """Return {version: row} for every recorded migration."""
+    ensure_table(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+        return {row['version']: row for row in cursor.fetchall()}
+
+
+def status(conn, versions_dir=VERSIONS_DIR):
+    """Return [(migration, state)] where state is applied, pending or modified."""
+    applied = applied_versions(conn)
+    report = []
+    for migration in discover(versions_dir):
+        row = applied.get(migration.version)
+        if row is None:
+            state = 'pending'
+        elif row['checksum'] != migration.checksum:
+            state = 'modified'
+        else:
+            state = 'applied'
+        report.append((migration, state))
+    return report
+
+
+def apply(conn, migration):
+    with conn.cursor() as cursor:
+        for statement in migration.statements():
+            try:
+                cursor.execute(statement)
+            except pymysql.err.MySQLError as e:
+                if e.args and e.args[0] in _ALREADY_APPLIED_ERRORS:
+                    logging.warning(f"{migration.version}_{migration.name}: skipping, {e.args[1]}")
+                    continue
+                conn.rollback()
+                raise MigrationError(f"{migration.version}_{migration.name} failed on:\n{statement}\n{e}") from e
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (migration.version, migration.name, migration.checksum))
+    conn.commit()
+
+
+def upgrade(conn, versions_dir=VERSIONS_DIR):
+    """Apply every pending migration in order; returns the migrations applied."""
+    done = []
+    for migration, state in status(conn, versions_dir):
+        if state == 'modified':
+            logging.warning(f"Migration {migration.version}_{migration.name} changed after it was applied")
+        if state != 'pending':
+            continue
+        logging.info(f"Applying migration {migration.version}_{migration.name}")
+        apply(conn, migration)
+        done.append(migration)
+    return done
@@ -0,0 +1,52 @@
+"""
+Command line entry point:
+
+    python -m backend.migrations upgrade [--wait SECONDS]
+    python -m backend.migrations status
+    python -m backend.migrations check [--min-rows N]
+"""
+import argparse
+import logging
+import sys
+
+from backend import migrations
+from backend.migrations import hot_queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m backend.migrations')
+    parser.add_argument('command', choices=['upgrade', 'status', 'check'])
+    parser.add_argument('--wait', type=int, default=0,
+                        help='seconds to keep retrying while the database starts')
+    parser.add_argument('--min-rows', type=int, default=hot_queries.DEFAULT_MIN_ROWS,
+                        help='(check) ignore full scans of tables smaller than this')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+
+    conn = migrations.connect_from_env(wait=args.wait)
+    try:
+        if args.command == 'upgrade':
+            applied = migrations.upgrade(conn)
+            print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+            return 0
+
+        if args.command == 'status':
+            report = migrations.status(conn)
+            for migration, state in report:
+                print(f"{migration.version}  {state:<8}  {migration.name}")
+            return 1 if any(state != 'applied' for _, state in report) else 0
+
+        failures = hot_queries.check(conn, min_rows=args.min_rows)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"{len(hot_queries.HOT_QUERIES)} hot queries checked, {len(failures)} full scan(s)")
+        return 1 if failures else 0
+    except migrations.MigrationError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
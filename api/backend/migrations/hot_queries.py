@@ -0,0 +1,102 @@
+#------------------------------------------------------------
+# EXPLAIN-based regression check for the API's hot queries.
+#
+# Each entry mirrors a selective query issued by a route. `check`
+# EXPLAINs them against the live schema and reports any table that is
+# read with a full table scan (access type ALL). Tables whose row
+# estimate is below min_rows are ignored, because MySQL rightly scans
+# tiny tables (like the sample data) instead of using an index.
+#
+#   python -m backend.migrations check [--min-rows N]
+#------------------------------------------------------------
+from backend.user_profile.user_listing import DEFAULT_PAGE_SIZE, page_query
+
+# name -> (function issuing it, SQL, sample parameters). The SQL is copied
+# from that function (tests/test_hot_queries.py checks the copies still
+# match); listing pages are built by the same page_query() the routes call.
+HOT_QUERIES = {
+    'user_matches': (
+        'user_matching/matching_routes.py get_user_matches',
+        """SELECT
+               u.name AS matched_user_name,
+               u.userid AS matched_user_id
+           FROM match_edge e
+           JOIN user u ON u.userid = e.peer_id
+           WHERE e.user_id = %s""",
+        (1,),
+    ),
+    'matched_peers': (
+        'user_profile/profile_routes.py get_potential_matches_for_user',
+        "SELECT peer_id AS userid FROM match_edge WHERE user_id = %s",
+        (1,),
+    ),
+    'course_students': (
+        'user_matching/matching_routes.py find_study_partners',
+        "SELECT DISTINCT matched_student_id AS userid FROM study_session WHERE course_id = %s",
+        (1,),
+    ),
+    'new_study_sessions': (
+        'user_matching/coenrollment.py _fetch_sessions',
+        """SELECT session_id, matched_student_id, course_id
+           FROM study_session
+           WHERE session_id > %s
+           ORDER BY session_id""",
+        (1,),
+    ),
+    'groups_of_student': (
+        'user_profile/profile_routes.py get_user_groups_membership',
+        """SELECT
+               sg.groupid,
+               sg.group_name
+           FROM group_student gs
+           JOIN study_group sg ON gs.groupid = sg.groupid
+           WHERE gs.studentid = %s""",
+        (1,),
+    ),
+    'user_embedding_changes': (
+        'user_matching/ann_index.py sync_index',
+        """SELECT change_id, userid FROM user_embedding_change
+           WHERE change_id > %s OR changed_at >= NOW() - INTERVAL %s SECOND
+           ORDER BY change_id""",
+        (1, 10),
+    ),
+    'users_page': (
+        'user_profile/user_listing.py fetch_users_page',
+        *page_query(DEFAULT_PAGE_SIZE, after=1000),
+    ),
+    'users_page_by_major': (
+        'user_profile/user_listing.py fetch_users_page',
+        *page_query(DEFAULT_PAGE_SIZE, major='Computer Science'),
+    ),
+    'users_page_by_learning_style': (
+        'user_profile/user_listing.py fetch_users_page',
+        *page_query(DEFAULT_PAGE_SIZE, learning_style='Visual'),
+    ),
+    'users_page_by_availability': (
+        'user_profile/user_listing.py fetch_users_page',
+        *page_query(DEFAULT_PAGE_SIZE, availability='weekends'),
+    ),
+}
+
+DEFAULT_MIN_ROWS = 1000
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+    return cursor.fetchall()
+
+
+def check(conn, min_rows=DEFAULT_MIN_ROWS, queries=None):
+    """
+    EXPLAIN every hot query; return a list of failure messages (empty when all
+    of them use an index on every table with at least min_rows rows).
+    """
+    failures = []
+    with conn.cursor() as cursor:
+        for name, (source, sql, params) in (queries or HOT_QUERIES).items():
+            for row in explain(cursor, sql, params):
+                if row.get('type') == 'ALL' and (row.get('rows') or 0) >= min_rows:
+                    failures.append(
+                        f"{name} ({source}): full scan of {row.get('table')} "
+                        f"(~{row.get('rows')} rows, possible keys: {row.get('possible_keys')})")
+    return failures
@@ -0,0 +1,27 @@
+-- Secondary indexes for the hot queries in data_analyst/, user_matching/
+-- and user_profile/. InnoDB appends the primary key to every secondary
+-- index, so e.g. (major) also serves "WHERE major = ? ORDER BY userid".
+
+-- study_session: per-student lookups and MAX(session_date) (retention,
+-- active groups, match success rate, group longevity)
+CREATE INDEX idx_session_student_date ON study_session (matched_student_id, session_date);
+
+-- study_session: per-course student and session counts (course performance)
+CREATE INDEX idx_session_course_student ON study_session (course_id, matched_student_id, session_date);
+
+-- study_session: "last 30 days" filters and monthly trends
+CREATE INDEX idx_session_date ON study_session (session_date, study_type);
+
+-- matched_with: the PK only serves lookups by user1_id; this covers the
+-- user2_id side of every "matches of user X" query
+CREATE INDEX idx_matched_user2 ON matched_with (user2_id, user1_id);
+
+-- matched_with: recent-match windows, ORDER BY match_date and the timeline
+CREATE INDEX idx_matched_date ON matched_with (match_date);
+
+-- group_student: groups of a student (the PK leads with groupid)
+CREATE INDEX idx_group_student_student ON group_student (studentid, groupid);
+
+-- user: listing filters and the major / learning-style distributions
+CREATE INDEX idx_user_major ON user (major, learning_style);
+CREATE INDEX idx_user_learning_style ON user (learning_style);
@@ -0,0 +1,43 @@
+-- Symmetric adjacency list for matched_with.
+--
+-- matched_with stores each match once as (user1_id < user2_id), so
+-- "matches of user X" has to look at both columns (an OR that MySQL
+-- can't serve with one index range). match_edge stores every match in
+-- both directions, so the same lookup is a range scan of its primary
+-- key: WHERE user_id = X. It is kept in sync by the triggers below;
+-- never write to it directly.
+
+CREATE TABLE match_edge (
+    user_id int NOT NULL,
+    peer_id int NOT NULL,
+    match_date timestamp NULL,
+    PRIMARY KEY (user_id, peer_id),
+    KEY idx_match_edge_date (match_date),
+    FOREIGN KEY (user_id) REFERENCES user(userid) ON DELETE CASCADE,
+    FOREIGN KEY (peer_id) REFERENCES user(userid) ON DELETE CASCADE
+);
+
+CREATE TRIGGER matched_with_after_insert AFTER INSERT ON matched_with
+FOR EACH ROW
+    INSERT INTO match_edge (user_id, peer_id, match_date)
+    VALUES (NEW.user1_id, NEW.user2_id, NEW.match_date),
+           (NEW.user2_id, NEW.user1_id, NEW.match_date);
+
+CREATE TRIGGER matched_with_after_update AFTER UPDATE ON matched_with
+FOR EACH ROW
+    UPDATE match_edge
+    SET user_id = IF(user_id = OLD.user1_id, NEW.user1_id, NEW.user2_id),
+        peer_id = IF(peer_id = OLD.user1_id, NEW.user1_id, NEW.user2_id),
+        match_date = NEW.match_date
+    WHERE (user_id, peer_id) IN ((OLD.user1_id, OLD.user2_id), (OLD.user2_id, OLD.user1_id));
+
+CREATE TRIGGER matched_with_after_delete AFTER DELETE ON matched_with
+FOR EACH ROW
+    DELETE FROM match_edge
+    WHERE (user_id, peer_id) IN ((OLD.user1_id, OLD.user2_id), (OLD.user2_id, OLD.user1_id));
+
+-- Backfill existing matches
+INSERT IGNORE INTO match_edge (user_id, peer_id, match_date)
+SELECT user1_id, user2_id, match_date FROM matched_with
+UNION ALL
+SELECT user2_id, user1_id, match_date FROM matched_with;
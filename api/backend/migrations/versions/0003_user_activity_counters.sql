@@ -0,0 +1,78 @@
+-- Per-user activity counters for the analyst histograms.
+--
+-- The matches distribution and retention metrics used to re-count
+-- matched_with, group_student and study_session per user on every
+-- request. user_activity_counters keeps those numbers per user and is
+-- updated by triggers in the same transaction as the write that
+-- changes them (record_new_match, delete_match, join_group,
+-- leave_group, delete_group, the bulk routes, ...), so the histograms
+-- are a GROUP BY over one small table. Never write to it directly.
+
+CREATE TABLE user_activity_counters (
+    userid int PRIMARY KEY,
+    match_count int NOT NULL DEFAULT 0,
+    group_count int NOT NULL DEFAULT 0,
+    session_count int NOT NULL DEFAULT 0,
+    last_session_date date NULL,
+    KEY idx_counters_matches (match_count),
+    KEY idx_counters_last_session (last_session_date),
+    FOREIGN KEY (userid) REFERENCES user(userid) ON DELETE CASCADE
+);
+
+CREATE TRIGGER user_counters_after_insert AFTER INSERT ON user
+FOR EACH ROW
+    INSERT IGNORE INTO user_activity_counters (userid) VALUES (NEW.userid);
+
+CREATE TRIGGER matched_with_counters_after_insert AFTER INSERT ON matched_with
+FOR EACH ROW
+    UPDATE user_activity_counters SET match_count = match_count + 1
+    WHERE userid IN (NEW.user1_id, NEW.user2_id);
+
+CREATE TRIGGER matched_with_counters_after_delete AFTER DELETE ON matched_with
+FOR EACH ROW
+    UPDATE user_activity_counters SET match_count = match_count - 1
+    WHERE userid IN (OLD.user1_id, OLD.user2_id);
+
+CREATE TRIGGER group_student_counters_after_insert AFTER INSERT ON group_student
+FOR EACH ROW
+    UPDATE user_activity_counters SET group_count = group_count + 1
+    WHERE userid = NEW.studentid;
+
+CREATE TRIGGER group_student_counters_after_delete AFTER DELETE ON group_student
+FOR EACH ROW
+    UPDATE user_activity_counters SET group_count = group_count - 1
+    WHERE userid = OLD.studentid;
+
+CREATE TRIGGER study_session_counters_after_insert AFTER INSERT ON study_session
+FOR EACH ROW
+    UPDATE user_activity_counters
+    SET session_count = session_count + 1,
+        last_session_date = GREATEST(COALESCE(last_session_date, NEW.session_date), NEW.session_date)
+    WHERE userid = NEW.matched_student_id;
+
+CREATE TRIGGER study_session_counters_after_update AFTER UPDATE ON study_session
+FOR EACH ROW
+    UPDATE user_activity_counters c
+    SET c.session_count = c.session_count
+            + (c.userid = NEW.matched_student_id) - (c.userid = OLD.matched_student_id),
+        c.last_session_date = (SELECT MAX(ss.session_date) FROM study_session ss
+                               WHERE ss.matched_student_id = c.userid)
+    WHERE c.userid IN (OLD.matched_student_id, NEW.matched_student_id);
+
+CREATE TRIGGER study_session_counters_after_delete AFTER DELETE ON study_session
+FOR EACH ROW
+    UPDATE user_activity_counters c
+    SET c.session_count = c.session_count - 1,
+        c.last_session_date = (SELECT MAX(ss.session_date) FROM study_session ss
+                               WHERE ss.matched_student_id = c.userid)
+    WHERE c.userid = OLD.matched_student_id;
+
+-- Backfill every existing user (after the triggers exist, so no write is missed)
+INSERT IGNORE INTO user_activity_counters (userid, match_count, group_count, session_count, last_session_date)
+SELECT
+    u.userid,
+    (SELECT COUNT(*) FROM match_edge e WHERE e.user_id = u.userid),
+    (SELECT COUNT(*) FROM group_student gs WHERE gs.studentid = u.userid),
+    (SELECT COUNT(*) FROM study_session ss WHERE ss.matched_student_id = u.userid),
+    (SELECT MAX(ss.session_date) FROM study_session ss WHERE ss.matched_student_id = u.userid)
+FROM user u;
@@ -0,0 +1,10 @@
+-- Weekly availability as a 168-bit slot bitmask (one bit per hour of
+-- the week, Monday 00:00 first), parsed from the free-text
+-- user.availability by backend/user_matching/availability.py.
+--
+-- The API writes it on registration and profile updates. Rows without
+-- a mask (existing users, rows inserted by plain SQL) are parsed from
+-- their text when the matching code loads them, so no backfill is
+-- needed here; parsing can't be expressed in SQL anyway.
+
+ALTER TABLE user ADD COLUMN availability_mask BINARY(21) NULL AFTER availability;
@@ -0,0 +1,17 @@
+-- Per-user learning style percentages.
+--
+-- 02_sample_data.sql, the ANN index (user_matching/ann_index.py) and
+-- the learning-style feature store read and write this table, but
+-- 01_study_buddy.sql never created it, so on a database built from the
+-- repo's own files those queries failed with "table doesn't exist".
+-- Users without a row fall back to the default distribution for their
+-- learning_style.
+
+CREATE TABLE IF NOT EXISTS learning_style_distribution (
+    userid int PRIMARY KEY,
+    visual_percentage decimal(5,2) NOT NULL,
+    auditory_percentage decimal(5,2) NOT NULL,
+    reading_writing_percentage decimal(5,2) NOT NULL,
+    kinesthetic_percentage decimal(5,2) NOT NULL,
+    FOREIGN KEY (userid) REFERENCES user(userid) ON DELETE CASCADE
+);
@@ -0,0 +1,21 @@
+-- Tables behind the analytics snapshots and cross-worker response
+-- cache invalidation.
+--
+-- Both were only added to database-files/01_study_buddy.sql, which
+-- runs on a fresh volume only, so existing databases never got them:
+-- the snapshot routes failed and the response cache logged an error on
+-- every write and sync, leaving cross-worker invalidation off.
+-- IF NOT EXISTS keeps this a no-op on databases built from that file.
+
+-- Pre-computed analytics payloads (api/backend/data_analyst/snapshots.py)
+CREATE TABLE IF NOT EXISTS analytics_snapshot (
+    metric_key varchar(64) PRIMARY KEY,
+    payload json NOT NULL,
+    computed_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-table version counters for the response cache (api/backend/response_cache)
+CREATE TABLE IF NOT EXISTS cache_tag_version (
+    tag varchar(64) PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0
+);
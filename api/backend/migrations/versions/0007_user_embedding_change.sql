@@ -0,0 +1,51 @@
+-- Change log for the ANN index (api/backend/user_matching/ann_index.py).
+--
+-- Every API worker keeps its own copy of the index. The triggers below
+-- log the id of every user whose embedding inputs change (profile
+-- fields, interests, learning-style distribution, deletion), whoever
+-- made the write: any worker, an admin route or plain SQL. Workers
+-- poll this table and re-embed just those users. Rows older than two
+-- index rebuild periods are pruned by the workers; never write to it
+-- directly.
+
+CREATE TABLE IF NOT EXISTS user_embedding_change (
+    change_id bigint AUTO_INCREMENT PRIMARY KEY,
+    userid int NOT NULL,
+    changed_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_user_embedding_change_time (changed_at)
+);
+
+CREATE TRIGGER user_embedding_after_insert AFTER INSERT ON user
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (NEW.userid);
+
+CREATE TRIGGER user_embedding_after_update AFTER UPDATE ON user
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid)
+    SELECT NEW.userid FROM DUAL
+    WHERE NOT (NEW.major <=> OLD.major AND NEW.learning_style <=> OLD.learning_style
+               AND NEW.availability <=> OLD.availability);
+
+CREATE TRIGGER user_embedding_after_delete AFTER DELETE ON user
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (OLD.userid);
+
+CREATE TRIGGER user_interests_embedding_after_insert AFTER INSERT ON user_interests
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (NEW.userid);
+
+CREATE TRIGGER user_interests_embedding_after_delete AFTER DELETE ON user_interests
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (OLD.userid);
+
+CREATE TRIGGER distribution_embedding_after_insert AFTER INSERT ON learning_style_distribution
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (NEW.userid);
+
+CREATE TRIGGER distribution_embedding_after_update AFTER UPDATE ON learning_style_distribution
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (NEW.userid);
+
+CREATE TRIGGER distribution_embedding_after_delete AFTER DELETE ON learning_style_distribution
+FOR EACH ROW
+    INSERT INTO user_embedding_change (userid) VALUES (OLD.userid);
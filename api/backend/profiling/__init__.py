@@ -0,0 +1,439 @@
+#------------------------------------------------------------
+# Request-level profiling of routes and their SQL.
+#
+# init_app(app) makes db.get_db() hand out a connection whose cursors
+# time every execute()/executemany(). Each statement is recorded under
+# its fingerprint (the SQL with literals and parameters replaced by ?)
+# and attributed to the Flask endpoint that issued it; each request is
+# recorded with its total time, SQL time and statement count.
+#
+# Latencies are kept in a window of the last PROFILING_WINDOW samples
+# per route and per query, from which p50/p95/p99 are computed. Each
+# worker process collects its own stats; with PROFILING_SHARED_DIR set
+# (as gunicorn.conf.py does) they are merged across workers (see
+# shared.py) and served by
+#
+#   GET /admin/metrics   JSON, slowest routes and queries first
+#   GET /metrics         Prometheus text exposition format
+#
+# Statements slower than SLOW_QUERY_MS are also captured with their
+# plan by slow_queries.slow_log.
+#------------------------------------------------------------
+import collections
+import contextvars
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from pymysql import cursors
+
+from backend.profiling import shared
+from backend.profiling.slow_queries import slow_log
+
+ENABLED = os.getenv('PROFILING_ENABLED', '1').strip().lower() not in ('0', 'false', 'no')
+WINDOW = int(os.getenv('PROFILING_WINDOW', '1024'))
+
+# Statements issued outside a request (background jobs, CLI)
+BACKGROUND_ENDPOINT = '<background>'
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER = re.compile(r'(?<![\w`])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s')
+_COMMENT = re.compile(r'/\*.*?\*/|--[^\n]*|#[^\n]*', re.S)
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.I)
+_ROW_LIST = re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)(?:\s*,\s*\((?:\s*\?\s*,)*\s*\?\s*\))+')
+
+
+def fingerprint(sql):
+    """
+    Normalise a statement so every execution of the same query shares one key:
+    comments dropped, literals and placeholders replaced by ?, IN lists and
+    multi-row VALUES collapsed, whitespace squeezed.
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    sql = _COMMENT.sub(' ', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    sql = _IN_LIST.sub('IN (?+)', sql)
+    sql = _ROW_LIST.sub('(...)+', sql)
+    return sql
+
+
+def fingerprint_id(fp):
+    return hashlib.sha1(fp.encode('utf-8')).hexdigest()[:12]
+
+
+class LatencyWindow:
+    """Running totals plus the most recent `size` latencies, for percentiles."""
+
+    def __init__(self, size=WINDOW):
+        self.samples = collections.deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+
+    def add(self, seconds, rows=0, error=False):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += max(rows or 0, 0)
+        if error:
+            self.errors += 1
+
+    def percentiles(self):
+        latencies = sorted(self.samples)
+
+        def pct(p):
+            return latencies[int(p * (len(latencies) - 1))] if latencies else 0.0
+
+        return {'p50': pct(0.50), 'p95': pct(0.95), 'p99': pct(0.99)}
+
+    def state(self):
+        """JSON-serialisable copy, for merging across worker processes."""
+        return {'samples': [round(s, 6) for s in self.samples], 'count': self.count,
+                'total': self.total, 'max': self.max, 'rows': self.rows, 'errors': self.errors}
+
+    def merge(self, state, samples=True):
+        """Add another window's state; samples=False keeps only the totals."""
+        if samples:
+            self.samples.extend(state['samples'])
+        self.count += state['count']
+        self.total += state['total']
+        self.max = max(self.max, state['max'])
+        self.rows += state['rows']
+        self.errors += state['errors']
+
+    def to_dict(self):
+        ms = {k: round(v * 1000, 3) for k, v in self.percentiles().items()}
+        ms['avg'] = round(self.total / self.count * 1000, 3) if self.count else 0.0
+        ms['max'] = round(self.max * 1000, 3)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total * 1000, 3),
+            'latency_ms': ms,
+        }
+
+
+class Profiler:
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._routes = {}     # endpoint -> {'request', 'sql': LatencyWindow, 'statements': int, 'statuses': Counter}
+        self._queries = {}    # fingerprint -> {'stats': LatencyWindow, 'endpoints': Counter}
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def _route(self, endpoint):
+        route = self._routes.get(endpoint)
+        if route is None:
+            route = self._routes[endpoint] = {
+                'request': LatencyWindow(self.window),
+                'sql': LatencyWindow(self.window),
+                'statements': 0,
+                'statuses': collections.Counter(),
+            }
+        return route
+
+    def record_query(self, endpoint, sql, seconds, rows, error=False):
+        fp = fingerprint(sql)
+        with self._lock:
+            query = self._queries.get(fp)
+            if query is None:
+                query = self._queries[fp] = {
+                    'stats': LatencyWindow(self.window),
+                    'endpoints': collections.Counter(),
+                }
+            query['stats'].add(seconds, rows, error)
+            query['endpoints'][endpoint] += 1
+            if endpoint == BACKGROUND_ENDPOINT:
+                route = self._route(endpoint)
+                route['sql'].add(seconds, rows, error)
+                route['statements'] += 1
+        return fp
+
+    def record_request(self, endpoint, status, seconds, sql_seconds, sql_rows, statements):
+        with self._lock:
+            route = self._route(endpoint)
+            route['request'].add(seconds, error=status >= 500)
+            route['sql'].add(sql_seconds, sql_rows)
+            route['statements'] += statements
+            route['statuses'][str(status)] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._queries.clear()
+            self._started = time.time()
+
+    @property
+    def started(self):
+        return self._started
+
+    def state(self):
+        """JSON-serialisable copy of every stat (see profiling/shared.py)."""
+        with self._lock:
+            return {
+                'since': self._started,
+                'routes': {endpoint: {'request': route['request'].state(), 'sql': route['sql'].state(),
+                                      'statements': route['statements'], 'statuses': dict(route['statuses'])}
+                           for endpoint, route in self._routes.items()},
+                'queries': {fp: {'stats': query['stats'].state(), 'endpoints': dict(query['endpoints'])}
+                            for fp, query in self._queries.items()},
+            }
+
+    def merge_state(self, state, samples=True):
+        """Add the stats of another profiler's state(); samples=False keeps only the totals."""
+        with self._lock:
+            self._started = min(self._started, state['since'])
+            for endpoint, other in state['routes'].items():
+                route = self._route(endpoint)
+                route['request'].merge(other['request'], samples)
+                route['sql'].merge(other['sql'], samples)
+                route['statements'] += other['statements']
+                route['statuses'].update(other['statuses'])
+            for fp, other in state['queries'].items():
+                query = self._queries.get(fp)
+                if query is None:
+                    query = self._queries[fp] = {
+                        'stats': LatencyWindow(self.window),
+                        'endpoints': collections.Counter(),
+                    }
+                query['stats'].merge(other['stats'], samples)
+                query['endpoints'].update(other['endpoints'])
+
+    def snapshot(self):
+        """Per-route and per-query stats, slowest (by p95) first."""
+        with self._lock:
+            routes = []
+            for endpoint, route in self._routes.items():
+                entry = {'endpoint': endpoint}
+                entry.update(route['request'].to_dict())
+                entry['statuses'] = dict(route['statuses'])
+                entry['sql'] = route['sql'].to_dict()
+                entry['sql']['statements'] = route['statements']
+                routes.append(entry)
+            queries = []
+            for fp, query in self._queries.items():
+                entry = {'id': fingerprint_id(fp), 'fingerprint': fp}
+                entry.update(query['stats'].to_dict())
+                entry['endpoints'] = dict(query['endpoints'].most_common())
+                queries.append(entry)
+            since = self._started
+        routes.sort(key=lambda r: r['latency_ms']['p95'], reverse=True)
+        queries.sort(key=lambda q: q['latency_ms']['p95'], reverse=True)
+        return {
+            'pid': os.getpid(),
+            'since': since,
+            'window': self.window,
+            'routes': routes,
+            'queries': queries,
+        }
+
+    def prometheus(self):
+        """Render the stats in the Prometheus text exposition format."""
+        with self._lock:
+            routes = [(e, r['request'], r['sql'], dict(r['statuses'])) for e, r in self._routes.items()]
+            routes = [(e, _copy(req), _copy(sql), st) for e, req, sql, st in routes]
+            queries = [(fp, _copy(q['stats'])) for fp, q in self._queries.items()]
+
+        lines = []
+
+        def summary(name, help_text, series):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} summary')
+            for labels, stats in series:
+                for q, value in zip(('0.5', '0.95', '0.99'), stats.percentiles().values()):
+                    lines.append(f'{name}{{{_labels(labels, quantile=q)}}} {value:.6f}')
+                lines.append(f'{name}_sum{{{_labels(labels)}}} {stats.total:.6f}')
+                lines.append(f'{name}_count{{{_labels(labels)}}} {stats.count}')
+
+        summary('studybuddy_request_duration_seconds', 'Request latency by Flask endpoint.',
+                [({'endpoint': e}, req) for e, req, _, _ in routes if req.count])
+        summary('studybuddy_request_sql_duration_seconds', 'Time spent in SQL per request by Flask endpoint.',
+                [({'endpoint': e}, sql) for e, _, sql, _ in routes])
+        summary('studybuddy_query_duration_seconds', 'Statement latency by query fingerprint.',
+                [({'query_id': fingerprint_id(fp), 'query': fp[:200]}, stats) for fp, stats in queries])
+
+        lines.append('# HELP studybuddy_requests_total Requests by Flask endpoint and status code.')
+        lines.append('# TYPE studybuddy_requests_total counter')
+        for endpoint, _, _, statuses in routes:
+            for status, count in sorted(statuses.items()):
+                lines.append(f'studybuddy_requests_total{{{_labels({"endpoint": endpoint, "status": status})}}} {count}')
+
+        lines.append('# HELP studybuddy_query_rows_total Rows returned or affected by query fingerprint.')
+        lines.append('# TYPE studybuddy_query_rows_total counter')
+        for fp, stats in queries:
+            lines.append(f'studybuddy_query_rows_total{{{_labels({"query_id": fingerprint_id(fp)})}}} {stats.rows}')
+
+        lines.append('# HELP studybuddy_query_errors_total Failed statements by query fingerprint.')
+        lines.append('# TYPE studybuddy_query_errors_total counter')
+        for fp, stats in queries:
+            lines.append(f'studybuddy_query_errors_total{{{_labels({"query_id": fingerprint_id(fp)})}}} {stats.errors}')
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(stats):
+    clone = LatencyWindow(stats.samples.maxlen)
+    clone.samples.extend(stats.samples)
+    clone.count, clone.total, clone.max = stats.count, stats.total, stats.max
+    clone.rows, clone.errors = stats.rows, stats.errors
+    return clone
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    labels = dict(labels, **extra)
+    return ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+profiler = Profiler()
+
+
+def current_endpoint():
+    if has_request_context():
+        return request.endpoint or '<unmatched>'
+    return BACKGROUND_ENDPOINT
+
+
+# Per-task [seconds, rows, statements] for statements run on helper threads
+# (see data_analyst/query_batch.py); None means add to the request's totals
+_task_sql_totals = contextvars.ContextVar('task_sql_totals', default=None)
+
+
+def start_task_sql_totals():
+    """
+    Collect this context's SQL time/rows/statements in a private list instead of
+    the request's g._profile_sql, which concurrent threads would race on. Call it
+    inside a copied context and hand the list to add_request_sql_totals() later.
+    """
+    totals = [0.0, 0, 0]
+    _task_sql_totals.set(totals)
+    return totals
+
+
+def add_request_sql_totals(totals):
+    """Add [seconds, rows, statements] to the current request's SQL totals."""
+    if has_request_context() and '_profile_sql' in g:
+        for i, value in enumerate(totals):
+            g._profile_sql[i] += value
+
+
+class ProfiledCursor:
+    """Cursor proxy that times execute()/executemany() and records them."""
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def _timed(self, method, sql, args):
+        started = time.perf_counter()
+        error = True
+        try:
+            result = method(sql, args)
+            error = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            # rowcount is rows fetched for buffered SELECTs and rows affected for
+            # writes. Unbuffered (SS) cursors don't know it yet and PyMySQL reports
+            # 2**64 - 1 for them, so their row count is recorded as unknown (0)
+            rows = 0
+            if not error and not isinstance(self._cursor, cursors.SSCursor):
+                rowcount = self._cursor.rowcount or 0
+                rows = rowcount if 0 < rowcount < 2 ** 63 else 0
+            endpoint = current_endpoint()
+            fp = self._profiler.record_query(endpoint, sql, elapsed, rows, error)
+            if not error:
+                in_request = has_request_context()
+                try:
+                    slow_log.maybe_record(self._cursor, fp, sql, args, elapsed, rows, endpoint,
+                                          request.path if in_request else None,
+                                          request.method if in_request else None)
+                except Exception as e:
+                    logging.error(f"Could not record slow query: {e}")
+            task_totals = _task_sql_totals.get()
+            if task_totals is not None:
+                task_totals[0] += elapsed
+                task_totals[1] += rows
+                task_totals[2] += 1
+            else:
+                add_request_sql_totals((elapsed, rows, 1))
+
+    def execute(self, query, args=None):
+        return self._timed(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed(self._cursor.executemany, query, args)
+
+
+class ProfiledConnection:
+    """Connection proxy whose cursor() returns ProfiledCursor objects."""
+
+    def __init__(self, conn, profiler):
+        self._conn = conn
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs), self._profiler)
+
+
+def _before_request():
+    g._profile_started = time.perf_counter()
+    g._profile_sql = [0.0, 0, 0]   # seconds, rows, statements
+
+
+def _after_request(response):
+    started = g.pop('_profile_started', None)
+    if started is not None:
+        sql_seconds, sql_rows, statements = g.pop('_profile_sql', (0.0, 0, 0))
+        profiler.record_request(request.endpoint or '<unmatched>', response.status_code,
+                                time.perf_counter() - started, sql_seconds, sql_rows, statements)
+        shared.flush(profiler)
+    return response
+
+
+def prometheus_metrics():
+    view, _ = shared.profiler_view(profiler)
+    return Response(view.prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app, db):
+    """Profile every request and every statement run through db.get_db()."""
+    app.config.setdefault('PROFILING_ENABLED', ENABLED)
+    if not app.config['PROFILING_ENABLED']:
+        return
+    db.wrap_connection = lambda conn: ProfiledConnection(conn, profiler)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'prometheus_metrics', prometheus_metrics, methods=['GET'])
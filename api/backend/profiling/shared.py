@@ -0,0 +1,210 @@
+#------------------------------------------------------------
+# Server-wide view of the profiling stats and slow-query buffer.
+#
+# Under gunicorn every worker process has its own Profiler and
+# SlowQueryLog, and a request for /metrics, /admin/metrics or
+# /admin/slow-queries reaches whichever worker accepts it. With
+# PROFILING_SHARED_DIR set (gunicorn.conf.py points it at a fresh
+# directory for each server), each worker writes its state to
+# worker-<pid>.json in that directory, at most every
+# PROFILING_FLUSH_SECONDS after a request. The read routes merge every
+# worker's file, so any worker answers for the whole server:
+#
+# - counters and sums are added up and latency windows concatenated;
+# - when a worker exits (max_requests recycling, a crash) the gunicorn
+#   master folds its totals into retired.json, so counters never go
+#   backwards between scrapes;
+# - a reset (or a slow-query clear) writes its time to resets.json.
+#   Every worker drops its own stats at its next flush, and files
+#   written before the reset are ignored until then.
+#
+# Without PROFILING_SHARED_DIR (flask run, a single process) the views
+# are just this process's profiler and slow log.
+#------------------------------------------------------------
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from backend.profiling.slow_queries import SlowQueryLog, slow_log
+
+FLUSH_SECONDS = float(os.getenv('PROFILING_FLUSH_SECONDS', '1'))
+
+_flushed_at = 0.0
+_flush_lock = threading.Lock()
+
+
+def shared_dir():
+    """The directory shared by all workers, or None when stats are per process."""
+    return os.getenv('PROFILING_SHARED_DIR') or None
+
+
+def _path(name):
+    return os.path.join(shared_dir(), name)
+
+
+def _read(path, default=None):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write(path, data):
+    """Write JSON to a temporary file and rename it over path, so readers never see half a file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _resets():
+    return _read(_path('resets.json'), {'metrics': 0.0, 'slow_queries': 0.0})
+
+
+def _record_reset(kind):
+    resets = _resets()
+    resets[kind] = time.time()
+    _write(_path('resets.json'), resets)
+    return resets
+
+
+def flush(profiler, force=False):
+    """Write this worker's state to the shared directory (at most every FLUSH_SECONDS unless forced)."""
+    global _flushed_at
+    if shared_dir() is None:
+        return
+    with _flush_lock:
+        if not force and time.monotonic() - _flushed_at < FLUSH_SECONDS:
+            return
+        _flushed_at = time.monotonic()
+        try:
+            # Apply resets requested through another worker before publishing
+            resets = _resets()
+            if resets['metrics'] > profiler.started:
+                profiler.reset()
+            if resets['slow_queries'] > slow_log.cleared_at:
+                slow_log.clear()
+            _write(_path(f'worker-{os.getpid()}.json'),
+                   {'pid': os.getpid(), 'profile': profiler.state(), 'slow_queries': slow_log.state()})
+        except Exception as e:
+            logging.error(f"Could not write profiling stats to {shared_dir()}: {e}")
+
+
+def _states():
+    """(worker states, retired state, resets) currently in the shared directory."""
+    states = []
+    for path in glob.glob(_path('worker-*.json')):
+        try:
+            state = _read(path)
+        except ValueError:
+            continue
+        if state is not None:
+            states.append(state)
+    return states, _read(_path('retired.json')), _resets()
+
+
+def profiler_view(profiler):
+    """
+    Return (profiler, pids): a Profiler holding the stats of every worker (and of
+    retired ones) and the pids of the live workers merged into it. Without a
+    shared directory that is just this process's profiler.
+    """
+    from backend.profiling import Profiler
+
+    if shared_dir() is None:
+        return profiler, [os.getpid()]
+    flush(profiler, force=True)
+    states, retired, resets = _states()
+    states = [s for s in states if s['profile']['since'] >= resets['metrics']]
+    merged = Profiler(window=profiler.window * max(len(states), 1))
+    for state in states:
+        merged.merge_state(state['profile'])
+    if retired is not None and retired['profile']['since'] >= resets['metrics']:
+        merged.merge_state(retired['profile'], samples=False)
+    return merged, sorted(s['pid'] for s in states)
+
+
+def slow_log_view():
+    """A SlowQueryLog holding every worker's buffered slow queries, newest kept."""
+    if shared_dir() is None:
+        return slow_log
+    from backend.profiling import profiler
+    flush(profiler, force=True)
+    states, retired, resets = _states()
+    merged = SlowQueryLog(threshold_ms=slow_log.threshold_ms,
+                          size=slow_log.stats()['buffer_size'] * max(len(states), 1),
+                          explain_interval=slow_log.explain_interval)
+    for state in states + ([retired] if retired is not None else []):
+        merged.merge_state(state['slow_queries'], since=resets['slow_queries'])
+    return merged
+
+
+def reset_profiler(profiler):
+    """Clear the profiling stats of this worker and (through the shared directory) every other one."""
+    profiler.reset()
+    if shared_dir() is not None:
+        _record_reset('metrics')
+        flush(profiler, force=True)
+
+
+def clear_slow_log():
+    """Clear the slow-query buffer of this worker and (through the shared directory) every other one."""
+    slow_log.clear()
+    if shared_dir() is not None:
+        from backend.profiling import profiler
+        _record_reset('slow_queries')
+        flush(profiler, force=True)
+
+
+def start_server():
+    """Drop stats left in the shared directory by a previous server (run by the gunicorn master)."""
+    if shared_dir() is None:
+        return
+    os.makedirs(shared_dir(), exist_ok=True)
+    for path in glob.glob(_path('*.json')):
+        os.unlink(path)
+
+
+def retire_worker(pid):
+    """
+    Fold an exited worker's file into retired.json (run by the gunicorn master).
+    Its totals and counters are kept; its latency samples and older slow queries are not.
+    """
+    from backend.profiling import Profiler
+
+    if shared_dir() is None:
+        return
+    path = _path(f'worker-{pid}.json')
+    try:
+        state = _read(path)
+        if state is None:
+            return
+        resets = _resets()
+        retired = _read(_path('retired.json'))
+        if retired is None or retired['profile']['since'] < resets['metrics']:
+            retired = {'profile': Profiler(window=0).state(), 'slow_queries': {'entries': [], 'recorded': 0}}
+
+        profile = Profiler(window=0)
+        profile.merge_state(retired['profile'], samples=False)
+        if state['profile']['since'] >= resets['metrics']:
+            profile.merge_state(state['profile'], samples=False)
+        slow = SlowQueryLog(size=slow_log.stats()['buffer_size'])
+        slow.merge_state(retired['slow_queries'], since=resets['slow_queries'])
+        slow.merge_state(state['slow_queries'], since=resets['slow_queries'])
+
+        _write(_path('retired.json'), {'profile': profile.state(), 'slow_queries': slow.state()})
+        os.unlink(path)
+    except Exception as e:
+        logging.error(f"Could not retire profiling stats of worker {pid}: {e}")
@@ -0,0 +1,217 @@
+#------------------------------------------------------------
+# Slow-query recorder.
+#
+# ProfiledCursor hands every statement that took at least
+# SLOW_QUERY_MS to `slow_log.maybe_record`. The entry keeps the query
+# fingerprint, the bound parameters (redacted, see redact_params), the
+# endpoint and path that issued it, and the plan from
+# EXPLAIN FORMAT=JSON, run on the same connection right after the slow
+# statement. Plans are sampled: each fingerprint is EXPLAINed at most
+# once every SLOW_QUERY_EXPLAIN_INTERVAL seconds and later entries reuse
+# that plan, so a slow hot query doesn't double its own load.
+#
+# Entries live in a ring buffer of SLOW_QUERY_BUFFER items per worker
+# process, served by GET /admin/slow-queries.
+#------------------------------------------------------------
+import collections
+import datetime
+import decimal
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from pymysql import cursors
+
+THRESHOLD_MS = float(os.getenv('SLOW_QUERY_MS', '250'))
+BUFFER_SIZE = int(os.getenv('SLOW_QUERY_BUFFER', '200'))
+EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', '60'))
+
+# Parameters bound to columns whose name matches this are never recorded
+SENSITIVE_COLUMNS = re.compile(r'pass|secret|token|email|phone', re.I)
+MAX_PARAM_LENGTH = 64
+MAX_PARAMS = 50
+
+_EXPLAINABLE = re.compile(r'^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b', re.I)
+_PLACEHOLDER = re.compile(r'%\((\w+)\)s|%s')
+_COMPARED_COLUMN = re.compile(r'`?(\w+)`?\s*(?:=|<>|!=|<=|>=|<|>|\bLIKE|\bIN\s*\()\s*(?:\(\s*)?$', re.I)
+_INSERT_COLUMNS = re.compile(r'^\s*(?:INSERT|REPLACE)\b[^(]*\(([^)]*)\)\s*VALUES', re.I)
+
+
+def _param_columns(sql):
+    """Best-effort column name for each positional %s in sql (None when unknown)."""
+    insert = _INSERT_COLUMNS.match(sql)
+    insert_columns = [c.strip(' `') for c in insert.group(1).split(',')] if insert else []
+    values_at = insert.end() if insert else None
+    names = []
+    for match in _PLACEHOLDER.finditer(sql):
+        if match.group(1):
+            continue
+        if values_at is not None and match.start() >= values_at and insert_columns:
+            in_values = sum(1 for m in _PLACEHOLDER.finditer(sql, values_at, match.start()))
+            names.append(insert_columns[in_values % len(insert_columns)])
+            continue
+        column = _COMPARED_COLUMN.search(sql[max(0, match.start() - 80):match.start()])
+        names.append(column.group(1) if column else None)
+    return names
+
+
+def _safe_value(value, column=None):
+    if column and SENSITIVE_COLUMNS.search(column):
+        return '<redacted>'
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.timedelta)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return f'<{len(value)} bytes>'
+    if isinstance(value, (list, tuple, set)):
+        return [_safe_value(v, column) for v in list(value)[:MAX_PARAMS]]
+    value = str(value)
+    return value if len(value) <= MAX_PARAM_LENGTH else value[:MAX_PARAM_LENGTH] + '...'
+
+
+def redact_params(sql, args):
+    """
+    JSON-safe copy of a statement's parameters. Values bound to a column
+    matching SENSITIVE_COLUMNS are replaced by '<redacted>', long strings are
+    truncated and long lists cut to MAX_PARAMS.
+    """
+    if args is None:
+        return None
+    if isinstance(args, dict):
+        return {k: _safe_value(v, k) for k, v in args.items()}
+    if not isinstance(args, (list, tuple)):
+        args = (args,)
+    names = _param_columns(sql)
+    return [_safe_value(v, names[i] if i < len(names) else None)
+            for i, v in enumerate(args[:MAX_PARAMS])]
+
+
+def explain(conn, sql, args):
+    """EXPLAIN FORMAT=JSON the statement on conn; returns the parsed plan."""
+    cursor = conn.cursor(cursors.Cursor)
+    try:
+        cursor.execute("EXPLAIN FORMAT=JSON " + sql, args)
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+
+    def __init__(self, threshold_ms=THRESHOLD_MS, size=BUFFER_SIZE, explain_interval=EXPLAIN_INTERVAL):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self._entries = collections.deque(maxlen=size)
+        self._plans = {}          # fingerprint -> (explained_at, plan, error)
+        self._recorded = 0
+        self._cleared_at = 0.0
+        self._lock = threading.Lock()
+
+    def _plan(self, cursor, fp, sql, args):
+        """Return (plan, error, sampled_at), EXPLAINing only when the sampled plan is stale."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._plans.get(fp)
+            if cached and now - cached[0] < self.explain_interval:
+                return cached[1], cached[2], cached[3]
+            # Claim the slot so concurrent slow runs of this query don't all EXPLAIN
+            self._plans[fp] = (now, None, 'explain in progress', time.time())
+
+        plan, error = None, None
+        if isinstance(cursor, cursors.SSCursor):
+            # The unbuffered result is still on the wire; the connection can't run EXPLAIN yet
+            error = 'not explained: unbuffered cursor'
+        elif not _EXPLAINABLE.match(sql):
+            error = 'not explainable'
+        else:
+            try:
+                plan = explain(cursor.connection, sql, args)
+            except Exception as e:
+                error = f'EXPLAIN failed: {e}'
+        sampled_at = time.time()
+        with self._lock:
+            self._plans[fp] = (now, plan, error, sampled_at)
+        return plan, error, sampled_at
+
+    def maybe_record(self, cursor, fp, sql, args, elapsed, rows, endpoint, path=None, method=None):
+        """Record the statement if it took at least threshold_ms."""
+        duration_ms = elapsed * 1000
+        if self.threshold_ms < 0 or duration_ms < self.threshold_ms:
+            return None
+        if isinstance(sql, bytes):
+            sql = sql.decode('utf-8', 'replace')
+        try:
+            params = redact_params(sql, args)
+        except Exception:
+            params = '<unavailable>'
+        plan, plan_error, plan_sampled_at = self._plan(cursor, fp, sql, args)
+        entry = {
+            'at': time.time(),
+            'duration_ms': round(duration_ms, 3),
+            'rows': rows,
+            'endpoint': endpoint,
+            'method': method,
+            'path': path,
+            'fingerprint': fp,
+            'params': params,
+            'plan': plan,
+            'plan_error': plan_error,
+            'plan_sampled_at': plan_sampled_at,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._recorded += 1
+        logging.warning(f"Slow query ({duration_ms:.0f} ms) in {endpoint}: {fp[:200]}")
+        return entry
+
+    def entries(self, limit=None, endpoint=None):
+        """Newest first, optionally filtered by endpoint."""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        if endpoint:
+            entries = [e for e in entries if e['endpoint'] == endpoint]
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+            self._cleared_at = time.time()
+
+    @property
+    def cleared_at(self):
+        return self._cleared_at
+
+    def state(self):
+        """JSON-serialisable copy of the buffer (see profiling/shared.py)."""
+        with self._lock:
+            return {'entries': list(self._entries), 'recorded': self._recorded}
+
+    def merge_state(self, state, since=0.0):
+        """Add another buffer's entries recorded at or after since, keeping the newest."""
+        with self._lock:
+            entries = list(self._entries) + [e for e in state['entries'] if e['at'] >= since]
+            entries.sort(key=lambda e: e['at'])
+            self._entries.clear()
+            self._entries.extend(entries)
+            self._recorded += state['recorded']
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threshold_ms': self.threshold_ms,
+                'buffer_size': self._entries.maxlen,
+                'buffered': len(self._entries),
+                'recorded': self._recorded,
+                'explain_interval_seconds': self.explain_interval,
+            }
+
+
+slow_log = SlowQueryLog()
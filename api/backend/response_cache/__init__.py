@@ -0,0 +1,190 @@
+#------------------------------------------------------------
+# Server-side response cache for read-heavy GET routes.
+#
+# Routes opt in with @cache.cached(tags=...), naming the tables their
+# response is built from. Write routes use @cache.invalidates(...) (or
+# call cache.invalidate directly) with the tables they modify, which
+# drops every cached response carrying one of those tags.
+#
+# Each worker process has its own in-memory TTL + LRU cache. So that a
+# write handled by one worker also invalidates the others, every
+# invalidation bumps a per-tag version in the cache_tag_version table;
+# workers poll it at most every RESPONSE_CACHE_SYNC_SECONDS and drop
+# entries whose tags have moved on.
+#
+# A response is only stored if none of its tags were invalidated while
+# the view was computing it, so a GET that raced a write never caches
+# the pre-write data.
+#------------------------------------------------------------
+import collections
+import functools
+import logging
+import os
+import threading
+import time
+
+from flask import request, make_response, Response
+
+from backend.db_connection import db
+
+DEFAULT_TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL', '60'))
+MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024'))
+SYNC_SECONDS = float(os.getenv('RESPONSE_CACHE_SYNC_SECONDS', '1'))
+
+_Entry = collections.namedtuple('_Entry', 'body status mimetype expires_at tags')
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES, default_ttl=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = collections.OrderedDict()   # key -> _Entry, oldest first
+        self._keys_by_tag = collections.defaultdict(set)
+        self._tag_versions = {}
+        self._generations = collections.Counter()   # tag -> local invalidation count
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry.tags:
+                self._keys_by_tag[tag].discard(key)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generations(self, tags):
+        """Local invalidation counts of these tags, to pass back to set()."""
+        with self._lock:
+            return tuple(self._generations[tag] for tag in tags)
+
+    def set(self, key, body, status, mimetype, ttl, tags, generations=None):
+        """
+        Store a response. With generations (from generations() taken before the
+        response was computed), nothing is stored if any tag was invalidated since;
+        returns whether the entry was stored.
+        """
+        with self._lock:
+            if generations is not None and generations != tuple(self._generations[tag] for tag in tags):
+                return False
+            self._drop(key)
+            self._entries[key] = _Entry(body, status, mimetype, time.monotonic() + ttl, tuple(tags))
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            return True
+
+    def _invalidate_local(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+                for key in list(self._keys_by_tag.pop(tag, ())):
+                    self._drop(key)
+
+    def invalidate(self, *tags):
+        """Drop cached responses for these table tags here and (via MySQL) in other workers."""
+        self._invalidate_local(tags)
+        try:
+            conn = db.get_db()
+            cursor = conn.cursor()
+            try:
+                cursor.executemany("""
+                    INSERT INTO cache_tag_version (tag, version) VALUES (%s, 1)
+                    ON DUPLICATE KEY UPDATE version = version + 1
+                """, [(tag,) for tag in tags])
+                cursor.execute(
+                    f"SELECT tag, version FROM cache_tag_version WHERE tag IN ({', '.join(['%s'] * len(tags))})",
+                    tuple(tags))
+                versions = {row['tag']: row['version'] for row in cursor.fetchall()}
+                conn.commit()
+            finally:
+                cursor.close()
+            with self._lock:
+                self._tag_versions.update(versions)
+        except Exception as e:
+            logging.error(f"Could not publish cache invalidation for {tags}: {e}")
+
+    def sync(self):
+        """Pick up invalidations made by other worker processes."""
+        if time.monotonic() - self._synced_at < SYNC_SECONDS:
+            return
+        self._synced_at = time.monotonic()
+        try:
+            cursor = db.get_db().cursor()
+            try:
+                cursor.execute("SELECT tag, version FROM cache_tag_version")
+                versions = {row['tag']: row['version'] for row in cursor.fetchall()}
+            finally:
+                cursor.close()
+        except Exception as e:
+            logging.error(f"Could not sync response cache tag versions: {e}")
+            return
+        changed = [tag for tag, version in versions.items() if self._tag_versions.get(tag) != version]
+        self._invalidate_local(changed)
+        with self._lock:
+            self._tag_versions.update(versions)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+    def cached(self, tags, ttl=None):
+        """Cache successful GET responses of a route, keyed on path and query string."""
+        ttl = self.default_ttl if ttl is None else ttl
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET':
+                    return view(*args, **kwargs)
+                self.sync()
+                key = (request.path, tuple(sorted(request.args.items(multi=True))))
+                entry = self.get(key)
+                if entry is not None:
+                    response = Response(entry.body, status=entry.status, mimetype=entry.mimetype)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                generations = self.generations(tags)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self.set(key, response.get_data(), response.status_code, response.mimetype, ttl, tags,
+                             generations)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def invalidates(self, *tags):
+        """Invalidate these table tags after a write route succeeds (status < 400)."""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                response = make_response(view(*args, **kwargs))
+                if response.status_code < 400:
+                    self.invalidate(*tags)
+                return response
+            return wrapper
+        return decorator
+
+
+cache = ResponseCache()
@@ -1,11 +1,14 @@
 from flask import Flask
 
 from backend.db_connection import db
+from backend.db_connection.async_db import async_db
+from backend import profiling
 from backend.auth.auth_routes import auth
 from backend.users.user_routes import users
 from backend.admin_dash.admindash_routes import admin; 
 # from backend.users.user_routes import users # Removed old import
 from backend.data_analyst.analyst_routes import analyst
+from backend.data_analyst import snapshots
 
 # Import new blueprints
 from backend.user_profile.profile_routes import user_profile_bp
@@ -42,10 +45,24 @@ def create_app():
     app.config['MYSQL_DATABASE_PORT'] = int(os.getenv('DB_PORT').strip())
     app.config['MYSQL_DATABASE_DB'] = os.getenv('DB_NAME').strip()  # Change this to your DB name
 
-    # Initialize the database object with the settings above. 
-    app.logger.info('current_app(): starting the database connection')
+    # connection pool sizing (see backend/db_connection)
+    app.config['MYSQL_POOL_MIN_SIZE'] = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+    app.config['MYSQL_POOL_MAX_SIZE'] = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+    app.config['MYSQL_POOL_MAX_LIFETIME'] = int(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+    app.config['MYSQL_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+
+    # Initialize the database object (connection pool) with the settings above. 
+    app.logger.info('current_app(): starting the database connection pool')
     db.init_app(app)
 
+    # aiomysql pool used by the async views (see backend/db_connection/async_db.py)
+    app.config['MYSQL_ASYNC_POOL_MIN_SIZE'] = int(os.getenv('DB_ASYNC_POOL_MIN_SIZE', '1'))
+    app.config['MYSQL_ASYNC_POOL_MAX_SIZE'] = int(os.getenv('DB_ASYNC_POOL_MAX_SIZE', '10'))
+    async_db.init_app(app)
+
+    # Time every request and SQL statement (see backend/profiling)
+    profiling.init_app(app, db)
+
 
     # Register the routes from each Blueprint with the app object
     # and give a url prefix to each
@@ -64,6 +81,9 @@ def create_app():
     app.register_blueprint(user_groups_bp, url_prefix='/groups')
     app.register_blueprint(learning_style_bp, url_prefix='/learning-style')
 
+    # Keep the /a/analytics snapshot tables fresh in the background
+    snapshots.start_refresh_job(app)
+
 
     # Don't forget to return the app object
     return app
@@ -1,10 +1,19 @@
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.response_cache import cache
+from backend.validation import is_integral
 
 user_groups_bp = Blueprint('user_groups', __name__)
 
+# Largest number of add + remove items accepted by the members:batch routes
+MAX_BATCH_ITEMS = 5000
+# Per-item outcomes of the members:batch routes, counted in the response
+BATCH_STATUSES = ('added', 'already_member', 'removed', 'not_member',
+                  'group_not_found', 'user_not_found', 'invalid')
+
 # GET /groups/find
 @user_groups_bp.route('/find', methods=['GET'])
+@cache.cached(tags=('study_group',))
 def browse_groups(): 
     """Fetches all available study groups (ID and Name)."""
     cursor = None
@@ -22,6 +31,7 @@ def browse_groups():
 
 # POST /groups/create
 @user_groups_bp.route('/create', methods=['POST'])
+@cache.invalidates('study_group', 'group_student')
 def create_group():
     """Creates a new study group AND ADDS the creator as a member."""
     conn = None
@@ -66,6 +76,7 @@ def create_group():
 
 # PUT /groups/<group_id>
 @user_groups_bp.route('/<int:group_id>', methods=['PUT'])
+@cache.invalidates('study_group')
 def update_group_info(group_id):
     """Updates group information (e.g., name)."""
     data = request.get_json()
@@ -104,6 +115,7 @@ def update_group_info(group_id):
 
 # DELETE /groups/<group_id>
 @user_groups_bp.route('/<int:group_id>', methods=['DELETE'])
+@cache.invalidates('study_group', 'group_student')
 def delete_group(group_id):
     """Deletes a study group and removes members."""
     conn = None
@@ -143,6 +155,7 @@ def delete_group(group_id):
 
 # POST /groups/<group_id>/join
 @user_groups_bp.route('/<int:group_id>/join', methods=['POST'])
+@cache.invalidates('group_student')
 def join_group(group_id):
     """Adds a user to a specific study group."""
     conn = None
@@ -192,6 +205,7 @@ def join_group(group_id):
 
 # DELETE /groups/<group_id>/members/<user_id>
 @user_groups_bp.route('/<int:group_id>/members/<int:user_id>', methods=['DELETE'])
+@cache.invalidates('group_student')
 def leave_group(group_id, user_id):
     """Removes a user (member) from a specific study group."""
     conn = None
@@ -230,6 +244,173 @@ def leave_group(group_id, user_id):
         if cursor:
             cursor.close()
 
+def _apply_membership_batch(cursor, adds, removes):
+    """
+    Apply many (groupid, studentid) membership changes with set-based statements:
+    one query validates every group, user and current membership, then one
+    multi-row INSERT IGNORE and one multi-row DELETE apply the changes.
+    Returns a result dict per distinct item, in request order.
+    """
+    results = {}
+    for action, items in (('add', adds), ('remove', removes)):
+        for pair in items:
+            if pair in results:
+                if results[pair]['action'] != action:
+                    results[pair]['status'] = 'invalid'
+                    results[pair]['error'] = "Listed in both 'add' and 'remove'"
+                continue
+            results[pair] = {'action': action, 'group_id': pair[0], 'user_id': pair[1]}
+    pairs = [pair for pair, result in results.items() if 'status' not in result]
+    if not pairs:
+        return list(results.values())
+
+    group_ids = sorted({g for g, _ in pairs})
+    user_ids = sorted({u for _, u in pairs})
+    cursor.execute(f"""
+        SELECT 'group' AS kind, groupid AS id, NULL AS studentid
+        FROM study_group WHERE groupid IN ({', '.join(['%s'] * len(group_ids))})
+        UNION ALL
+        SELECT 'user', userid, NULL
+        FROM user WHERE userid IN ({', '.join(['%s'] * len(user_ids))})
+        UNION ALL
+        SELECT 'member', groupid, studentid
+        FROM group_student WHERE (groupid, studentid) IN ({', '.join(['(%s, %s)'] * len(pairs))})
+    """, (*group_ids, *user_ids, *(v for pair in pairs for v in pair)))
+    groups, users, members = set(), set(), set()
+    for row in cursor.fetchall():
+        if row['kind'] == 'group':
+            groups.add(row['id'])
+        elif row['kind'] == 'user':
+            users.add(row['id'])
+        else:
+            members.add((row['id'], row['studentid']))
+
+    to_add, to_remove = [], []
+    for pair in pairs:
+        result = results[pair]
+        if pair[0] not in groups:
+            result['status'] = 'group_not_found'
+        elif pair[1] not in users:
+            result['status'] = 'user_not_found'
+        elif result['action'] == 'add':
+            result['status'] = 'already_member' if pair in members else 'added'
+            if pair not in members:
+                to_add.append(pair)
+        else:
+            result['status'] = 'removed' if pair in members else 'not_member'
+            if pair in members:
+                to_remove.append(pair)
+
+    if to_add:
+        cursor.execute(
+            f"INSERT IGNORE INTO group_student (groupid, studentid) VALUES {', '.join(['(%s, %s)'] * len(to_add))}",
+            tuple(v for pair in to_add for v in pair))
+    if to_remove:
+        cursor.execute(
+            f"DELETE FROM group_student WHERE (groupid, studentid) IN ({', '.join(['(%s, %s)'] * len(to_remove))})",
+            tuple(v for pair in to_remove for v in pair))
+    return list(results.values())
+
+
+def _parse_batch(data, parse_item):
+    """
+    Split a members:batch body into (adds, removes, invalid results). parse_item
+    turns one list item into a (groupid, studentid) pair, or None if it is malformed.
+    Raises ValueError when the body itself is malformed.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Body must be a JSON object with 'add' and/or 'remove' lists")
+    items = {action: data.get(action) or [] for action in ('add', 'remove')}
+    if not all(isinstance(value, list) for value in items.values()):
+        raise ValueError("'add' and 'remove' must be lists")
+    if not (items['add'] or items['remove']):
+        raise ValueError("Provide a non-empty 'add' and/or 'remove' list")
+    if len(items['add']) + len(items['remove']) > MAX_BATCH_ITEMS:
+        raise ValueError(f"At most {MAX_BATCH_ITEMS} items per request")
+
+    pairs = {'add': [], 'remove': []}
+    invalid = []
+    for action, values in items.items():
+        for item in values:
+            pair = parse_item(item)
+            if pair is None:
+                invalid.append({'action': action, 'item': item, 'status': 'invalid',
+                                'error': "Expected integer group and user ids"})
+            else:
+                pairs[action].append(pair)
+    return pairs['add'], pairs['remove'], invalid
+
+
+def _batch_response(cursor, conn, adds, removes, invalid):
+    results = _apply_membership_batch(cursor, adds, removes) + invalid
+    conn.commit()
+    # Same shape as POST /matches/bulk: a count per status, then the per-item results
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in BATCH_STATUSES}
+    return jsonify({**summary, "results": results}), 200
+
+
+# POST /groups/<group_id>/members:batch
+@user_groups_bp.route('/<int:group_id>/members:batch', methods=['POST'])
+@cache.invalidates('group_student')
+def batch_group_members(group_id):
+    """
+    Adds and/or removes many users in one study group.
+    Body: {"add": [user_id, ...], "remove": [user_id, ...]}
+    """
+    conn = None
+    cursor = None
+    try:
+        try:
+            adds, removes, invalid = _parse_batch(
+                request.get_json(), lambda uid: (group_id, int(uid)) if is_integral(uid) else None)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        conn = db.get_db()
+        cursor = conn.cursor()
+        return _batch_response(cursor, conn, adds, removes, invalid)
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
+def _group_user_pair(item):
+    if not isinstance(item, dict) or not all(is_integral(item.get(k)) for k in ('group_id', 'user_id')):
+        return None
+    return int(item['group_id']), int(item['user_id'])
+
+# POST /groups/members:batch
+@user_groups_bp.route('/members:batch', methods=['POST'])
+@cache.invalidates('group_student')
+def batch_members():
+    """
+    Adds and/or removes memberships across any number of study groups.
+    Body: {"add": [{"group_id": 1, "user_id": 2}, ...], "remove": [...]}
+    """
+    conn = None
+    cursor = None
+    try:
+        try:
+            adds, removes, invalid = _parse_batch(request.get_json(), _group_user_pair)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        conn = db.get_db()
+        cursor = conn.cursor()
+        return _batch_response(cursor, conn, adds, removes, invalid)
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
 # Note: GET /users/groups/all (POST in original) is not included here. 
 # Getting groups for a *specific* user would likely fit better under the user profile or a dedicated 'user memberships' blueprint.
 # For now, it's omitted to adhere to the 1-verb-per-blueprint structure. 
\ No newline at end of file
@@ -0,0 +1,343 @@
+#------------------------------------------------------------
+# Approximate nearest-neighbour index over user embeddings.
+#
+# Embeddings are fixed-size (so users can be inserted one at a time)
+# and made of: the 4-way learning style distribution, hashed major,
+# hashed interests and the user's free hours per 4-hour block of the
+# week (from the same slot mask as overlap hours). The index is a
+# random-hyperplane LSH: each table hashes a vector to the sign pattern
+# of a few projections, so a query only looks at the handful of users
+# in its own (and neighbouring) buckets and then ranks them exactly.
+#
+# Each worker process holds its own copy in memory and updates it
+# directly on the writes it serves. Writes served by other workers,
+# admin routes or plain SQL reach it through the user_embedding_change
+# log (migration 0007, filled by triggers): at most every
+# ANN_SYNC_SECONDS the index re-embeds the users logged since it last
+# looked. The index is written atomically to ANN_INDEX_PATH, together
+# with the last change it has applied, so a restarted worker loads it
+# and replays only newer changes instead of rebuilding from MySQL.
+#------------------------------------------------------------
+import atexit
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from backend.user_matching import availability
+from backend.user_matching.scoring import hash_bucket, normalise_rows
+from backend.learning_style.learning_style_routes import get_default_distribution
+
+INDEX_PATH = os.getenv('ANN_INDEX_PATH', '/tmp/studybuddy_ann_index.npz')
+SAVE_INTERVAL_SECONDS = int(os.getenv('ANN_SAVE_INTERVAL', '60'))
+REBUILD_SECONDS = int(os.getenv('ANN_REBUILD_SECONDS', '3600'))
+SYNC_SECONDS = float(os.getenv('ANN_SYNC_SECONDS', '1'))
+# Changes logged this recently are re-read on every sync, so a write whose
+# transaction commits after a later change_id was already seen isn't skipped
+CHANGE_GRACE_SECONDS = 10
+
+NUM_TABLES = 8
+BITS_PER_TABLE = 10
+
+MAJOR_DIM = 16
+INTEREST_DIM = 32
+STYLE_KEYS = ['visual_percentage', 'auditory_percentage',
+              'reading_writing_percentage', 'kinesthetic_percentage']
+DIM = len(STYLE_KEYS) + MAJOR_DIM + INTEREST_DIM + availability.BLOCKS
+
+# Block weights, applied after each block is normalised
+BLOCK_WEIGHTS = (1.0, 0.8, 0.8, 1.0)
+
+
+def embed(user, distribution, interest_ids):
+    """Build the fixed-size, unit-length embedding for one user."""
+    style = np.array([[float(distribution[k]) for k in STYLE_KEYS]], dtype=np.float32)
+
+    major = np.zeros((1, MAJOR_DIM), dtype=np.float32)
+    if user.get('major'):
+        major[0, hash_bucket(user['major'].strip().lower(), MAJOR_DIM)] = 1
+
+    interests = np.zeros((1, INTEREST_DIM), dtype=np.float32)
+    for iid in interest_ids:
+        interests[0, hash_bucket(str(iid), INTEREST_DIM)] = 1
+
+    free = availability.slot_blocks(availability.user_mask(user))[None, :]
+
+    blocks = [style, major, interests, free]
+    vector = np.hstack([normalise_rows(b) * w for b, w in zip(blocks, BLOCK_WEIGHTS)])[0]
+    return normalise_rows(vector[None, :])[0]
+
+
+class AnnIndex:
+    """Random-hyperplane LSH index with exact re-ranking of the candidate buckets."""
+
+    def __init__(self, planes=None, seed=42):
+        rng = np.random.default_rng(seed)
+        self.planes = planes if planes is not None else \
+            rng.standard_normal((NUM_TABLES, BITS_PER_TABLE, DIM)).astype(np.float32)
+        self._bit_weights = 1 << np.arange(BITS_PER_TABLE, dtype=np.int64)
+        self.vectors = np.zeros((0, DIM), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.row_of = {}
+        self.used_rows = 0
+        self.free_rows = []
+        self.tables = [dict() for _ in range(NUM_TABLES)]
+        self.built_at = time.time()
+        self.last_change_id = 0   # newest user_embedding_change row applied
+        self.synced_at = 0.0
+        self.dirty = False
+        self.saved_at = 0.0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def __contains__(self, user_id):
+        return user_id in self.row_of
+
+    def _keys(self, vector):
+        bits = (self.planes @ vector) > 0          # (tables, bits)
+        return (bits.astype(np.int64) * self._bit_weights).sum(axis=1).tolist()
+
+    def insert(self, user_id, vector):
+        """Insert or replace the embedding for user_id."""
+        with self.lock:
+            if user_id in self.row_of:
+                self.delete(user_id)
+            if self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                row = self.used_rows
+                self.used_rows += 1
+                if row >= len(self.vectors):
+                    grow = max(64, len(self.vectors))
+                    self.vectors = np.vstack([self.vectors, np.zeros((grow, DIM), dtype=np.float32)])
+                    self.ids = np.concatenate([self.ids, np.full(grow, -1, dtype=np.int64)])
+            self.vectors[row] = vector
+            self.ids[row] = user_id
+            self.row_of[user_id] = row
+            for table, key in zip(self.tables, self._keys(vector)):
+                table.setdefault(key, set()).add(row)
+            self.dirty = True
+
+    def delete(self, user_id):
+        with self.lock:
+            row = self.row_of.pop(user_id, None)
+            if row is None:
+                return False
+            for table, key in zip(self.tables, self._keys(self.vectors[row])):
+                bucket = table.get(key)
+                if bucket is not None:
+                    bucket.discard(row)
+                    if not bucket:
+                        del table[key]
+            self.ids[row] = -1
+            self.free_rows.append(row)
+            self.dirty = True
+            return True
+
+    def query(self, user_id, k, exclude_ids=()):
+        """Return [(user_id, similarity)] for the approximately k most similar users."""
+        with self.lock:
+            vector = self.vectors[self.row_of[user_id]]
+            keys = self._keys(vector)
+            excluded = set(exclude_ids) | {user_id}
+
+            # Probe the exact buckets first, then buckets one bit away, until there are enough candidates
+            candidates = set()
+            for table, key in zip(self.tables, keys):
+                candidates |= table.get(key, set())
+            if len(candidates) - len(excluded) < k:
+                for table, key in zip(self.tables, keys):
+                    for bit in range(BITS_PER_TABLE):
+                        candidates |= table.get(key ^ (1 << bit), set())
+            if len(candidates) - len(excluded) < k:
+                # Tiny or very sparse index: just rank everyone
+                candidates = set(self.row_of.values())
+
+            rows = np.fromiter((r for r in candidates if self.ids[r] not in excluded), dtype=np.int64)
+            if len(rows) == 0:
+                return []
+            scores = self.vectors[rows] @ vector
+            if len(rows) > k:
+                best = np.argpartition(-scores, k - 1)[:k]
+                rows, scores = rows[best], scores[best]
+            order = np.argsort(-scores, kind='stable')
+            return [(int(self.ids[r]), float(s)) for r, s in zip(rows[order], scores[order])]
+
+    def save(self, path=INDEX_PATH):
+        """Write the index to a temporary file and rename it over path, so readers never see half a file."""
+        with self.lock:
+            live = np.array(sorted(self.row_of.values()), dtype=np.int64)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                            prefix='.ann_index.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, planes=self.planes, ids=self.ids[live], vectors=self.vectors[live],
+                             built_at=np.array(self.built_at), last_change_id=np.array(self.last_change_id))
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self.dirty = False
+            self.saved_at = time.time()
+
+    def maybe_save(self):
+        if self.dirty and time.time() - self.saved_at > SAVE_INTERVAL_SECONDS:
+            try:
+                self.save()
+            except OSError as e:
+                logging.error(f"Could not persist ANN index to {INDEX_PATH}: {e}")
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            if data['planes'].shape[-1] != DIM:
+                raise ValueError(f"saved index has {data['planes'].shape[-1]}-dim embeddings, expected {DIM}")
+            index = cls(planes=data['planes'])
+            for user_id, vector in zip(data['ids'].tolist(), data['vectors']):
+                index.insert(user_id, vector)
+            index.built_at = float(data['built_at'])
+            if 'last_change_id' in data.files:
+                index.last_change_id = int(data['last_change_id'])
+        index.dirty = False
+        index.saved_at = time.time()
+        return index
+
+
+def _fetch_user_embeddings(cursor, user_ids=None):
+    """Return {userid: embedding} for the given users (or everyone)."""
+    where, params = '', ()
+    if user_ids is not None:
+        if not user_ids:
+            return {}
+        where = f"WHERE u.userid IN ({', '.join(['%s'] * len(user_ids))})"
+        params = tuple(user_ids)
+
+    cursor.execute(f"""
+        SELECT u.userid, u.major, u.learning_style, u.availability, u.availability_mask,
+               d.visual_percentage, d.auditory_percentage,
+               d.reading_writing_percentage, d.kinesthetic_percentage
+        FROM user u
+        LEFT JOIN learning_style_distribution d ON d.userid = u.userid
+        {where}
+    """, params)
+    users = cursor.fetchall()
+
+    cursor.execute(f"SELECT ui.userid, ui.interestid FROM user_interests ui "
+                   f"{where.replace('u.userid', 'ui.userid')}", params)
+    interests = {}
+    for row in cursor.fetchall():
+        interests.setdefault(row['userid'], []).append(row['interestid'])
+
+    embeddings = {}
+    for user in users:
+        if user['visual_percentage'] is not None:
+            distribution = user
+        else:
+            distribution = get_default_distribution(user['learning_style'])
+        embeddings[user['userid']] = embed(user, distribution, interests.get(user['userid'], []))
+    return embeddings
+
+
+def build_index(cursor):
+    # Read the change log position first: changes made while users are read are replayed by the next sync
+    cursor.execute("SELECT COALESCE(MAX(change_id), 0) AS change_id FROM user_embedding_change")
+    last_change_id = cursor.fetchone()['change_id']
+    index = AnnIndex()
+    for user_id, vector in _fetch_user_embeddings(cursor).items():
+        index.insert(user_id, vector)
+    index.last_change_id = last_change_id
+    index.synced_at = time.time()
+
+    # No index (in memory or on disk) older than a rebuild period needs older changes
+    cursor.execute("DELETE FROM user_embedding_change WHERE changed_at < NOW() - INTERVAL %s SECOND",
+                   (2 * REBUILD_SECONDS,))
+    cursor.connection.commit()
+    return index
+
+
+def sync_index(cursor, index):
+    """Re-embed (or drop) the users logged in user_embedding_change since the index last synced."""
+    cursor.execute("""
+        SELECT change_id, userid FROM user_embedding_change
+        WHERE change_id > %s OR changed_at >= NOW() - INTERVAL %s SECOND
+        ORDER BY change_id
+    """, (index.last_change_id, CHANGE_GRACE_SECONDS))
+    rows = cursor.fetchall()
+    index.synced_at = time.time()
+    if not rows:
+        return 0
+    user_ids = sorted({row['userid'] for row in rows})
+    embeddings = _fetch_user_embeddings(cursor, user_ids)
+    for user_id in user_ids:
+        if user_id in embeddings:
+            index.insert(user_id, embeddings[user_id])
+        else:
+            index.delete(user_id)
+    index.last_change_id = max(index.last_change_id, rows[-1]['change_id'])
+    return len(user_ids)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(cursor):
+    """
+    Return the shared index, loading it from disk or building it from MySQL as needed,
+    and applying changes logged by other workers at most every SYNC_SECONDS.
+    """
+    global _index
+    with _index_lock:
+        if _index is None and os.path.exists(INDEX_PATH):
+            try:
+                _index = AnnIndex.load()
+            except Exception as e:
+                logging.error(f"Could not load ANN index from {INDEX_PATH}, rebuilding: {e}")
+        if _index is None or time.time() - _index.built_at > REBUILD_SECONDS:
+            _index = build_index(cursor)
+            _index.maybe_save()
+        elif time.time() - _index.synced_at > SYNC_SECONDS:
+            try:
+                if sync_index(cursor, _index):
+                    _index.maybe_save()
+            except Exception as e:
+                logging.error(f"Could not sync ANN index with user_embedding_change: {e}")
+        return _index
+
+
+def upsert_user(cursor, user_id):
+    """
+    (Re)index one user after registration or a profile change. Best effort: the write
+    that triggered it has already been committed, so failures are only logged.
+    """
+    try:
+        index = get_index(cursor)
+        vector = _fetch_user_embeddings(cursor, [user_id]).get(user_id)
+        if vector is not None:
+            index.insert(user_id, vector)
+            index.maybe_save()
+    except Exception as e:
+        logging.error(f"Could not add user {user_id} to the ANN index: {e}")
+
+
+def remove_user(user_id):
+    """Drop a deleted user from the index (no-op if it has not been loaded yet)."""
+    if _index is not None and _index.delete(user_id):
+        _index.maybe_save()
+
+
+@atexit.register
+def _save_on_exit():
+    if _index is not None and _index.dirty:
+        try:
+            _index.save()
+        except OSError:
+            pass
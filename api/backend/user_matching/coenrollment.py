@@ -0,0 +1,245 @@
+#------------------------------------------------------------
+# Course co-enrollment graph for partner discovery.
+#
+# Users and the courses they take form a sparse user x course incidence
+# matrix, held in CSR form (indptr / indices arrays). A user takes a
+# course if they have a study session for it, or a row in Enrollment
+# when that table exists. For one user, the number of courses shared
+# with everyone else is a single sparse matrix-vector product A @ x,
+# where x marks the user's own courses; Jaccard overlap follows from
+# the per-user course counts.
+#
+# New study sessions are merged in incrementally (by session_id): their
+# entries first go to a pending list that queries add on top of the CSR
+# arrays, and once it outgrows MERGE_FRACTION of the stored entries it
+# is folded into them in one linear pass, without re-sorting what is
+# already stored. The whole matrix is rebuilt every
+# COENROLLMENT_REBUILD_SECONDS to pick up deletions, sessions moved to
+# another student or course, and Enrollment changes.
+#------------------------------------------------------------
+import os
+import threading
+import time
+
+import numpy as np
+
+REFRESH_SECONDS = float(os.getenv('COENROLLMENT_REFRESH_SECONDS', '10'))
+REBUILD_SECONDS = int(os.getenv('COENROLLMENT_REBUILD_SECONDS', '3600'))
+
+# Pending entries are folded into the CSR arrays once there are more than
+# max(MERGE_MIN_ENTRIES, MERGE_FRACTION * stored entries) of them
+MERGE_MIN_ENTRIES = 4096
+MERGE_FRACTION = 0.05
+
+
+class CoEnrollmentGraph:
+    """Sparse user x course incidence matrix in CSR form, plus entries not yet merged into it."""
+
+    def __init__(self, pairs=(), last_session_id=0):
+        self.user_ids = np.zeros(0, dtype=np.int64)
+        self.course_ids = np.zeros(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.nnz_rows = np.zeros(0, dtype=np.int64)   # row of each stored entry, for mat-vecs
+        self.pending = set()                           # (row, col) entries not in the CSR arrays yet
+        self.pending_rows = []
+        self.pending_cols = []
+        self.row_of = {}
+        self.col_of = {}
+        self.last_session_id = last_session_id
+        self.built_at = time.time()
+        self.refreshed_at = self.built_at
+        self.lock = threading.RLock()
+        self._build(list(pairs))
+
+    def _build(self, pairs):
+        """Fill the empty matrix from (user_id, course_id) pairs in one de-duplicating pass."""
+        for user_id, course_id in pairs:
+            self.row_of.setdefault(user_id, len(self.row_of))
+            self.col_of.setdefault(course_id, len(self.col_of))
+        self.user_ids = np.fromiter(self.row_of, dtype=np.int64, count=len(self.row_of))
+        self.course_ids = np.fromiter(self.col_of, dtype=np.int64, count=len(self.col_of))
+
+        rows = np.fromiter((self.row_of[u] for u, _ in pairs), dtype=np.int64, count=len(pairs))
+        cols = np.fromiter((self.col_of[c] for _, c in pairs), dtype=np.int64, count=len(pairs))
+        keys = np.unique(rows * max(len(self.col_of), 1) + cols)
+        rows, cols = np.divmod(keys, max(len(self.col_of), 1))
+        self.indices = cols.astype(np.int32)
+        self.nnz_rows = rows
+        self.indptr = np.zeros(len(self.row_of) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.row_of)), out=self.indptr[1:])
+
+    def __contains__(self, user_id):
+        return user_id in self.row_of
+
+    @property
+    def nnz(self):
+        return len(self.indices) + len(self.pending)
+
+    def _stored(self, row, col):
+        return row < len(self.indptr) - 1 and col in self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def add_pairs(self, pairs):
+        """Add (user_id, course_id) pairs to the matrix; returns how many were new."""
+        with self.lock:
+            added = 0
+            for user_id, course_id in pairs:
+                row = self.row_of.setdefault(user_id, len(self.row_of))
+                col = self.col_of.setdefault(course_id, len(self.col_of))
+                if (row, col) in self.pending or self._stored(row, col):
+                    continue
+                self.pending.add((row, col))
+                self.pending_rows.append(row)
+                self.pending_cols.append(col)
+                added += 1
+            if len(self.user_ids) != len(self.row_of):
+                self.user_ids = np.fromiter(self.row_of, dtype=np.int64, count=len(self.row_of))
+            if len(self.course_ids) != len(self.col_of):
+                self.course_ids = np.fromiter(self.col_of, dtype=np.int64, count=len(self.col_of))
+            if len(self.pending) > max(MERGE_MIN_ENTRIES, MERGE_FRACTION * len(self.indices)):
+                self.merge()
+            return added
+
+    def merge(self):
+        """Fold the pending entries into the CSR arrays (stored entries keep their order)."""
+        with self.lock:
+            if not self.pending and len(self.indptr) == len(self.row_of) + 1:
+                return
+            n = len(self.row_of)
+            pending_rows = np.array(self.pending_rows, dtype=np.int64)
+            pending_cols = np.array(self.pending_cols, dtype=np.int32)
+            stored_degree = self._stored_degree(n)
+            pending_degree = np.bincount(pending_rows, minlength=n)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(stored_degree + pending_degree, out=indptr[1:])
+
+            # Stored entries shift right by the entries added to earlier rows;
+            # pending ones go after them, at the end of their row
+            indices = np.empty(indptr[-1], dtype=np.int32)
+            rows = self.nnz_rows
+            indices[np.arange(len(rows)) - self.indptr[rows] + indptr[rows]] = self.indices
+            order = np.argsort(pending_rows, kind='stable')
+            pending_rows, pending_cols = pending_rows[order], pending_cols[order]
+            first = np.cumsum(pending_degree) - pending_degree
+            rank = np.arange(len(pending_rows)) - first[pending_rows]
+            indices[indptr[pending_rows] + stored_degree[pending_rows] + rank] = pending_cols
+
+            self.indptr = indptr
+            self.indices = indices
+            self.nnz_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+            self.pending = set()
+            self.pending_rows = []
+            self.pending_cols = []
+
+    def _stored_degree(self, n):
+        """Stored entries per row, padded with zeros to n rows."""
+        degree = np.zeros(n, dtype=np.int64)
+        degree[:len(self.indptr) - 1] = np.diff(self.indptr)
+        return degree
+
+    def _row_cols(self, row, pending_rows, pending_cols):
+        """Column indices of one row: stored ones, then pending ones."""
+        stored = self.indices[self.indptr[row]:self.indptr[row + 1]] if row < len(self.indptr) - 1 else []
+        return np.concatenate([stored, pending_cols[pending_rows == row]]).astype(np.int64)
+
+    def courses_of(self, user_id):
+        """Course ids taken by user_id."""
+        with self.lock:
+            row = self.row_of.get(user_id)
+            if row is None:
+                return []
+            pending_rows = np.array(self.pending_rows, dtype=np.int64)
+            pending_cols = np.array(self.pending_cols, dtype=np.int64)
+            return self.course_ids[self._row_cols(row, pending_rows, pending_cols)].tolist()
+
+    def overlap(self, user_id):
+        """
+        Shared-course counts and Jaccard overlap of user_id with every user.
+        Returns (user ids, shared counts, jaccard), all indexed by matrix row.
+        """
+        with self.lock:
+            n = len(self.row_of)
+            row = self.row_of.get(user_id)
+            if row is None:
+                return self.user_ids, np.zeros(n, dtype=np.int64), np.zeros(n)
+            pending_rows = np.array(self.pending_rows, dtype=np.int64)
+            pending_cols = np.array(self.pending_cols, dtype=np.int64)
+            degree = self._stored_degree(n) + np.bincount(pending_rows, minlength=n)
+
+            x = np.zeros(len(self.col_of), dtype=np.int64)
+            x[self._row_cols(row, pending_rows, pending_cols)] = 1
+            # A @ x: sum x over each row's column indices, stored and pending
+            shared = (np.bincount(self.nnz_rows, weights=x[self.indices], minlength=n)
+                      + np.bincount(pending_rows, weights=x[pending_cols], minlength=n)).astype(np.int64)
+
+            union = degree + degree[row] - shared
+            jaccard = np.divide(shared, union, out=np.zeros(n), where=union > 0)
+            return self.user_ids, shared, jaccard
+
+    def top_k(self, user_id, k, min_shared=1, exclude_ids=()):
+        """Return [(user_id, shared courses, jaccard)] for the k most overlapping users."""
+        user_ids, shared, jaccard = self.overlap(user_id)
+        mask = (shared >= min_shared) & (user_ids != user_id)
+        if exclude_ids:
+            mask &= ~np.isin(user_ids, np.fromiter(exclude_ids, dtype=np.int64))
+        rows = np.flatnonzero(mask)
+        # Highest Jaccard first, more shared courses breaks ties
+        order = np.lexsort((-shared[rows], -jaccard[rows]))[:k]
+        rows = rows[order]
+        return [(int(user_ids[r]), int(shared[r]), float(jaccard[r])) for r in rows]
+
+
+def _has_enrollment_table(cursor):
+    cursor.execute("""
+        SELECT COUNT(*) AS found FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = 'Enrollment'
+    """)
+    return cursor.fetchone()['found'] > 0
+
+
+def _fetch_sessions(cursor, after_session_id=0):
+    """Return ([(user_id, course_id)], highest session_id) for sessions after after_session_id."""
+    cursor.execute("""
+        SELECT session_id, matched_student_id, course_id
+        FROM study_session
+        WHERE session_id > %s
+        ORDER BY session_id
+    """, (after_session_id,))
+    rows = cursor.fetchall()
+    pairs = [(row['matched_student_id'], row['course_id']) for row in rows]
+    return pairs, (rows[-1]['session_id'] if rows else after_session_id)
+
+
+def build_graph(cursor):
+    pairs, last_session_id = _fetch_sessions(cursor)
+    if _has_enrollment_table(cursor):
+        cursor.execute("SELECT DISTINCT UserID, Course_ID FROM Enrollment")
+        pairs.extend((row['UserID'], row['Course_ID']) for row in cursor.fetchall())
+    return CoEnrollmentGraph(pairs, last_session_id)
+
+
+def refresh_graph(cursor, graph):
+    """Merge study sessions recorded since the graph was last refreshed."""
+    pairs, last_session_id = _fetch_sessions(cursor, graph.last_session_id)
+    graph.add_pairs(pairs)
+    graph.last_session_id = last_session_id
+    graph.refreshed_at = time.time()
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph(cursor):
+    """
+    Return the shared graph: rebuilt every REBUILD_SECONDS, and brought up to date
+    with new study sessions at most every REFRESH_SECONDS.
+    """
+    global _graph
+    with _graph_lock:
+        now = time.time()
+        if _graph is None or now - _graph.built_at > REBUILD_SECONDS:
+            _graph = build_graph(cursor)
+        elif now - _graph.refreshed_at > REFRESH_SECONDS:
+            refresh_graph(cursor, _graph)
+        return _graph
@@ -1,45 +1,88 @@
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.response_cache import cache
+from backend.user_matching import scoring, coenrollment, availability
+from backend.validation import is_integral
 
 user_matching_bp = Blueprint('user_matching', __name__)
 
+# Number of ranked partners returned by find_study_partners
+DEFAULT_PARTNER_COUNT = 10
+MAX_PARTNER_COUNT = 100
+
+# Limits for POST /matches/bulk
+MAX_BULK_PAIRS = 10000
+BULK_INSERT_CHUNK = 1000
+
+def _int_option(data, name, default):
+    """Integer option from a JSON body; raises ValueError naming the field when it isn't one."""
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
 # POST /users/<int:user_id>/study-partners (Method changed from GET)
 @user_matching_bp.route('/users/<int:user_id>/study-partners', methods=['POST'])
 def find_study_partners(user_id):
     """
-    Find study partners for a specific user in a given course.
-    Requires course_id in the JSON body.
+    Find and rank study partners for a specific user in a given course.
+    Requires course_id in the JSON body; optional k (default 10) limits the result.
+    Candidates are ranked by the in-process compatibility engine (see scoring.py).
+
+    With "mode": "shared_courses" no course_id is needed: everyone who shares at
+    least min_shared (default 1) of the user's courses is ranked by Jaccard overlap
+    of their course sets (see coenrollment.py). Deleted or reassigned study
+    sessions still count there until the graph's hourly rebuild.
+
+    Every result reports availability_overlap_hours, the hours per week both users
+    are free; optional min_overlap_hours drops candidates below it (see availability.py).
     """
     try:
         data = request.get_json()
+        if data and data.get('mode') == 'shared_courses':
+            return _find_partners_by_shared_courses(user_id, data)
         if not data or 'course_id' not in data:
             return jsonify({'error': 'course_id is required in the request body'}), 400
         course_id = data['course_id']
+        try:
+            k = min(max(_int_option(data, 'k', DEFAULT_PARTNER_COUNT), 1), MAX_PARTNER_COUNT)
+            min_overlap_hours = max(_int_option(data, 'min_overlap_hours', 0), 0)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         cursor = db.get_db().cursor()
+
+        # Checked up front: an unknown id would otherwise force a full engine reload
+        cursor.execute("SELECT 1 FROM user WHERE userid = %s", (user_id,))
+        if cursor.fetchone() is None:
+            return jsonify({'error': 'User not found'}), 404
         
-        query = """
-            SELECT DISTINCT U.UserID, U.name, U.email 
-            FROM User U
-            JOIN Enrollment E ON U.UserID = E.UserID
-            WHERE E.Course_ID = %s
-            AND U.UserID != %s
-            AND U.UserID NOT IN (
-                -- Assuming Study_Session stores initiated or pending sessions
-                SELECT SS.Matched_Student_ID 
-                FROM Study_Session SS 
-                WHERE SS.UserID = %s
-            )
-            AND U.UserID NOT IN (
-                 -- Also exclude users already matched in matched_with
-                 SELECT CASE WHEN mw.user1_id = %s THEN mw.user2_id ELSE mw.user1_id END
-                 FROM matched_with mw
-                 WHERE mw.user1_id = %s OR mw.user2_id = %s
-            )
-        """
-        
-        cursor.execute(query, (course_id, user_id, user_id, user_id, user_id, user_id))
-        results = cursor.fetchall()
+        # Everyone who studies the course is a candidate (there is no enrollment
+        # table; study sessions record which students take which course)
+        cursor.execute("SELECT DISTINCT matched_student_id AS userid FROM study_session WHERE course_id = %s",
+                       (course_id,))
+        candidate_ids = {row['userid'] for row in cursor.fetchall()}
+
+        # Exclude people the user is already matched with. A study session only
+        # records one student, so match_edge is the only record of existing partners
+        cursor.execute("SELECT peer_id AS userid FROM match_edge WHERE user_id = %s", (user_id,))
+        exclude_ids = {row['userid'] for row in cursor.fetchall()}
+
+        engine = scoring.get_engine(cursor, user_id)
+        if user_id not in engine:
+            return jsonify({'error': 'User not found'}), 404
+
+        slots = availability.get_index(cursor, user_id)
+        if min_overlap_hours > 0:
+            exclude_ids |= slots.short_overlap(user_id, min_overlap_hours)
+
+        results = engine.top_k(user_id, k, candidate_ids=candidate_ids, exclude_ids=exclude_ids)
+        overlap = slots.overlap_map(user_id, [r['UserID'] for r in results])
+        for result in results:
+            result['availability_overlap_hours'] = overlap.get(result['UserID'], 0)
         
         return jsonify(results)
         
@@ -51,29 +94,80 @@ def find_study_partners(user_id):
         if 'cursor' in locals() and cursor is not None:
             cursor.close()
 
+def _find_partners_by_shared_courses(user_id, data):
+    """
+    Ranked "shared_courses" mode of find_study_partners.
+
+    Served from the in-memory co-enrollment graph, so results can be stale:
+    new study sessions show up within COENROLLMENT_REFRESH_SECONDS (10 s), but
+    deleted sessions, and sessions changed to another student or course,
+    keep counting until the next rebuild (COENROLLMENT_REBUILD_SECONDS, 1 h).
+    """
+    try:
+        k = min(max(_int_option(data, 'k', DEFAULT_PARTNER_COUNT), 1), MAX_PARTNER_COUNT)
+        min_shared = max(_int_option(data, 'min_shared', 1), 1)
+        min_overlap_hours = max(_int_option(data, 'min_overlap_hours', 0), 0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    cursor = db.get_db().cursor()
+    try:
+        cursor.execute("SELECT userid FROM user WHERE userid = %s", (user_id,))
+        if cursor.fetchone() is None:
+            return jsonify({'error': 'User not found'}), 404
+
+        # People the user is already matched with are not suggested again
+        cursor.execute("SELECT peer_id FROM match_edge WHERE user_id = %s", (user_id,))
+        exclude_ids = {row['peer_id'] for row in cursor.fetchall()}
+
+        slots = availability.get_index(cursor, user_id)
+        if min_overlap_hours > 0:
+            exclude_ids |= slots.short_overlap(user_id, min_overlap_hours)
+
+        graph = coenrollment.get_graph(cursor)
+        ranked = graph.top_k(user_id, k, min_shared=min_shared, exclude_ids=exclude_ids)
+        if not ranked:
+            return jsonify([])
+
+        peer_ids = [peer_id for peer_id, _, _ in ranked]
+        cursor.execute(
+            f"SELECT userid, name, email FROM user WHERE userid IN ({', '.join(['%s'] * len(peer_ids))})",
+            tuple(peer_ids))
+        users = {row['userid']: row for row in cursor.fetchall()}
+        overlap = slots.overlap_map(user_id, peer_ids)
+
+        return jsonify([
+            {
+                'UserID': peer_id,
+                'name': users[peer_id]['name'],
+                'email': users[peer_id]['email'],
+                'shared_courses': shared,
+                'jaccard': round(jaccard, 3),
+                'availability_overlap_hours': overlap.get(peer_id, 0),
+            }
+            for peer_id, shared, jaccard in ranked if peer_id in users
+        ])
+    finally:
+        cursor.close()
+
 # GET /users/<int:user_id>/matches
 @user_matching_bp.route('/users/<int:user_id>/matches', methods=['GET'])
+@cache.cached(tags=('matched_with', 'user'))
 def get_user_matches(user_id):
     """Fetches the unique names and IDs of users matched with the given user_id."""
     cursor = None
     try:
         cursor = db.get_db().cursor()
+        # match_edge holds each match in both directions (see migrations/versions/0002)
         query = """
-            SELECT DISTINCT
-                CASE
-                    WHEN mw.user1_id = %s THEN u2.name
-                    ELSE u1.name
-                END AS matched_user_name,
-                CASE
-                    WHEN mw.user1_id = %s THEN u2.userid
-                    ELSE u1.userid
-                END AS matched_user_id
-            FROM matched_with mw
-            JOIN user u1 ON mw.user1_id = u1.userid
-            JOIN user u2 ON mw.user2_id = u2.userid
-            WHERE mw.user1_id = %s OR mw.user2_id = %s
+            SELECT
+                u.name AS matched_user_name,
+                u.userid AS matched_user_id
+            FROM match_edge e
+            JOIN user u ON u.userid = e.peer_id
+            WHERE e.user_id = %s
         """
-        cursor.execute(query, (user_id, user_id, user_id, user_id))
+        cursor.execute(query, (user_id,))
         matches = cursor.fetchall()
         return jsonify(matches), 200
     except Exception as e: 
@@ -84,6 +178,7 @@ def get_user_matches(user_id):
 
 # PUT /matches/<int:user1_id>/<int:user2_id>
 @user_matching_bp.route('/matches/<int:user1_id>/<int:user2_id>', methods=['PUT'])
+@cache.invalidates('matched_with')
 def update_match_details(user1_id, user2_id):
     """Updates details of an existing match (placeholder)."""
     # Placeholder: Define what details can be updated (e.g., status, notes)
@@ -124,6 +219,7 @@ def update_match_details(user1_id, user2_id):
 
 # DELETE /matches/<int:user1_id>/<int:user2_id>
 @user_matching_bp.route('/matches/<int:user1_id>/<int:user2_id>', methods=['DELETE'])
+@cache.invalidates('matched_with')
 def delete_match(user1_id, user2_id):
     """Deletes a match record."""
     conn = None
@@ -156,6 +252,7 @@ def delete_match(user1_id, user2_id):
 
 # POST /matches
 @user_matching_bp.route('/matches', methods=['POST'])
+@cache.invalidates('matched_with')
 def record_new_match():
     """Records a new match between two users in the matched_with table."""
     conn = None
@@ -207,6 +304,107 @@ def record_new_match():
         if cursor:
             cursor.close()
 
+def _insert_matches(conn, cursor, pairs):
+    """
+    INSERT IGNORE the (user1_id, user2_id) pairs and return the set of pairs that were new.
+    Each chunk is one multi-row INSERT whose rowcount says how many rows it
+    created; when that is all or none of the chunk, every pair's status is
+    known. If any chunk is mixed, the transaction is rolled back and the pairs
+    are inserted one at a time, each INSERT's rowcount deciding its pair.
+    """
+    created = set()
+    for start in range(0, len(pairs), BULK_INSERT_CHUNK):
+        chunk = pairs[start:start + BULK_INSERT_CHUNK]
+        rows_affected = cursor.execute(f"""
+            INSERT IGNORE INTO matched_with (user1_id, user2_id)
+            VALUES {', '.join(['(%s, %s)'] * len(chunk))}
+        """, tuple(uid for pair in chunk for uid in pair))
+        if rows_affected == len(chunk):
+            created.update(chunk)
+        elif rows_affected:
+            conn.rollback()
+            return {pair for pair in pairs
+                    if cursor.execute("INSERT IGNORE INTO matched_with (user1_id, user2_id) VALUES (%s, %s)",
+                                      pair)}
+    return created
+
+# POST /matches/bulk
+@user_matching_bp.route('/matches/bulk', methods=['POST'])
+@cache.invalidates('matched_with')
+def record_matches_bulk():
+    """
+    Records many matches in one transaction.
+    Body: {"pairs": [{"user1_id": 1, "user2_id": 2}, ...]} (or [[1, 2], ...]).
+    Pairs are normalised to user1_id < user2_id and de-duplicated; each one is
+    reported back as created, existing, unknown_user or invalid.
+    """
+    conn = None
+    cursor = None
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('pairs'), list):
+            return jsonify({"error": "Missing required field: pairs (a list of user id pairs)"}), 400
+        if len(data['pairs']) > MAX_BULK_PAIRS:
+            return jsonify({"error": f"At most {MAX_BULK_PAIRS} pairs per request"}), 400
+
+        # Normalise and de-duplicate, keeping the request order for the response
+        results = []
+        pairs = {}
+        for item in data['pairs']:
+            if isinstance(item, dict):
+                values = (item.get('user1_id'), item.get('user2_id'))
+            elif isinstance(item, (list, tuple)) and len(item) == 2:
+                values = tuple(item)
+            else:
+                values = None
+            if values is None or not all(is_integral(v) for v in values):
+                results.append({"pair": item, "status": "invalid", "error": "Expected two integer user ids"})
+                continue
+            user_a_id, user_b_id = (int(v) for v in values)
+            if user_a_id == user_b_id:
+                results.append({"user1_id": user_a_id, "user2_id": user_b_id, "status": "invalid",
+                                "error": "Cannot match a user with themselves"})
+                continue
+            pair = (min(user_a_id, user_b_id), max(user_a_id, user_b_id))
+            if pair not in pairs:
+                pairs[pair] = {"user1_id": pair[0], "user2_id": pair[1]}
+                results.append(pairs[pair])
+
+        conn = db.get_db()
+        cursor = conn.cursor()
+
+        if pairs:
+            user_ids = sorted({uid for pair in pairs for uid in pair})
+            cursor.execute(
+                f"SELECT userid FROM user WHERE userid IN ({', '.join(['%s'] * len(user_ids))})",
+                tuple(user_ids))
+            known_users = {row['userid'] for row in cursor.fetchall()}
+
+            candidates = [p for p in pairs if p[0] in known_users and p[1] in known_users]
+            created = _insert_matches(conn, cursor, candidates)
+            conn.commit()
+
+            for pair, result in pairs.items():
+                if pair[0] not in known_users or pair[1] not in known_users:
+                    result["status"] = "unknown_user"
+                elif pair in created:
+                    result["status"] = "created"
+                else:
+                    result["status"] = "existing"
+
+        summary = {status: sum(1 for r in results if r["status"] == status)
+                   for status in ("created", "existing", "unknown_user", "invalid")}
+        status_code = 201 if summary["created"] else 200
+        return jsonify({**summary, "results": results}), status_code
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
 # Note: /match/success (POST) was merged into /users/<user_id>/study-partners (POST) conceptually, 
 # or could be a separate POST if needed, but this structure fulfills the requirements.
 # /potential-matches (POST) and /match/all-matches (GET) were omitted as they don't fit the 
@@ -0,0 +1,166 @@
+#------------------------------------------------------------
+# In-process compatibility scoring for study partner matching.
+#
+# Every user is turned into one row of a feature matrix made of
+# weighted, L2-normalised blocks (major, learning style, availability,
+# interests, academic goals). Because each block is normalised, the dot
+# product of two rows is the weighted sum of per-block cosine
+# similarities, so scoring one user against everyone is a single
+# matrix-vector product. The availability block is built from the same
+# 168-hour slot mask as the overlap hours (availability.slot_blocks).
+#------------------------------------------------------------
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from backend.user_matching import availability
+
+# Relative weight of each feature block (they sum to 1 so scores are 0..1)
+WEIGHTS = {
+    'major': 0.20,
+    'learning_style': 0.25,
+    'availability': 0.25,
+    'interests': 0.20,
+    'goals': 0.10,
+}
+
+# How long loaded features are reused before being re-read from MySQL
+FEATURE_TTL_SECONDS = int(os.getenv('MATCHING_FEATURE_TTL', '300'))
+
+# Size of the hashed bag-of-words used for compatibility.academic_goals
+GOAL_HASH_DIM = 64
+
+_STOPWORDS = {'a', 'an', 'and', 'the', 'to', 'of', 'in', 'on', 'for', 'my', 'with', 'be', 'is'}
+
+
+def _tokens(text):
+    return [t for t in re.findall(r'[a-z]+', (text or '').lower()) if t not in _STOPWORDS]
+
+
+def hash_bucket(token, dim):
+    # crc32 rather than hash() so buckets are stable across processes
+    return zlib.crc32(token.encode('utf-8')) % dim
+
+
+def normalise_rows(block):
+    """L2-normalise each row of a block; all-zero rows stay zero."""
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return block / norms
+
+
+def _one_hot(values):
+    """One-hot encode a list of (case-insensitive) categorical values; None maps to all zeros."""
+    keys = sorted({v.strip().lower() for v in values if v})
+    lookup = {k: i for i, k in enumerate(keys)}
+    block = np.zeros((len(values), max(len(keys), 1)), dtype=np.float32)
+    for row, value in enumerate(values):
+        if value:
+            block[row, lookup[value.strip().lower()]] = 1
+    return block
+
+
+class CompatibilityEngine:
+    """Feature matrix for every user plus the lookups needed to score and report them."""
+
+    def __init__(self, users, interests):
+        self.user_ids = np.array([u['userid'] for u in users], dtype=np.int64)
+        self.row_of = {uid: row for row, uid in enumerate(self.user_ids.tolist())}
+        self.names = [u.get('name') for u in users]
+        self.emails = [u.get('email') for u in users]
+        self.loaded_at = time.time()
+
+        n = len(users)
+        interest_ids = sorted({i['interestid'] for i in interests})
+        interest_col = {iid: col for col, iid in enumerate(interest_ids)}
+        interest_block = np.zeros((n, max(len(interest_ids), 1)), dtype=np.float32)
+        for row in interests:
+            if row['userid'] in self.row_of:
+                interest_block[self.row_of[row['userid']], interest_col[row['interestid']]] = 1
+
+        goal_block = np.zeros((n, GOAL_HASH_DIM), dtype=np.float32)
+        for row, user in enumerate(users):
+            for token in _tokens(user.get('academic_goals')):
+                goal_block[row, hash_bucket(token, GOAL_HASH_DIM)] += 1
+
+        blocks = {
+            'major': _one_hot([u.get('major') for u in users]),
+            'learning_style': _one_hot([u.get('learning_style') for u in users]),
+            'availability': np.stack([availability.slot_blocks(availability.user_mask(u)) for u in users])
+                            if n else np.zeros((0, availability.BLOCKS), dtype=np.float32),
+            'interests': interest_block,
+            'goals': goal_block,
+        }
+        self.features = np.hstack([
+            normalise_rows(blocks[name]) * np.sqrt(weight) for name, weight in WEIGHTS.items()
+        ]).astype(np.float32)
+
+    def __contains__(self, user_id):
+        return user_id in self.row_of
+
+    def score(self, user_id, candidate_ids=None, exclude_ids=()):
+        """Score user_id against every user (or only candidate_ids); returns (row indices, scores)."""
+        scores = self.features @ self.features[self.row_of[user_id]]
+
+        mask = self.user_ids != user_id
+        if candidate_ids is not None:
+            mask &= np.isin(self.user_ids, np.fromiter(candidate_ids, dtype=np.int64))
+        if exclude_ids:
+            mask &= ~np.isin(self.user_ids, np.fromiter(exclude_ids, dtype=np.int64))
+        rows = np.flatnonzero(mask)
+        return rows, scores[rows]
+
+    def top_k(self, user_id, k, candidate_ids=None, exclude_ids=()):
+        """Return the k best-scoring users as a list of dicts, highest score first."""
+        rows, scores = self.score(user_id, candidate_ids, exclude_ids)
+        if len(rows) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return [
+            {
+                'UserID': int(self.user_ids[r]),
+                'name': self.names[r],
+                'email': self.emails[r],
+                'compatibility_score': round(float(s) * 100, 1),
+            }
+            for r, s in zip(rows[order], scores[order])
+        ]
+
+
+def load_engine(cursor):
+    """Read all user features from MySQL and build a fresh CompatibilityEngine."""
+    cursor.execute("""
+        SELECT u.userid, u.name, u.email, u.major, u.learning_style, u.availability,
+               u.availability_mask, c.academic_goals
+        FROM user u
+        LEFT JOIN compatibility c ON c.userid = u.userid
+        ORDER BY u.userid
+    """)
+    users = cursor.fetchall()
+    cursor.execute("SELECT userid, interestid FROM user_interests")
+    interests = cursor.fetchall()
+    return CompatibilityEngine(users, interests)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(cursor, user_id=None):
+    """
+    Return the shared engine, rebuilding it when it is older than FEATURE_TTL_SECONDS
+    or when user_id is not in it yet (e.g. a user who registered after the last load).
+    The reload reads every user under a global lock, so callers should first check that
+    user_id exists.
+    """
+    global _engine
+    with _engine_lock:
+        stale = _engine is None or time.time() - _engine.loaded_at > FEATURE_TTL_SECONDS
+        if stale or (user_id is not None and user_id not in _engine):
+            _engine = load_engine(cursor)
+        return _engine
@@ -1,10 +1,43 @@
+import json
+
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.response_cache import cache
+from backend.user_matching import ann_index, availability
+from backend.learning_style import feature_store
+from backend.user_profile.user_listing import parse_listing_args, fetch_users_page
 
 user_profile_bp = Blueprint('user_profile', __name__)
 
+# Sections GET /users/<id>/dashboard can return (all of them by default)
+DASHBOARD_FIELDS = ('user', 'resources', 'groups', 'matches', 'potential_matches')
+
+# JSON-aggregated subqueries used by the dashboard query, one per list section
+DASHBOARD_SUBQUERIES = {
+    'resources': """
+        SELECT JSON_ARRAYAGG(JSON_OBJECT(
+            'resourceid', r.resourceid, 'resource_link', r.resource_link, 'resource_type', r.resource_type))
+        FROM resource r
+        JOIN user_resource ur ON r.resourceid = ur.resourceid
+        WHERE ur.userid = u.userid
+    """,
+    'groups': """
+        SELECT JSON_ARRAYAGG(JSON_OBJECT('groupid', sg.groupid, 'group_name', sg.group_name))
+        FROM group_student gs
+        JOIN study_group sg ON gs.groupid = sg.groupid
+        WHERE gs.studentid = u.userid
+    """,
+    'matches': """
+        SELECT JSON_ARRAYAGG(JSON_OBJECT('matched_user_id', o.userid, 'matched_user_name', o.name))
+        FROM match_edge e
+        JOIN user o ON o.userid = e.peer_id
+        WHERE e.user_id = u.userid
+    """,
+}
+
 # GET /users/<user_id>
 @user_profile_bp.route('/<int:user_id>', methods=['GET'])
+@cache.cached(tags=('user',))
 def get_user_details(user_id):
     """Gets details for a specific user."""
     cursor = None
@@ -45,6 +78,7 @@ def register_user():
 
 # PUT /users/<user_id>
 @user_profile_bp.route('/<int:user_id>', methods=['PUT'])
+@cache.invalidates('user')
 def update_user_profile(user_id):
     """Updates a user's profile information."""
     data = request.get_json()
@@ -66,6 +100,10 @@ def update_user_profile(user_id):
             if field in data:
                 set_clauses.append(f"{field} = %s")
                 params.append(data[field])
+        if 'availability' in data:
+            # Keep the parsed slot bitmask in step with the text
+            set_clauses.append("availability_mask = %s")
+            params.append(availability.parse_mask(data['availability']))
 
         if not set_clauses:
              return jsonify({"error": "No valid fields provided for update"}), 400
@@ -77,6 +115,11 @@ def update_user_profile(user_id):
         conn.commit()
 
         if rows_affected > 0:
+            ann_index.upsert_user(cursor, user_id)
+            if 'availability' in data:
+                availability.update_user(user_id, availability.parse_mask(data['availability']))
+            if 'learning_style' in data:
+                feature_store.update_learning_style(user_id, data['learning_style'])
             # Optionally fetch and return updated user data
             cursor.execute("SELECT userid, name, email, major, learning_style, availability FROM user WHERE userid = %s", (user_id,))
             updated_user = cursor.fetchone()
@@ -101,6 +144,7 @@ def update_user_profile(user_id):
 
 # DELETE /users/<user_id>
 @user_profile_bp.route('/<int:user_id>', methods=['DELETE'])
+@cache.invalidates('user', 'group_student', 'matched_with')
 def delete_user(user_id):
     """Deletes a user account (placeholder)."""
     # Placeholder logic: Replace with actual user deletion implementation
@@ -121,6 +165,7 @@ def delete_user(user_id):
         conn.commit()
         
         if rows_affected > 0:
+            ann_index.remove_user(user_id)
             return jsonify({"message": f"User {user_id} deleted successfully"}), 200
         else:
             return jsonify({"error": "User not found or could not be deleted"}), 404
@@ -136,6 +181,7 @@ def delete_user(user_id):
 
 # GET /users/<int:user_id>/groups
 @user_profile_bp.route('/<int:user_id>/groups', methods=['GET'])
+@cache.cached(tags=('group_student', 'study_group'))
 def get_user_groups_membership(user_id):
     """Fetches all study groups (ID and Name) the given user is a member of."""
     cursor = None
@@ -164,28 +210,65 @@ def get_user_groups_membership(user_id):
         if cursor:
             cursor.close()
 
+def _find_potential_matches(cursor, user_id, k, matched_ids, min_overlap_hours=0):
+    """
+    Return the k nearest users from the ANN index as user rows with a similarity
+    score and the hours per week both are free (availability_overlap_hours), or
+    None if user_id does not exist. With min_overlap_hours, users sharing fewer
+    free hours are skipped.
+    """
+    index = ann_index.get_index(cursor)
+    if user_id not in index:
+        ann_index.upsert_user(cursor, user_id)
+        if user_id not in index:
+            return None
+    slots = availability.get_index(cursor, user_id)
+    exclude_ids = set(matched_ids)
+    if min_overlap_hours > 0:
+        exclude_ids |= slots.short_overlap(user_id, min_overlap_hours)
+    neighbours = index.query(user_id, k, exclude_ids=exclude_ids)
+    if not neighbours:
+        return []
+
+    ids = [uid for uid, _ in neighbours]
+    cursor.execute(f"""
+        SELECT u.userid, u.name, u.email, u.major, u.learning_style, u.availability 
+        FROM user u
+        WHERE u.userid IN ({', '.join(['%s'] * len(ids))})
+    """, tuple(ids))
+    users = {row['userid']: row for row in cursor.fetchall()}
+
+    overlap = slots.overlap_map(user_id, ids)
+    potential_matches = []
+    for uid, similarity in neighbours:
+        if uid in users:
+            potential_matches.append(dict(users[uid], similarity=round(similarity, 3),
+                                          availability_overlap_hours=overlap.get(uid, 0)))
+        else:
+            # Deleted by another worker since the index was built
+            ann_index.remove_user(uid)
+    return potential_matches
+
 # GET /users/<int:user_id>/potential-matches
 @user_profile_bp.route('/<int:user_id>/potential-matches', methods=['GET'])
 def get_potential_matches_for_user(user_id):
-    """Fetches up to 5 potential study matches, excluding the current user and existing matches."""
+    """
+    Fetches the k (default 5) most similar users, excluding the current user and existing matches.
+    Candidates come from the approximate nearest-neighbour index (see user_matching/ann_index.py).
+    ?min_overlap_hours= only keeps users free at the same time for at least that many hours a week.
+    """
     cursor = None
     try:
+        k = min(max(request.args.get('k', 5, type=int), 1), 50)
+        min_overlap_hours = max(request.args.get('min_overlap_hours', 0, type=int), 0)
         cursor = db.get_db().cursor()
-        # Select relevant user details, exclude the current user and already matched users, limit to 5
-        query = """
-            SELECT u.userid, u.name, u.email, u.major, u.learning_style, u.availability 
-            FROM user u
-            WHERE u.userid != %s 
-            AND u.userid NOT IN (
-                SELECT CASE WHEN mw.user1_id = %s THEN mw.user2_id ELSE mw.user1_id END
-                FROM matched_with mw
-                WHERE mw.user1_id = %s OR mw.user2_id = %s
-            )
-            ORDER BY RAND() -- Randomize the selection 
-            LIMIT 5
-        """
-        cursor.execute(query, (user_id, user_id, user_id, user_id))
-        potential_matches = cursor.fetchall()
+
+        cursor.execute("SELECT peer_id AS userid FROM match_edge WHERE user_id = %s", (user_id,))
+        matched_ids = [row['userid'] for row in cursor.fetchall()]
+
+        potential_matches = _find_potential_matches(cursor, user_id, k, matched_ids, min_overlap_hours)
+        if potential_matches is None:
+            return jsonify({"error": "User not found"}), 404
         return jsonify(potential_matches), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -193,20 +276,75 @@ def get_potential_matches_for_user(user_id):
         if cursor:
             cursor.close()
 
+# GET /users/<int:user_id>/dashboard
+@user_profile_bp.route('/<int:user_id>/dashboard', methods=['GET'])
+@cache.cached(tags=('user', 'resource', 'user_resource', 'group_student', 'study_group', 'matched_with'))
+def get_user_dashboard(user_id):
+    """
+    Everything the student dashboard page shows, in one response: the user row,
+    resources, groups, matches and potential_matches. ?fields=a,b limits the sections;
+    ?k= sets the number of potential matches (default 5).
+    The user row and every list are read by a single query (JSON-aggregated subqueries);
+    potential matches add one lookup of the candidates' rows.
+    """
+    cursor = None
+    try:
+        fields = [f.strip() for f in request.args.get('fields', ','.join(DASHBOARD_FIELDS)).split(',') if f.strip()]
+        unknown = [f for f in fields if f not in DASHBOARD_FIELDS]
+        if unknown or not fields:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}",
+                            "fields": list(DASHBOARD_FIELDS)}), 400
+        k = min(max(request.args.get('k', 5, type=int), 1), 50)
+
+        # Potential matches exclude existing matches, so they need the matches list too
+        sections = [name for name in DASHBOARD_SUBQUERIES
+                    if name in fields or (name == 'matches' and 'potential_matches' in fields)]
+        select = ["u.userid, u.name, u.email, u.major, u.learning_style, u.availability"]
+        select += [f"({DASHBOARD_SUBQUERIES[name]}) AS `{name}`" for name in sections]
+
+        cursor = db.get_db().cursor()
+        cursor.execute(f"SELECT {', '.join(select)} FROM user u WHERE u.userid = %s", (user_id,))
+        row = cursor.fetchone()
+        if not row:
+            return jsonify({"error": "User not found"}), 404
+
+        dashboard = {}
+        if 'user' in fields:
+            dashboard['user'] = {key: row[key] for key in
+                                 ('userid', 'name', 'email', 'major', 'learning_style', 'availability')}
+        for name in sections:
+            dashboard[name] = json.loads(row[name]) if row[name] else []
+        if 'potential_matches' in fields:
+            matched_ids = [m['matched_user_id'] for m in dashboard['matches']]
+            dashboard['potential_matches'] = _find_potential_matches(cursor, user_id, k, matched_ids) or []
+        if 'matches' not in fields:
+            dashboard.pop('matches', None)
+        return jsonify(dashboard), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
 # GET /users/all
 @user_profile_bp.route('/all', methods=['GET'])
+@cache.cached(tags=('user',))
 def get_all_users():
-    """Fetches details for all users needed for display (excluding sensitive info like passwords)."""
+    """
+    Fetches one page of users for display (excluding sensitive info like passwords).
+    Query params: limit, cursor (next_cursor from the previous page), major, learning_style, availability.
+    """
     cursor = None
     try:
+        try:
+            listing_args = parse_listing_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         cursor = db.get_db().cursor()
-        # Select relevant details for display
-        query = "SELECT userid, name, email, major, learning_style, availability FROM user"
-        cursor.execute(query)
-        users = cursor.fetchall()
-        return jsonify(users), 200
+        users, next_cursor = fetch_users_page(cursor, **listing_args)
+        return jsonify({"users": users, "next_cursor": next_cursor}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     finally:
         if cursor:
-            cursor.close() 
\ No newline at end of file
+            cursor.close()
@@ -0,0 +1,93 @@
+#------------------------------------------------------------
+# Keyset-paginated, filtered listing of the user table.
+#
+# Shared by GET /users/all and GET /admin/users. Pages are keyed on
+# userid ("give me the next `limit` users after userid X"), so every
+# page is a primary key range scan no matter how deep the client is,
+# instead of one unbounded SELECT over the whole table.
+#
+# The availability filter is parsed into a 168-hour slot mask (see
+# backend/user_matching/availability.py) and keeps users free for at
+# least one of those hours: a bitwise AND with user.availability_mask,
+# checked on each row of the userid range scan. Rows without a stored
+# mask fall back to an escaped substring match on the free text.
+#------------------------------------------------------------
+from backend.user_matching.availability import parse_mask
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+USER_COLUMNS = "userid, name, email, major, learning_style, availability"
+
+
+def parse_listing_args(args):
+    """
+    Read limit / cursor / filters from request.args.
+    Raises ValueError for a malformed limit or cursor.
+    """
+    limit = args.get('limit')
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    elif not limit.isdigit() or int(limit) < 1:
+        raise ValueError("limit must be a positive integer")
+    else:
+        limit = int(limit)
+    cursor = args.get('cursor')
+    if cursor is not None and not cursor.isdigit():
+        raise ValueError("cursor must be a next_cursor value returned by a previous page")
+    return {
+        'limit': min(limit, MAX_PAGE_SIZE),
+        'after': int(cursor) if cursor is not None else 0,
+        'major': args.get('major') or None,
+        'learning_style': args.get('learning_style') or None,
+        'availability': args.get('availability') or None,
+    }
+
+
+def like_escape(text):
+    """Escape LIKE's wildcards (and its escape character) so text matches literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def page_query(limit, after=0, major=None, learning_style=None, availability=None):
+    """(SQL, params) for one page; also EXPLAINed by backend.migrations.hot_queries."""
+    where = ["userid > %s"]
+    params = [after]
+    if major:
+        where.append("major = %s")
+        params.append(major)
+    if learning_style:
+        where.append("learning_style = %s")
+        params.append(learning_style)
+    if availability:
+        like = f"%{like_escape(availability)}%"
+        mask = parse_mask(availability)
+        if any(mask):
+            where.append("(BIT_COUNT(availability_mask & %s) > 0"
+                         " OR (availability_mask IS NULL AND availability LIKE %s))")
+            params += [mask, like]
+        else:
+            where.append("availability LIKE %s")
+            params.append(like)
+
+    # Fetch one extra row to know whether another page exists
+    params.append(limit + 1)
+    return f"""
+        SELECT {USER_COLUMNS}
+        FROM user
+        WHERE {' AND '.join(where)}
+        ORDER BY userid
+        LIMIT %s
+    """, tuple(params)
+
+
+def fetch_users_page(cursor, limit, after=0, major=None, learning_style=None, availability=None):
+    """Return (users, next_cursor); next_cursor is None on the last page."""
+    cursor.execute(*page_query(limit, after, major, learning_style, availability))
+    users = list(cursor.fetchall())
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = str(users[-1]['userid'])
+    return users, next_cursor
@@ -1,10 +1,12 @@
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.response_cache import cache
 
 user_resources_bp = Blueprint('user_resources', __name__)
 
 # GET /users/<int:user_id>/resources
 @user_resources_bp.route('/users/<int:user_id>/resources', methods=['GET'])
+@cache.cached(tags=('resource', 'user_resource'))
 def get_user_resources(user_id):
     """Retrieve all resources associated with the user."""
     cursor = None 
@@ -27,6 +29,7 @@ def get_user_resources(user_id):
 
 # POST /users/<int:user_id>/resources
 @user_resources_bp.route('/users/<int:user_id>/resources', methods=['POST'])
+@cache.invalidates('resource', 'user_resource')
 def add_user_resource(user_id):
     """Add a new resource for the user."""
     cursor = None 
@@ -67,6 +70,7 @@ def add_user_resource(user_id):
 
 # PUT /resources/<int:resource_id>
 @user_resources_bp.route('/resources/<int:resource_id>', methods=['PUT'])
+@cache.invalidates('resource')
 def update_resource(resource_id):
     """Updates an existing resource."""
     data = request.get_json()
@@ -118,6 +122,7 @@ def update_resource(resource_id):
 
 # DELETE /resources/<int:resource_id>
 @user_resources_bp.route('/resources/<int:resource_id>', methods=['DELETE'])
+@cache.invalidates('resource', 'user_resource')
 def delete_resource(resource_id):
     """Deletes a resource and its associations."""
     conn = None
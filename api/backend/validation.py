@@ -0,0 +1,10 @@
+#------------------------------------------------------------
+# Checks shared by routes that take ids in a JSON body.
+#------------------------------------------------------------
+
+
+def is_integral(value):
+    """True for ints and whole-number floats (JSON 3.0), but not bools or strings."""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
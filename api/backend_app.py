@@ -9,6 +9,8 @@ from backend.rest_entry import create_app
 # create the app object
 app = create_app()
 
+# In Docker the API is served by gunicorn through serve.py;
+# running this file directly starts the single-process dev server.
 if __name__ == '__main__':
     # we want to run in debug mode (for hot reloading) 
     # this app will be bound to port 4000. 
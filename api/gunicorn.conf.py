@@ -0,0 +1,89 @@
+#------------------------------------------------------------
+# gunicorn settings for serving the API in production
+# (started by serve.py; see the README's "Serving the API" section).
+#
+# Each worker is a separate process with its own DB connection pool,
+# response cache and profiling stats, and runs API_THREADS request
+# threads. Keep API_WORKERS x DB_POOL_MAX_SIZE below MySQL's
+# max_connections (151 by default). Workers publish their profiling
+# stats and slow queries to PROFILING_SHARED_DIR (a fresh temporary
+# directory unless set), so /metrics, /admin/metrics and
+# /admin/slow-queries report the whole server whichever worker answers.
+#
+# Graceful reload (new code, no dropped requests): kill -HUP <master pid>
+#------------------------------------------------------------
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)).strip())
+
+
+def _env_bool(name, default=False):
+    return os.getenv(name, '1' if default else '0').strip().lower() in ('1', 'true', 'yes')
+
+
+bind = f"0.0.0.0:{_env_int('API_PORT', 4000)}"
+worker_class = 'gthread'
+workers = _env_int('API_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8))
+threads = _env_int('API_THREADS', 4)
+
+# Request queue limits: connections waiting to be accepted by the
+# listening socket, and open client connections per worker
+backlog = _env_int('API_BACKLOG', 512)
+worker_connections = _env_int('API_WORKER_CONNECTIONS', 100)
+
+timeout = _env_int('API_TIMEOUT', 60)
+graceful_timeout = _env_int('API_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('API_KEEPALIVE', 5)
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = _env_int('API_MAX_REQUESTS', 5000)
+max_requests_jitter = _env_int('API_MAX_REQUESTS_JITTER', 500)
+
+# Load the app once in the master and fork it into the workers (faster
+# start, shared memory); leave off with API_RELOAD, which needs per-worker loading
+preload_app = _env_bool('API_PRELOAD')
+# Restart workers when source files change (development only)
+reload = _env_bool('API_RELOAD')
+
+accesslog = os.getenv('API_ACCESS_LOG', '-') or None
+loglevel = os.getenv('API_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # The DB pool also resets itself through os.register_at_fork; doing it
+    # here too keeps gunicorn workers safe if the app was preloaded
+    from backend.db_connection import db
+    db.reset_after_fork()
+
+
+def post_worker_init(worker):
+    # Threads don't survive fork, so a preloaded app's snapshot refresh
+    # thread only runs in the master; start one in every worker (the refresh
+    # itself is serialized across workers by a MySQL lock)
+    from backend.data_analyst import snapshots
+    snapshots.start_refresh_job(worker.wsgi)
+
+
+def on_starting(server):
+    # Set before any worker forks, so every worker inherits the same directory
+    if not os.getenv('PROFILING_SHARED_DIR'):
+        os.environ['PROFILING_SHARED_DIR'] = tempfile.mkdtemp(prefix='studybuddy-profiling-')
+        server._profiling_dir_created = True
+    from backend.profiling import shared
+    shared.start_server()
+
+
+def child_exit(server, worker):
+    # Keep an exited worker's counters in the server-wide totals
+    from backend.profiling import shared
+    shared.retire_worker(worker.pid)
+
+
+def on_exit(server):
+    if getattr(server, '_profiling_dir_created', False):
+        shutil.rmtree(os.environ['PROFILING_SHARED_DIR'], ignore_errors=True)
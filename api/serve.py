@@ -0,0 +1,65 @@
+###
+# Launcher for the API
+#
+#   python serve.py                  production: gunicorn, settings in gunicorn.conf.py
+#   python serve.py --workers 4 --threads 8
+#   python serve.py --asgi           uvicorn serving asgi.py (API_WORKERS processes)
+#   python serve.py --dev            single-process Flask dev server with the reloader
+#
+# API_SERVER=asgi / API_SERVER=dev have the same effect as --asgi / --dev.
+###
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python serve.py')
+    server = os.getenv('API_SERVER', '').strip()
+    parser.add_argument('--dev', action='store_true', default=server == 'dev',
+                        help='run the Flask development server instead of gunicorn')
+    parser.add_argument('--asgi', action='store_true', default=server == 'asgi',
+                        help='serve asgi.py with uvicorn instead of gunicorn')
+    parser.add_argument('--workers', type=int, help='worker processes (default: API_WORKERS)')
+    parser.add_argument('--threads', type=int, help='threads per worker (default: API_THREADS)')
+    parser.add_argument('--port', type=int, help='port (default: API_PORT or 4000)')
+    args = parser.parse_args(argv)
+
+    if args.dev:
+        from backend_app import app
+        app.run(debug=True, host='0.0.0.0', port=args.port or int(os.getenv('API_PORT', '4000')))
+        return 0
+
+    if args.asgi:
+        import uvicorn
+        # Let the uvicorn workers merge their profiling stats (see backend/profiling/shared.py)
+        created_dir = None
+        if not os.getenv('PROFILING_SHARED_DIR'):
+            created_dir = os.environ['PROFILING_SHARED_DIR'] = tempfile.mkdtemp(prefix='studybuddy-profiling-')
+        try:
+            uvicorn.run('asgi:asgi_app', host='0.0.0.0',
+                        port=args.port or int(os.getenv('API_PORT', '4000')),
+                        workers=args.workers or int(os.getenv('API_WORKERS', '4')),
+                        backlog=int(os.getenv('API_BACKLOG', '512')),
+                        limit_concurrency=int(os.getenv('API_WORKER_CONNECTIONS', '100')),
+                        timeout_graceful_shutdown=int(os.getenv('API_GRACEFUL_TIMEOUT', '30')))
+        finally:
+            if created_dir:
+                shutil.rmtree(created_dir, ignore_errors=True)
+        return 0
+
+    # Command line options win over the environment read by gunicorn.conf.py
+    for option, name in (('workers', 'API_WORKERS'), ('threads', 'API_THREADS'), ('port', 'API_PORT')):
+        if getattr(args, option) is not None:
+            os.environ[name] = str(getattr(args, option))
+
+    from gunicorn.app.wsgiapp import run
+    config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    sys.argv = ['gunicorn', '--config', config, 'backend_app:app']
+    return run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import re
+
+import pytest
+from flask import Flask
+
+from backend.db_connection import db
+from backend.response_cache import cache
+
+
+class FakeCursor:
+    """DictCursor stand-in: every statement is logged and answered by the connection's handler."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.connection = conn
+        self.rowcount = 0
+        self.lastrowid = None
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        sql = re.sub(r'\s+', ' ', sql).strip()
+        self.conn.statements.append((sql, params))
+        result = self.conn.handler(sql, params)
+        if isinstance(result, int):
+            self.rowcount, self._rows = result, []
+        else:
+            self._rows = list(result or [])
+            self.rowcount = len(self._rows)
+        self.lastrowid = self.conn.lastrowid
+        return self.rowcount
+
+    def executemany(self, sql, seq):
+        total = 0
+        for params in seq:
+            total += self.execute(sql, params)
+        self.rowcount = total
+        return total
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda sql, params: [])
+        self.statements = []
+        self.lastrowid = None
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def executed(self, fragment):
+        """(sql, params) of the statements containing fragment."""
+        return [(sql, params) for sql, params in self.statements if fragment in sql]
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    connection = FakeConnection()
+    monkeypatch.setattr(db, 'get_db', lambda: connection)
+    cache.clear()
+    return connection
+
+
+@pytest.fixture
+def make_client(conn):
+    """Test client for an app serving only the given (blueprint, url_prefix) pairs."""
+    def make(*blueprints):
+        app = Flask(__name__)
+        for blueprint, prefix in blueprints:
+            app.register_blueprint(blueprint, url_prefix=prefix)
+        return app.test_client()
+    return make
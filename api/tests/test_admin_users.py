@@ -0,0 +1,67 @@
+import pytest
+
+from backend.admin_dash.admindash_routes import admin
+from backend.user_matching import ann_index, availability
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((admin, '/admin'))
+
+
+@pytest.fixture(autouse=True)
+def upserts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ann_index, 'upsert_user', lambda cursor, user_id: calls.append(user_id))
+    return calls
+
+
+@pytest.fixture
+def index(monkeypatch):
+    loaded = availability.AvailabilityIndex([(5, availability.parse_mask('weekends'))])
+    monkeypatch.setattr(availability, '_index', loaded)
+    return loaded
+
+
+def test_admin_edit_rewrites_availability_mask(client, conn, index):
+    conn.handler = lambda sql, params: 1 if sql.startswith('UPDATE user') else []
+
+    response = client.put('/admin/users/5', json={'availability': 'weekdays 9-5'})
+
+    assert response.status_code == 200
+    [(sql, params)] = conn.executed('UPDATE user')
+    assert 'availability_mask = %s' in sql
+    assert params == ('weekdays 9-5', availability.parse_mask('weekdays 9-5'), 5)
+    assert index.hours(5) == 5 * 8
+
+
+def test_admin_edit_reindexes_user(client, conn, upserts):
+    conn.handler = lambda sql, params: 1 if sql.startswith('UPDATE user') else []
+
+    assert client.put('/admin/users/5', json={'major': 'Physics'}).status_code == 200
+    assert upserts == [5]
+
+
+def test_admin_edit_without_availability_keeps_mask(client, conn, index):
+    conn.handler = lambda sql, params: 1 if sql.startswith('UPDATE user') else []
+
+    response = client.put('/admin/users/5', json={'major': 'Physics'})
+
+    assert response.status_code == 200
+    [(sql, params)] = conn.executed('UPDATE user')
+    assert 'availability_mask' not in sql
+    assert index.hours(5) == 2 * 14
+
+
+def test_admin_create_stores_availability_mask(client, conn, index, upserts):
+    conn.lastrowid = 7
+
+    response = client.post('/admin/users', json={'name': 'Ann', 'email': 'ann@example.com',
+                                                 'password': 'pw', 'availability': 'Mon/Wed 6pm-9pm'})
+
+    assert response.status_code == 201
+    [(sql, params)] = conn.executed('INSERT INTO user')
+    assert 'availability_mask' in sql
+    assert params[-2:] == ('Mon/Wed 6pm-9pm', availability.parse_mask('Mon/Wed 6pm-9pm'))
+    assert index.overlap_map(7) == {5: 0, 7: 6}
+    assert upserts == [7]
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.user_matching import ann_index, availability
+
+
+def _user(userid, major, availability='weekdays 9-5'):
+    return {'userid': userid, 'major': major, 'learning_style': 'visual', 'availability': availability,
+            'visual_percentage': None, 'auditory_percentage': None,
+            'reading_writing_percentage': None, 'kinesthetic_percentage': None}
+
+
+@pytest.fixture
+def users(conn):
+    """Fake user table plus change log, served through the conn fixture."""
+    state = {'users': {uid: _user(uid, 'Biology') for uid in (1, 2, 3)}, 'changes': []}
+
+    def handler(sql, params):
+        if sql.startswith('SELECT COALESCE(MAX(change_id)'):
+            return [{'change_id': max((c for c, _ in state['changes']), default=0)}]
+        if sql.startswith('SELECT change_id, userid FROM user_embedding_change'):
+            return [{'change_id': c, 'userid': u} for c, u in state['changes'] if c > params[0]]
+        if sql.startswith('SELECT u.userid, u.major'):
+            wanted = set(params) if params else set(state['users'])
+            return [row for uid, row in state['users'].items() if uid in wanted]
+        return []
+    conn.handler = handler
+    return state
+
+
+def test_sync_applies_changes_made_elsewhere(conn, users):
+    index = ann_index.build_index(conn.cursor())
+    assert sorted(index.row_of) == [1, 2, 3]
+
+    # Another worker adds user 4, edits user 2 and deletes user 3
+    users['users'][4] = _user(4, 'Biology')
+    users['users'][2] = _user(2, 'History', 'weekends')
+    del users['users'][3]
+    users['changes'] += [(1, 4), (2, 2), (3, 3)]
+
+    assert ann_index.sync_index(conn.cursor(), index) == 3
+    assert sorted(index.row_of) == [1, 2, 4]
+    assert index.last_change_id == 3
+    expected = ann_index.embed(users['users'][2], ann_index.get_default_distribution('visual'), [])
+    assert np.allclose(index.vectors[index.row_of[2]], expected)
+
+
+def test_build_prunes_old_changes(conn, users):
+    ann_index.build_index(conn.cursor())
+
+    [(sql, params)] = conn.executed('DELETE FROM user_embedding_change')
+    assert params == (2 * ann_index.REBUILD_SECONDS,)
+    assert conn.commits == 1
+
+
+def test_save_is_atomic_and_keeps_change_position(conn, users, tmp_path):
+    index = ann_index.build_index(conn.cursor())
+    index.last_change_id = 42
+    path = str(tmp_path / 'index.npz')
+
+    index.save(path)
+
+    assert os.listdir(tmp_path) == ['index.npz']
+    loaded = ann_index.AnnIndex.load(path)
+    assert sorted(loaded.row_of) == [1, 2, 3]
+    assert loaded.last_change_id == 42
+
+
+def test_failed_save_leaves_previous_file(conn, users, tmp_path, monkeypatch):
+    index = ann_index.build_index(conn.cursor())
+    path = str(tmp_path / 'index.npz')
+    index.save(path)
+    before = open(path, 'rb').read()
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+    monkeypatch.setattr(np, 'savez', fail)
+    with pytest.raises(OSError):
+        index.save(path)
+
+    assert os.listdir(tmp_path) == ['index.npz']
+    assert open(path, 'rb').read() == before
+
+
+def test_load_rejects_index_of_another_dimension(conn, users, tmp_path):
+    path = str(tmp_path / 'index.npz')
+    stale = ann_index.AnnIndex(planes=np.zeros((ann_index.NUM_TABLES, ann_index.BITS_PER_TABLE, ann_index.DIM - availability.BLOCKS + 21)))
+    stale.save(path)
+
+    with pytest.raises(ValueError):
+        ann_index.AnnIndex.load(path)
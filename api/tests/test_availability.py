@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from backend.user_matching.availability import (
+    BLOCK_HOURS, BLOCKS, DAYS, MASK_BYTES, SLOTS, WORDS, AvailabilityIndex, mask_to_slots, mask_to_words,
+    parse_mask, parse_slots, popcount, slot_blocks, user_mask,
+)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Mon/Wed 6pm-9pm', {'monday': [18, 19, 20], 'wednesday': [18, 19, 20]}),
+    ('9-11am', {day: [9, 10] for day in DAYS}),
+    ('8pm-12am', {day: [20, 21, 22, 23] for day in DAYS}),
+    ('weekdays 9-5', {day: list(range(9, 17)) for day in DAYS[:5]}),
+    ('flexible', {day: list(range(8, 22)) for day in DAYS}),
+    ('', {}),
+    (None, {}),
+])
+def test_parse_mask_phrasings(text, expected):
+    mask = parse_mask(text)
+    assert len(mask) == MASK_BYTES
+    assert mask_to_slots(mask) == expected
+
+
+def test_flexible_and_empty_hours():
+    assert parse_slots('flexible').sum() == 98
+    assert parse_slots('').sum() == 0
+    assert parse_slots(None).sum() == 0
+
+
+def test_popcount_matches_unpackbits():
+    rng = np.random.default_rng(0)
+    words = rng.integers(0, 2 ** 63, size=(WORDS, 50), dtype=np.int64).astype(np.uint64)
+    words[:, 0] = np.uint64(2 ** 64 - 1)
+    words[:, 1] = 0
+    expected = np.unpackbits(words.T.copy().view(np.uint8), axis=1).sum(axis=1)
+    assert popcount(words).tolist() == expected.tolist()
+    assert popcount(words)[0] == WORDS * 64
+
+
+def test_mask_to_words_round_trip():
+    mask = parse_mask('weekends')
+    words = mask_to_words(mask)
+    assert words.dtype == np.uint64 and len(words) == WORDS
+    assert int(popcount(words.reshape(WORDS, 1))[0]) == 2 * 14
+    assert words.tobytes()[:MASK_BYTES] == mask
+    assert SLOTS == MASK_BYTES * 8
+
+
+def test_index_overlap():
+    index = AvailabilityIndex([(1, parse_mask('Mon/Wed 6pm-9pm')),
+                               (2, parse_mask('monday evening')),
+                               (3, parse_mask('weekends'))])
+    assert index.hours(1) == 6
+    assert index.hours(99) == 0
+    assert index.overlap_map(1) == {1: 6, 2: 3, 3: 0}
+    assert index.overlap_map(1, candidate_ids=[2, 3]) == {2: 3, 3: 0}
+    assert index.short_overlap(1, 3) == {3}
+
+    user_ids, shared = index.overlap(99)
+    assert len(user_ids) == 0 and len(shared) == 0
+
+
+def test_index_update_inserts_and_replaces():
+    index = AvailabilityIndex([(1, parse_mask('Mon/Wed 6pm-9pm'))])
+
+    index.update(2, parse_mask('wednesday 6pm-9pm'))
+    assert 2 in index and len(index) == 2
+    assert index.overlap_map(1) == {1: 6, 2: 3}
+
+    index.update(2, parse_mask('weekends'))
+    assert len(index) == 2
+    assert index.overlap_map(1, candidate_ids=[2]) == {2: 0}
+    assert index.hours(2) == 28
+
+
+def test_slot_blocks_are_free_fraction_per_block():
+    blocks = slot_blocks(parse_mask('Mon 9am-11am'))
+    assert blocks.shape == (BLOCKS,)
+    assert blocks.dtype == np.float32
+    # Monday 8-12 block holds hours 9 and 10
+    assert blocks[8 // BLOCK_HOURS] == 0.5
+    assert blocks.sum() == 0.5
+    assert np.allclose(slot_blocks(None), 0)
+
+
+def test_user_mask_prefers_stored_mask():
+    stored = parse_mask('weekends')
+    assert user_mask({'availability': 'weekdays 9-5', 'availability_mask': stored}) == stored
+    assert user_mask({'availability': 'weekdays 9-5', 'availability_mask': None}) == parse_mask('weekdays 9-5')
+    assert user_mask({'availability': 'weekdays 9-5'}) == parse_mask('weekdays 9-5')
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from backend.user_matching import coenrollment
+from backend.user_matching.coenrollment import CoEnrollmentGraph
+
+
+def _overlaps(graph, user_id):
+    user_ids, shared, jaccard = graph.overlap(user_id)
+    return {uid: (s, round(j, 6)) for uid, s, j in zip(user_ids.tolist(), shared.tolist(), jaccard.tolist())}
+
+
+@pytest.fixture
+def small_merges(monkeypatch):
+    monkeypatch.setattr(coenrollment, 'MERGE_MIN_ENTRIES', 20)
+
+
+def test_refresh_appends_without_rebuilding(monkeypatch):
+    graph = CoEnrollmentGraph([(1, 10), (2, 10), (2, 11)])
+    indices = graph.indices
+
+    def fail(*args, **kwargs):
+        raise AssertionError('add_pairs re-sorted the stored entries')
+    monkeypatch.setattr(np, 'unique', fail)
+
+    assert graph.add_pairs([(1, 11), (3, 10), (1, 10)]) == 2
+    assert graph.indices is indices
+    assert graph.nnz == 5
+    assert sorted(graph.courses_of(1)) == [10, 11]
+    assert _overlaps(graph, 1)[2] == (2, 1.0)
+    assert _overlaps(graph, 3)[1] == (1, 0.5)
+
+
+def test_incremental_graph_matches_one_built_at_once(small_merges):
+    rng = random.Random(7)
+    pairs = [(rng.randrange(60), rng.randrange(15)) for _ in range(600)]
+    graph = CoEnrollmentGraph(pairs[:100])
+
+    for start in range(100, len(pairs), 23):
+        graph.add_pairs(pairs[start:start + 23])
+        expected = CoEnrollmentGraph(pairs[:start + 23])
+        assert graph.nnz == expected.nnz
+        for user_id in (pairs[start][0], 0, 59):
+            assert _overlaps(graph, user_id) == _overlaps(expected, user_id)
+            assert sorted(graph.courses_of(user_id)) == sorted(expected.courses_of(user_id))
+
+
+def test_pending_entries_are_merged_in_batches(small_merges):
+    graph = CoEnrollmentGraph([(0, 0)])
+
+    graph.add_pairs([(1, c) for c in range(20)])
+    assert len(graph.pending) == 20 and graph.nnz == 21
+
+    graph.add_pairs([(2, 0)])
+    assert not graph.pending
+    assert len(graph.indices) == 22
+    assert sorted(graph.courses_of(1)) == list(range(20))
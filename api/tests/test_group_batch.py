@@ -0,0 +1,60 @@
+import pytest
+
+from backend.user_groups.group_routes import user_groups_bp
+
+
+@pytest.fixture
+def client(make_client, conn):
+    # Group 1 and users 2 and 3 exist; user 3 is already a member
+    def handler(sql, params):
+        if sql.startswith("SELECT 'group'"):
+            return [{'kind': 'group', 'id': 1, 'studentid': None},
+                    {'kind': 'user', 'id': 2, 'studentid': None},
+                    {'kind': 'user', 'id': 3, 'studentid': None},
+                    {'kind': 'member', 'id': 1, 'studentid': 3}]
+        return []
+    conn.handler = handler
+    return make_client((user_groups_bp, '/groups'))
+
+
+def test_group_batch_reports_non_integer_ids_as_invalid(client, conn):
+    response = client.post('/groups/1/members:batch', json={'add': [2, 12.9, True, '4', 3.0]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['added'] == 1 and body['already_member'] == 1 and body['invalid'] == 3
+    assert [r['item'] for r in body['results'] if r['status'] == 'invalid'] == [12.9, True, '4']
+    [(sql, params)] = conn.executed('INSERT IGNORE INTO group_student')
+    assert params == (1, 2)
+
+
+@pytest.mark.parametrize('body', [
+    {'add': '12'},
+    {'add': 12},
+    {'remove': {'user_id': 2}},
+    [2, 3],
+    {'add': []},
+])
+def test_group_batch_rejects_malformed_bodies(client, conn, body):
+    response = client.post('/groups/1/members:batch', json=body)
+
+    assert response.status_code == 400
+    assert not conn.executed('group_student')
+
+
+def test_cross_group_batch_validates_each_item(client, conn):
+    response = client.post('/groups/members:batch', json={
+        'add': [{'group_id': 1, 'user_id': 2}, {'group_id': '1', 'user_id': 2}, [1, 2]],
+        'remove': [{'group_id': 1, 'user_id': 3}, {'group_id': 1}],
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert {k: body[k] for k in ('added', 'removed', 'invalid')} == {'added': 1, 'removed': 1, 'invalid': 3}
+    assert conn.executed('DELETE FROM group_student')[0][1] == (1, 3)
+
+
+def test_cross_group_batch_rejects_list_body(client):
+    response = client.post('/groups/members:batch', json=[{'group_id': 1, 'user_id': 2}])
+
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+import importlib
+import inspect
+import re
+
+import pytest
+
+from backend.migrations import hot_queries
+
+
+def _normalise(sql):
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def _function(source):
+    path, name = source.split()
+    module = importlib.import_module('backend.' + path[:-len('.py')].replace('/', '.'))
+    return getattr(module, name)
+
+
+@pytest.mark.parametrize('name', sorted(hot_queries.HOT_QUERIES))
+def test_hot_query_matches_its_route(name):
+    source, sql, params = hot_queries.HOT_QUERIES[name]
+    code = _normalise(inspect.getsource(_function(source)))
+
+    assert sql.count('%s') == len(params)
+    if source.startswith('user_profile/user_listing.py'):
+        # Built by the same helper the listing routes use
+        assert 'page_query(' in code
+    else:
+        assert _normalise(sql) in code
+
+
+def test_check_reports_full_scans_of_large_tables(conn):
+    conn.handler = lambda sql, params: [{'table': 'study_session', 'type': 'ALL', 'rows': 5000,
+                                         'possible_keys': None}] if 'WHERE course_id' in sql else \
+        [{'table': 'user', 'type': 'ref', 'rows': 5000}]
+
+    failures = hot_queries.check(conn)
+
+    assert len(failures) == 1
+    assert failures[0].startswith('course_students (user_matching/matching_routes.py find_study_partners)')
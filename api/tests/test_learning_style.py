@@ -0,0 +1,83 @@
+import pytest
+
+from backend.learning_style import feature_store
+from backend.learning_style.learning_style_routes import learning_style_bp
+
+
+def _row(userid, visual=None):
+    values = (visual, 10.0, 10.0, 10.0) if visual is not None else (None,) * 4
+    return dict(zip(feature_store.STYLE_KEYS, values), userid=userid, learning_style='auditory')
+
+
+@pytest.fixture
+def users(conn, monkeypatch):
+    """Users 1 and 2 are loaded into the store; user 3 registers afterwards (through another worker)."""
+    table = {1: _row(1, 70.0), 2: _row(2)}
+
+    def handler(sql, params):
+        if sql.startswith('SELECT u.userid, u.learning_style'):
+            wanted = set(params) if params else set(table)
+            return [row for uid, row in sorted(table.items()) if uid in wanted]
+        return []
+    conn.handler = handler
+    monkeypatch.setattr(feature_store, '_store', feature_store.load_store(conn.cursor()))
+    table[3] = _row(3, 40.0)
+    return table
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((learning_style_bp, '/learning-style'))
+
+
+def test_store_fetches_users_it_has_not_loaded(client, conn, users):
+    response = client.get('/learning-style/distribution/3')
+
+    assert response.get_json()['visual_percentage'] == 40.0
+    [(sql, params)] = conn.executed('WHERE u.userid IN')
+    assert params == (3,)
+    assert 3 in feature_store._store
+
+
+def test_batch_reports_new_users_and_missing_ones(client, conn, users):
+    response = client.post('/learning-style/distribution:batch', json={'user_ids': [1, 3, 9]})
+
+    body = response.get_json()
+    assert [d['userid'] for d in body['distributions']] == [1, 3]
+    assert body['missing'] == [9]
+    [(sql, params)] = conn.executed('WHERE u.userid IN')
+    assert params == (3, 9)
+
+
+def test_similarity_finds_new_user(client, conn, users):
+    response = client.post('/learning-style/similarity', json={'user_id': 3, 'k': 1})
+
+    assert response.status_code == 200
+    assert response.get_json()[0]['userid'] == 1
+
+
+@pytest.mark.parametrize('body', [
+    {'user_id': 1.5},
+    {'user_id': True},
+    {'user_id': '1'},
+    {'user_id': 1, 'user_ids': [2, '3']},
+    {'user_id': 1, 'k': 2.5},
+])
+def test_similarity_rejects_non_integer_ids(client, users, body):
+    response = client.post('/learning-style/similarity', json=body)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('user_ids', [[1, 2.5], [True], ['1']])
+def test_batch_rejects_non_integer_ids(client, users, user_ids):
+    response = client.post('/learning-style/distribution:batch', json={'user_ids': user_ids})
+
+    assert response.status_code == 400
+
+
+def test_whole_number_floats_are_ids(client, users):
+    response = client.post('/learning-style/distribution:batch', json={'user_ids': [1.0]})
+
+    assert response.status_code == 200
+    assert response.get_json()['distributions'][0]['userid'] == 1
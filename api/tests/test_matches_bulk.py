@@ -0,0 +1,59 @@
+import pytest
+
+from backend.user_matching.matching_routes import user_matching_bp
+
+
+@pytest.fixture
+def matched(conn, monkeypatch):
+    """Fake user and matched_with tables: users 1-5 exist, (1, 2) is already matched."""
+    rows = {(1, 2)}
+    committed = set(rows)
+
+    def rollback():
+        rows.intersection_update(committed)
+        conn.rollbacks += 1
+    monkeypatch.setattr(conn, 'rollback', rollback)
+
+    def handler(sql, params):
+        if sql.startswith('SELECT userid FROM user'):
+            return [{'userid': uid} for uid in params if uid <= 5]
+        if sql.startswith('INSERT IGNORE INTO matched_with'):
+            pairs = list(zip(params[::2], params[1::2]))
+            new = [p for p in pairs if p not in rows]
+            rows.update(new)
+            return len(new)
+        return []
+    conn.handler = handler
+    return rows
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((user_matching_bp, ''))
+
+
+def test_bulk_decides_status_from_insert_without_reading_matches(client, conn, matched):
+    response = client.post('/matches/bulk', json={'pairs': [[3, 4], [5, 3]]})
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['created'] == 2 and body['existing'] == 0
+    assert not conn.executed('FROM matched_with')
+    assert len(conn.executed('INSERT IGNORE INTO matched_with')) == 1
+
+
+def test_bulk_all_existing_chunk(client, conn, matched):
+    response = client.post('/matches/bulk', json={'pairs': [[2, 1]]})
+
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'user1_id': 1, 'user2_id': 2, 'status': 'existing'}]
+
+
+def test_bulk_mixed_chunk_falls_back_to_single_inserts(client, conn, matched):
+    response = client.post('/matches/bulk', json={'pairs': [[1, 2], [3, 4], [4, 9]]})
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [r['status'] for r in body['results']] == ['existing', 'created', 'unknown_user']
+    assert conn.rollbacks == 1
+    assert [params for _, params in conn.executed('INSERT IGNORE INTO matched_with')][1:] == [(1, 2), (3, 4)]
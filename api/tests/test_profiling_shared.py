@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from backend.profiling import Profiler, shared
+from backend.profiling import slow_queries
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROFILING_SHARED_DIR', str(tmp_path))
+    monkeypatch.setattr(slow_queries, 'slow_log', slow_queries.SlowQueryLog())
+    monkeypatch.setattr(shared, 'slow_log', slow_queries.slow_log)
+    return tmp_path
+
+
+def _worker(pid, requests, monkeypatch, status=200):
+    """Record requests in a fresh profiler and publish it as worker pid."""
+    profiler = Profiler()
+    for _ in range(requests):
+        profiler.record_request('user_matching.get_user_matches', status, 0.01, 0.005, 3, 2)
+        profiler.record_query('user_matching.get_user_matches', 'SELECT 1 FROM user WHERE userid = 5', 0.005, 1)
+    _as_worker(pid, monkeypatch)
+    shared.flush(profiler, force=True)
+    return profiler
+
+
+def _as_worker(pid, monkeypatch):
+    monkeypatch.setattr(os, 'getpid', lambda: pid)
+
+
+def _requests(view):
+    [route] = view.snapshot()['routes']
+    return route['count']
+
+
+def test_views_merge_every_worker(shared_dir, monkeypatch):
+    _worker(101, 3, monkeypatch)
+    this = _worker(102, 2, monkeypatch)
+
+    view, pids = shared.profiler_view(this)
+
+    assert pids == [101, 102]
+    assert _requests(view) == 5
+    [query] = view.snapshot()['queries']
+    assert query['count'] == 5 and query['rows'] == 5
+    assert 'studybuddy_requests_total{endpoint="user_matching.get_user_matches",status="200"} 5' \
+        in view.prometheus()
+
+
+def test_retired_worker_counters_are_kept(shared_dir, monkeypatch):
+    _worker(101, 3, monkeypatch)
+    this = _worker(102, 2, monkeypatch)
+
+    shared.retire_worker(101)
+
+    assert not (shared_dir / 'worker-101.json').exists()
+    view, pids = shared.profiler_view(this)
+    assert pids == [102]
+    assert _requests(view) == 5
+
+
+def test_reset_reaches_every_worker(shared_dir, monkeypatch):
+    _worker(101, 3, monkeypatch)
+    this = _worker(102, 2, monkeypatch)
+    shared.retire_worker(101)
+    other = _worker(103, 4, monkeypatch)
+
+    _as_worker(102, monkeypatch)
+    shared.reset_profiler(this)
+
+    # The other worker hasn't flushed since the reset: its file is ignored
+    view, pids = shared.profiler_view(this)
+    assert view.snapshot()['routes'] == []
+    assert pids == [102]
+
+    # At its next flush it drops its own stats, then records new ones
+    _as_worker(103, monkeypatch)
+    shared.flush(other, force=True)
+    other.record_request('user_matching.get_user_matches', 200, 0.01, 0.005, 3, 2)
+    shared.flush(other, force=True)
+    _as_worker(102, monkeypatch)
+    view, pids = shared.profiler_view(this)
+    assert pids == [102, 103]
+    assert _requests(view) == 1
+
+
+def test_slow_queries_merge_and_clear_across_workers(shared_dir, monkeypatch):
+    log = slow_queries.slow_log
+    log._entries.append({'at': 1.0, 'endpoint': 'a', 'duration_ms': 300})
+    _worker(101, 1, monkeypatch)
+    log._entries.clear()
+    log._entries.append({'at': 2.0, 'endpoint': 'b', 'duration_ms': 400})
+    _worker(102, 1, monkeypatch)
+
+    assert [e['endpoint'] for e in shared.slow_log_view().entries()] == ['b', 'a']
+
+    shared.clear_slow_log()
+    assert shared.slow_log_view().entries() == []
+
+
+def test_without_shared_dir_views_are_per_process(monkeypatch):
+    monkeypatch.delenv('PROFILING_SHARED_DIR', raising=False)
+    profiler = Profiler()
+
+    view, pids = shared.profiler_view(profiler)
+
+    assert view is profiler and pids == [os.getpid()]
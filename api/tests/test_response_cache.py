@@ -0,0 +1,57 @@
+import threading
+
+from flask import Blueprint, jsonify
+
+from backend.response_cache import cache
+
+
+def _blueprint(table, view_started, write_done):
+    bp = Blueprint('cache_race', __name__)
+
+    @bp.route('/rows', methods=['GET'])
+    @cache.cached(tags=('row',))
+    def read_rows():
+        rows = list(table)
+        # A write commits and invalidates while this GET is still computing
+        view_started.set()
+        write_done.wait(5)
+        return jsonify(rows)
+
+    @bp.route('/rows', methods=['POST'])
+    @cache.invalidates('row')
+    def add_row():
+        table.append(len(table) + 1)
+        return jsonify(table), 201
+
+    return bp
+
+
+def test_get_racing_a_write_is_not_cached(make_client):
+    table = [1]
+    view_started, write_done = threading.Event(), threading.Event()
+    client = make_client((_blueprint(table, view_started, write_done), ''))
+
+    responses = []
+    reader = threading.Thread(target=lambda: responses.append(client.get('/rows')))
+    reader.start()
+    assert view_started.wait(5)
+    assert client.post('/rows').status_code == 201
+    write_done.set()
+    reader.join(5)
+
+    # The racing GET still answers with what it read, but must not be stored
+    assert responses[0].get_json() == [1]
+    second = client.get('/rows')
+    assert second.headers['X-Cache'] == 'MISS'
+    assert second.get_json() == [1, 2]
+    assert client.get('/rows').headers['X-Cache'] == 'HIT'
+
+
+def test_set_skips_entries_invalidated_since_generations(conn):
+    cache.clear()
+    generations = cache.generations(('row',))
+    cache.invalidate('row')
+
+    assert not cache.set('k', b'[]', 200, 'application/json', 60, ('row',), generations)
+    assert cache.get('k') is None
+    assert cache.set('k', b'[]', 200, 'application/json', 60, ('row',), cache.generations(('row',)))
@@ -0,0 +1,31 @@
+from backend.user_matching import availability, scoring
+from backend.user_matching.scoring import CompatibilityEngine
+
+
+def _user(userid, availability_text, mask=None):
+    return {'userid': userid, 'major': 'Biology', 'learning_style': 'visual',
+            'availability': availability_text, 'availability_mask': mask, 'academic_goals': None}
+
+
+def test_old_availability_parser_is_gone():
+    assert not hasattr(scoring, 'parse_availability')
+
+
+def test_availability_feature_follows_parse_slots():
+    # The old 7x3 parser only knew morning/afternoon/evening, so both of these
+    # looked like "evening every day"; the slot mask tells them apart.
+    engine = CompatibilityEngine([_user(1, '8pm-12am'), _user(2, '10pm-2am'), _user(3, 'Mon 9pm-11pm')], [])
+
+    rows, scores = engine.score(3)
+    by_user = dict(zip(engine.user_ids[rows].tolist(), scores.tolist()))
+    assert by_user[1] > by_user[2]
+
+
+def test_stored_mask_wins_over_text():
+    stored = availability.parse_mask('weekends')
+    engine = CompatibilityEngine([_user(1, 'weekdays 9-5', stored), _user(2, 'weekends'),
+                                  _user(3, 'weekdays 9-5')], [])
+
+    rows, scores = engine.score(1)
+    by_user = dict(zip(engine.user_ids[rows].tolist(), scores.tolist()))
+    assert by_user[2] > by_user[3]
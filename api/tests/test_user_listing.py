@@ -0,0 +1,37 @@
+import pytest
+
+from backend.user_matching.availability import parse_mask
+from backend.user_profile.user_listing import fetch_users_page, like_escape, page_query
+
+
+def test_availability_filter_tests_the_mask():
+    sql, params = page_query(50, availability='weekends')
+
+    assert 'BIT_COUNT(availability_mask & %s) > 0' in sql
+    assert params == (0, parse_mask('weekends'), '%weekends%', 51)
+
+
+@pytest.mark.parametrize('text, pattern', [
+    ('100%', '%100\\%%'),
+    ('a_b', '%a\\_b%'),
+    ('c:\\x', '%c:\\\\x%'),
+])
+def test_unparsed_availability_is_a_literal_substring(text, pattern):
+    sql, params = page_query(50, availability=text)
+
+    assert 'availability_mask' not in sql
+    assert params == (0, pattern, 51)
+
+
+def test_like_escape_leaves_plain_text():
+    assert like_escape('Mon 6pm-9pm') == 'Mon 6pm-9pm'
+
+
+def test_filtered_page_runs_page_query(conn):
+    conn.handler = lambda sql, params: [{'userid': uid} for uid in (3, 4)]
+
+    users, next_cursor = fetch_users_page(conn.cursor(), 1, availability='Mon 6pm-9pm')
+
+    assert users == [{'userid': 3}] and next_cursor == '3'
+    [(sql, params)] = conn.statements
+    assert params[1] == parse_mask('Mon 6pm-9pm')
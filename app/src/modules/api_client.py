@@ -0,0 +1,138 @@
+#------------------------------------------------------------
+# Shared HTTP client for talking to the Flask API.
+#
+# Pages used to call bare requests.get/post against hardcoded
+# http://web-api:4000 or http://api:4000 URLs, opening a new TCP
+# connection per call. Everything now goes through one pooled
+# requests.Session (keep-alive), with bounded retries for idempotent
+# calls, per-endpoint timeouts and fetch_many() for issuing independent
+# GETs concurrently.
+#
+# Usage:
+#   from modules import api_client
+#   response = api_client.get(f"/users/{user_id}")
+#   results = api_client.fetch_many({"total": "/a/matches/total", ...})
+#------------------------------------------------------------
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://web-api:4000").rstrip("/")
+
+# Seconds to wait for the TCP connection to be established
+CONNECT_TIMEOUT = 3.05
+
+# Seconds to wait for a response, by path prefix (first match wins)
+ENDPOINT_TIMEOUTS = [
+    ("/a/export/", 120),
+    ("/a/", 5),
+    ("/admin/", 10),
+]
+DEFAULT_READ_TIMEOUT = 10
+
+# Connections kept open to the API (also the fetch_many concurrency limit)
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    # Only idempotent methods are retried; a retried POST could create duplicates
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """Return the process-wide session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def url(path):
+    """Absolute URL for an API path such as "/users/1"."""
+    return f"{API_BASE_URL}/{path.lstrip('/')}"
+
+
+def timeout_for(path):
+    """(connect, read) timeout for an API path."""
+    path = "/" + path.lstrip("/")
+    for prefix, read_timeout in ENDPOINT_TIMEOUTS:
+        if path.startswith(prefix):
+            return (CONNECT_TIMEOUT, read_timeout)
+    return (CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+
+def request(method, path, timeout=None, **kwargs):
+    """
+    Send a request to the API and return the requests.Response.
+    Raises requests.exceptions.RequestException on connection errors and timeouts,
+    exactly like requests.request does.
+    """
+    return get_session().request(method, url(path), timeout=timeout or timeout_for(path), **kwargs)
+
+
+def get(path, **kwargs):
+    return request("GET", path, **kwargs)
+
+
+def post(path, **kwargs):
+    return request("POST", path, **kwargs)
+
+
+def put(path, **kwargs):
+    return request("PUT", path, **kwargs)
+
+
+def delete(path, **kwargs):
+    return request("DELETE", path, **kwargs)
+
+
+def get_json(path, **kwargs):
+    """GET a path and return (data, error); error is a message string or None."""
+    try:
+        response = get(path, **kwargs)
+    except requests.exceptions.RequestException as e:
+        return None, f"Connection Error: {e}"
+    if response.status_code != 200:
+        return None, f"API Error: {response.status_code} - {response.text}"
+    try:
+        return response.json(), None
+    except ValueError:
+        return None, "API Error: response was not valid JSON"
+
+
+def fetch_many(calls, timeout=None):
+    """
+    Issue independent GETs concurrently and return {key: (data, error)}.
+    calls maps a key to a path, or to a (path, params) tuple.
+    """
+    def fetch(call):
+        path, params = call if isinstance(call, tuple) else (call, None)
+        return get_json(path, params=params, timeout=timeout)
+
+    if not calls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(calls), POOL_SIZE)) as pool:
+        futures = {key: pool.submit(fetch, call) for key, call in calls.items()}
+        return {key: future.result() for key, future in futures.items()}
@@ -0,0 +1,106 @@
+#------------------------------------------------------------
+# Concurrent, deadline-bounded data loading for dashboard pages.
+#
+# A page declares every endpoint it needs up front, each with a spot
+# in the layout and a render function. run() fetches them all in
+# parallel and renders each section as soon as its response arrives,
+# so the page takes as long as its slowest call (capped by the
+# deadline) instead of the sum of all of them. Sections that miss the
+# deadline render an error instead of holding up the rest.
+#
+# Responses are cached with st.cache_data per request (path + params)
+# for CACHE_TTL_SECONDS; failed calls are not cached.
+#
+# Usage:
+#   loader = PageLoader()
+#   loader.add("total", "/a/matches/total", render_total, slot=col1)
+#   loader.add("recent", "/a/analytics/matching/recent-matches", render_recent)
+#   loader.run()
+#------------------------------------------------------------
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from modules import api_client
+
+# Seconds a page waits for all of its calls before giving up on the stragglers
+DEFAULT_DEADLINE_SECONDS = 8
+
+# Seconds a successful response is reused across reruns and sessions
+CACHE_TTL_SECONDS = 60
+
+
+class _FetchError(Exception):
+    """Raised inside the cached fetch so that failures are not cached."""
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _fetch(path, params):
+    data, error = api_client.get_json(path, params=dict(params) if params else None)
+    if error is not None:
+        raise _FetchError(error)
+    return data
+
+
+class PageLoader:
+
+    def __init__(self, deadline=DEFAULT_DEADLINE_SECONDS):
+        self.deadline = deadline
+        self._sections = {}   # key -> (path, params, render, placeholder)
+
+    def add(self, key, path, render, slot=None, params=None, loading_text="Loading..."):
+        """
+        Declare one endpoint. render(data, error) is called inside a placeholder
+        created now in `slot` (a column/container, or the page body); error is a
+        message string or None.
+        """
+        placeholder = (slot or st).empty()
+        placeholder.caption(loading_text)
+        frozen_params = tuple(sorted(params.items())) if params else None
+        self._sections[key] = (path, frozen_params, render, placeholder)
+        return self
+
+    def _render(self, key, data, error):
+        _, _, render, placeholder = self._sections[key]
+        with placeholder.container():
+            render(data, error)
+
+    def run(self):
+        """Fetch every declared endpoint concurrently, rendering each one as it arrives."""
+        if not self._sections:
+            return
+        ctx = get_script_run_ctx()
+
+        def fetch(path, params):
+            # Attach the page's script context so st.cache_data works from this thread
+            add_script_run_ctx(threading.current_thread(), ctx)
+            try:
+                return _fetch(path, params), None
+            except _FetchError as e:
+                return None, str(e)
+
+        pool = ThreadPoolExecutor(max_workers=min(len(self._sections), api_client.POOL_SIZE))
+        pending = {pool.submit(fetch, path, params): key
+                   for key, (path, params, _, _) in self._sections.items()}
+        deadline = time.monotonic() + self.deadline
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    try:
+                        data, error = future.result()
+                    except Exception as e:
+                        data, error = None, f"Unexpected error: {e}"
+                    self._render(key, data, error)
+            for key in pending.values():
+                self._render(key, None, f"Timed out after {self.deadline}s")
+        finally:
+            # Don't wait for calls that missed the deadline; their own HTTP timeouts end them
+            pool.shutdown(wait=False, cancel_futures=True)
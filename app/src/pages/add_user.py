@@ -1,6 +1,7 @@
 import streamlit as st
 from modules.nav import setup_page
 import requests # Make sure requests is imported
+from modules import api_client
 import json # For handling JSON data
 
 # Page Configuration
@@ -11,7 +12,6 @@ st.set_page_config(
 )
 
 # --- Backend API URL --- (Use Docker service name)
-API_URL = "http://api:4000" # Flask service name 'api' and internal port 4000
 
 
 
@@ -45,7 +45,7 @@ with st.form("add_user_form"):
             }
             try:
                 # Send POST request to backend
-                response = requests.post(f"{API_URL}/admin/users", json=user_data)
+                response = api_client.post("/admin/users", json=user_data)
                 response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
                 
                 # Handle success
@@ -1,6 +1,7 @@
 import streamlit as st
 from modules.nav import setup_page
 import requests
+from modules import api_client
 import json # Import json for potential error parsing
 
 # Page Configuration
@@ -11,7 +12,7 @@ st.set_page_config(
 )
 
 # --- Backend API URL --- (Use Docker service name)
-API_URL = "http://api:4000" # Flask service name 'api' and internal port 4000
+USER_PAGE_SIZE = 50 # Users listed per page in User Management
 
 # --- Initialize session state for delete confirmation --- 
 if 'item_to_delete' not in st.session_state:
@@ -23,6 +24,9 @@ if 'item_to_edit' not in st.session_state:
     st.session_state.item_to_edit = None 
 if 'edit_type' not in st.session_state:
     st.session_state.edit_type = None
+# Cursors of the user pages visited so far (the API pages by cursor, not offset)
+if 'user_page_cursors' not in st.session_state:
+    st.session_state.user_page_cursors = [None]
 
 
 
@@ -30,25 +34,30 @@ setup_page("Admin Dashboard")
 
 # --- Helper functions to fetch data --- 
 @st.cache_data(ttl=60) # Cache data for 60 seconds
-def fetch_users():
+def fetch_users(page_cursor=None):
+    """Fetches one page of users; returns (users, next_cursor, error)."""
+    params = {"limit": USER_PAGE_SIZE}
+    if page_cursor:
+        params["cursor"] = page_cursor
     try:
-        response = requests.get(f"{API_URL}/admin/users")
+        response = api_client.get("/admin/users", params=params)
         response.raise_for_status()
-        return response.json().get('users', []), None # Return data, no error
+        data = response.json()
+        return data.get('users', []), data.get('next_cursor'), None # Return data, no error
     except requests.exceptions.RequestException as e:
         error_msg = f"API request failed: {e}"
         try: 
             error_details = response.json()
             error_msg += f" Backend error: {error_details.get('error', 'Unknown')}"
         except: pass
-        return None, error_msg
+        return None, None, error_msg
     except Exception as e:
-        return None, f"An unexpected error occurred: {e}"
+        return None, None, f"An unexpected error occurred: {e}"
 
 @st.cache_data(ttl=60) # Cache data for 60 seconds
 def fetch_admins():
     try:
-        response = requests.get(f"{API_URL}/admin/all")
+        response = api_client.get("/admin/all")
         response.raise_for_status()
         return response.json().get('admins', []), None # Return data, no error
     except requests.exceptions.RequestException as e:
@@ -65,7 +74,7 @@ def fetch_admins():
 @st.cache_data(ttl=60)
 def fetch_user_count():
     try:
-        response = requests.get(f"{API_URL}/admin/users/count")
+        response = api_client.get("/admin/users/count")
         response.raise_for_status()
         return response.json().get('count', 0), None # Return count, no error
     except requests.exceptions.RequestException as e:
@@ -79,7 +88,7 @@ def fetch_user_count():
 @st.cache_data(ttl=60)
 def fetch_admin_count():
     try:
-        response = requests.get(f"{API_URL}/admin/admins/count")
+        response = api_client.get("/admin/admins/count")
         response.raise_for_status()
         return response.json().get('count', 0), None # Return count, no error
     except requests.exceptions.RequestException as e:
@@ -90,18 +99,35 @@ def fetch_admin_count():
     except Exception as e:
         return None, f"An unexpected error occurred fetching admin count: {e}"
 
+# --- Slow queries captured by the API (see /admin/slow-queries) ---
+@st.cache_data(ttl=10)
+def fetch_slow_queries(limit=50):
+    data, error = api_client.get_json("/admin/slow-queries", params={"limit": limit})
+    if error:
+        return None, None, error
+    return data.get('slow_queries', []), data.get('stats', {}), None
+
+def clear_slow_queries():
+    try:
+        response = api_client.delete("/admin/slow-queries")
+        response.raise_for_status()
+        fetch_slow_queries.clear()
+        st.rerun()
+    except requests.exceptions.RequestException as e:
+        st.error(f"API request failed: {e}")
+
 # --- Function to handle actual deletion API call ---
 def perform_delete(item_id, delete_type):
     if delete_type == 'user':
-        url = f"{API_URL}/admin/users/{item_id}"
+        url = f"/admin/users/{item_id}"
     elif delete_type == 'admin':
-        url = f"{API_URL}/admin/admins/{item_id}"
+        url = f"/admin/admins/{item_id}"
     else:
         st.error("Invalid delete type.")
         return
         
     try:
-        response = requests.delete(url)
+        response = api_client.delete(url)
         response.raise_for_status()
         st.success(response.json().get('message', f"{delete_type.capitalize()} deleted successfully."))
         st.cache_data.clear()
@@ -118,15 +144,15 @@ def perform_delete(item_id, delete_type):
 # --- Function to handle update API call ---
 def perform_update(item_id, update_type, update_data):
     if update_type == 'user':
-        url = f"{API_URL}/admin/users/{item_id}"
+        url = f"/admin/users/{item_id}"
     elif update_type == 'admin':
-        url = f"{API_URL}/admin/admins/{item_id}"
+        url = f"/admin/admins/{item_id}"
     else:
         st.error("Invalid update type.")
         return False # Indicate failure
         
     try:
-        response = requests.put(url, json=update_data)
+        response = api_client.put(url, json=update_data)
         response.raise_for_status()
         st.success(response.json().get('message', f"{update_type.capitalize()} updated successfully."))
         st.cache_data.clear() 
@@ -222,12 +248,13 @@ if st.session_state.item_to_edit is not None:
     show_edit_dialog(st.session_state.item_to_edit, st.session_state.edit_type)
 
 # Create tabs
-tab1, tab2 = st.tabs(["User Management", "Admin Management"])
+tab1, tab2, tab3 = st.tabs(["User Management", "Admin Management", "Slow Queries"])
 
 # --- User Management Tab --- 
 with tab1:
     st.header("User Management")
-    users, error = fetch_users()
+    page_cursors = st.session_state.user_page_cursors
+    users, next_cursor, error = fetch_users(page_cursors[-1])
 
     if error: st.error(f"Could not load users: {error}")
     elif users is None: st.info("Loading user data...") 
@@ -275,6 +302,15 @@ with tab1:
             action_text = "Unflagged" if is_flagged else "Flagged"
             if cols[6].button(flag_icon, key=flag_key, help=flag_help):
                  st.success(f"User {user_id} {action_text} ")
+
+        # --- Pagination ---
+        prev_col, next_col = st.columns(2)
+        if prev_col.button("← Previous", disabled=len(page_cursors) == 1, key="users_prev"):
+            page_cursors.pop()
+            st.rerun()
+        if next_col.button("Next →", disabled=not next_cursor, key="users_next"):
+            page_cursors.append(next_cursor)
+            st.rerun()
     
     if st.button("Add New User", key="add_user_nav"): st.switch_page("pages/add_user.py")
 
@@ -316,3 +352,37 @@ with tab2:
                     st.rerun()
 
     if st.button("Add New Admin", key="add_admin_nav"): st.switch_page("pages/add_admin.py")
+
+# --- Slow Queries Tab ---
+with tab3:
+    st.header("Slow Queries")
+    slow_queries, slow_stats, error = fetch_slow_queries()
+
+    if error: st.error(f"Could not load slow queries: {error}")
+    else:
+        st.caption(f"Statements slower than {slow_stats.get('threshold_ms')} ms, newest first "
+                   f"({slow_stats.get('buffered')} buffered of {slow_stats.get('buffer_size')}). "
+                   "Each API worker keeps its own buffer.")
+        col_refresh, col_clear = st.columns(2)
+        with col_refresh:
+            if st.button("Refresh", key="refresh_slow_queries", use_container_width=True):
+                fetch_slow_queries.clear()
+                st.rerun()
+        with col_clear:
+            if st.button("Clear", key="clear_slow_queries", use_container_width=True):
+                clear_slow_queries()
+
+        if not slow_queries: st.write("No slow queries recorded.")
+        for entry in slow_queries:
+            title = f"{entry.get('duration_ms')} ms · {entry.get('endpoint')} · {entry.get('fingerprint', '')[:80]}"
+            with st.expander(title):
+                st.write(f"**Route:** {entry.get('method') or ''} {entry.get('path') or entry.get('endpoint')}")
+                st.write(f"**Rows:** {entry.get('rows')}")
+                st.code(entry.get('fingerprint', ''), language="sql")
+                st.write("**Parameters:**")
+                st.json(entry.get('params') or [])
+                if entry.get('plan'):
+                    st.write("**Plan (EXPLAIN FORMAT=JSON):**")
+                    st.json(entry['plan'], expanded=False)
+                else:
+                    st.info(entry.get('plan_error') or "No plan captured.")
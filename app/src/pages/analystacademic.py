@@ -1,10 +1,9 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import requests
+from modules.page_loader import PageLoader
 from modules.nav import setup_page
 
-API_BASE_URL = "http://web-api:4000"
 
 # Page Configuration
 st.set_page_config(
@@ -40,81 +39,81 @@ st.sidebar.divider()
 st.title("Academic Insights")
 st.write("Explore course performance and cross-major participation analytics")
 
-# Add real-time course performance analytics
-st.subheader("Course Performance Analytics (Real-Time)")
-try:
-    response = requests.get(f"{API_BASE_URL}/a/analytics/academic/course-performance", timeout=5)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if data and 'course_analytics' in data:
-            # Convert to DataFrame for visualization
-            df = pd.DataFrame(data['course_analytics'])
-            
-            if df.empty:
-                st.warning("No course data available. This could be because there are no study sessions recorded yet.")
-            else:
-                # Create bar chart showing student participation by course
-                fig = px.bar(
-                    df,
-                    x='course_name',
-                    y='student_count',
-                    color='department',
-                    title='Student Participation by Course',
+def render_course_performance(data, error):
+    if error:
+        st.error(f"Could not load course performance analytics: {error}")
+        return
+    if data and 'course_analytics' in data:
+        # Convert to DataFrame for visualization
+        df = pd.DataFrame(data['course_analytics'])
+
+        if df.empty:
+            st.warning("No course data available. This could be because there are no study sessions recorded yet.")
+        else:
+            # Create bar chart showing student participation by course
+            fig = px.bar(
+                df,
+                x='course_name',
+                y='student_count',
+                color='department',
+                title='Student Participation by Course',
+                labels={
+                    'course_name': 'Course',
+                    'student_count': 'Number of Students',
+                    'department': 'Department'
+                }
+            )
+            fig.update_layout(
+                xaxis_tickangle=-45,
+                plot_bgcolor='white',
+                height=400,
+                margin=dict(t=30, b=0, l=0, r=0)
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Show course metrics in an expander
+            with st.expander("View Detailed Course Metrics"):
+                metrics_df = df[[
+                    'department',
+                    'course_name', 
+                    'student_count',
+                    'total_sessions',
+                    'avg_sessions_per_student'
+                ]].sort_values('student_count', ascending=False)
+
+                st.dataframe(metrics_df)
+
+        # Show cross-major participation if available
+        if 'major_distribution' in data:
+            st.subheader("Cross-Major Course Participation")
+            major_df = pd.DataFrame(data['major_distribution'])
+
+            if not major_df.empty:
+                fig2 = px.bar(
+                    major_df,
+                    x='major',
+                    y='course_count',
+                    title='Number of Courses Taken by Major',
                     labels={
-                        'course_name': 'Course',
-                        'student_count': 'Number of Students',
-                        'department': 'Department'
+                        'major': 'Student Major',
+                        'course_count': 'Number of Different Courses'
                     }
                 )
-                fig.update_layout(
+                fig2.update_layout(
                     xaxis_tickangle=-45,
                     plot_bgcolor='white',
                     height=400,
                     margin=dict(t=30, b=0, l=0, r=0)
                 )
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Show course metrics in an expander
-                with st.expander("View Detailed Course Metrics"):
-                    metrics_df = df[[
-                        'department',
-                        'course_name', 
-                        'student_count',
-                        'total_sessions',
-                        'avg_sessions_per_student'
-                    ]].sort_values('student_count', ascending=False)
-                    
-                    st.dataframe(metrics_df)
-                
-            # Show cross-major participation if available
-            if 'major_distribution' in data:
-                st.subheader("Cross-Major Course Participation")
-                major_df = pd.DataFrame(data['major_distribution'])
-                
-                if not major_df.empty:
-                    fig2 = px.bar(
-                        major_df,
-                        x='major',
-                        y='course_count',
-                        title='Number of Courses Taken by Major',
-                        labels={
-                            'major': 'Student Major',
-                            'course_count': 'Number of Different Courses'
-                        }
-                    )
-                    fig2.update_layout(
-                        xaxis_tickangle=-45,
-                        plot_bgcolor='white',
-                        height=400,
-                        margin=dict(t=30, b=0, l=0, r=0)
-                    )
-                    st.plotly_chart(fig2, use_container_width=True)
-                else:
-                    st.warning("No cross-major participation data available yet.")
-        else:
-            st.error("Response did not contain expected course analytics data structure")
+                st.plotly_chart(fig2, use_container_width=True)
+            else:
+                st.warning("No cross-major participation data available yet.")
     else:
-        st.error(f"Could not load course performance analytics. Status code: {response.status_code}")
-except Exception as e:
-    st.error(f"Error loading course performance data: {str(e)}") 
\ No newline at end of file
+        st.error("Response did not contain expected course analytics data structure")
+
+# Add real-time course performance analytics
+st.subheader("Course Performance Analytics (Real-Time)")
+loader = PageLoader()
+loader.add('course_performance', '/a/analytics/academic/course-performance',
+           render_course_performance, loading_text='Loading course performance...')
+loader.run()
@@ -1,7 +1,7 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import requests
+from modules.page_loader import PageLoader
 from modules.nav import setup_page
 
 # Page Configuration
@@ -51,93 +51,80 @@ if 'avg_match_time' not in st.session_state:
     st.session_state.avg_match_time = 0
     st.session_state.avg_match_time_change = 0
 
-# Top metrics in a row
-col1, col2, col3 = st.columns(3)
+def render_total_matches(data, error):
+    if error is None:
+        st.session_state.total_matches = data.get('total_matches', 0)
+        st.session_state.time_period = data['time_period']
+    elif error.startswith("Connection Error"):
+        st.session_state.total_matches = 0
+        st.session_state.time_period = "API unavailable"
+    else:
+        st.session_state.total_matches = 0
+        st.session_state.time_period = "Error fetching data"
 
-with col1:
-    # Show loading spinner while fetching data
-    with st.spinner('Fetching total matches...'):
-        try:
-            response = requests.get('http://web-api:4000/a/matches/total', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                st.session_state.total_matches = data.get('total_matches', 0)
-                st.session_state.time_period = data['time_period']
-            else:
-                st.session_state.total_matches = 0
-                st.session_state.time_period = "Error fetching data"
-        except requests.exceptions.RequestException:
-            st.session_state.total_matches = 0
-            st.session_state.time_period = "API unavailable"
-    
     st.metric(
         "Total Matches",
         f"{st.session_state.total_matches:,}",
         st.session_state.time_period
     )
 
-with col2:
-    # Fetch success rate
-    with st.spinner('Fetching success rate...'):
-        try:
-            response = requests.get('http://web-api:4000/a/analytics/matching/success-rate', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    st.session_state.success_rate = data.get('success_rate', 0)
-                    st.session_state.success_rate_change = data.get('change', 0)
-        except requests.exceptions.RequestException:
-            pass
-    
+def render_success_rate(data, error):
+    if error is None and data.get('status') == 'success':
+        st.session_state.success_rate = data.get('success_rate', 0)
+        st.session_state.success_rate_change = data.get('change', 0)
+
     st.metric(
         "Success Rate",
         f"{st.session_state.success_rate}%",
         f"{st.session_state.success_rate_change:+}% this month"
     )
 
-with col3:
-    # Fetch average match time
-    with st.spinner('Fetching match time...'):
-        try:
-            response = requests.get('http://web-api:4000/a/analytics/matching/avg-time', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    st.session_state.avg_match_time = data.get('avg_days', 0)
-                    st.session_state.avg_match_time_change = data.get('change', 0)
-        except requests.exceptions.RequestException:
-            pass
-    
+def render_avg_match_time(data, error):
+    if error is None and data.get('status') == 'success':
+        st.session_state.avg_match_time = data.get('avg_days', 0)
+        st.session_state.avg_match_time_change = data.get('change', 0)
+
     st.metric(
         "Avg Match Time",
         f"{st.session_state.avg_match_time} days",
         f"{st.session_state.avg_match_time_change:+.1f} days"
     )
 
+def render_recent_matches(data, error):
+    if error:
+        st.error(f"Error loading recent matches: {error}")
+    elif data['status'] == 'success' and data['matches']:
+        for match in data['matches']:
+            with st.container():
+                cols = st.columns([3, 2, 1])
+                with cols[0]:
+                    st.write(f"**{match['pair']}**")
+                    st.write(f"📚 {match['course']}")
+                with cols[1]:
+                    st.write("🤝 Compatibility")
+                    st.write(f"**{match['compatibility']}**")
+                with cols[2]:
+                    st.write("📅 Matched on")
+                    st.write(f"**{match['match_date']}**")
+                st.divider()
+    else:
+        st.info("No recent matches found")
+
+loader = PageLoader()
+
+# Top metrics in a row
+col1, col2, col3 = st.columns(3)
+loader.add('total_matches', '/a/matches/total', render_total_matches, slot=col1,
+           loading_text='Fetching total matches...')
+loader.add('success_rate', '/a/analytics/matching/success-rate', render_success_rate, slot=col2,
+           loading_text='Fetching success rate...')
+loader.add('avg_match_time', '/a/analytics/matching/avg-time', render_avg_match_time, slot=col3,
+           loading_text='Fetching match time...')
+
 # Recent matches section
 st.subheader("3 Most Recent Matches")
+loader.add('recent_matches', '/a/analytics/matching/recent-matches', render_recent_matches,
+           loading_text='Loading recent matches...')
 
-# Fetch recent matches
-with st.spinner('Loading recent matches...'):
-    try:
-        response = requests.get('http://web-api:4000/a/analytics/matching/recent-matches', timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            if data['status'] == 'success' and data['matches']:
-                for match in data['matches']:
-                    with st.container():
-                        cols = st.columns([3, 2, 1])
-                        with cols[0]:
-                            st.write(f"**{match['pair']}**")
-                            st.write(f"📚 {match['course']}")
-                        with cols[1]:
-                            st.write("🤝 Compatibility")
-                            st.write(f"**{match['compatibility']}**")
-                        with cols[2]:
-                            st.write("📅 Matched on")
-                            st.write(f"**{match['match_date']}**")
-                        st.divider()
-            else:
-                st.info("No recent matches found")
-    except Exception as e:
-        st.error(f"Error loading recent matches: {str(e)}") 
\ No newline at end of file
+# All four sections load in parallel and render as they arrive
+loader.run()
@@ -1,11 +1,10 @@
 # naman
 import streamlit as st
 import requests # Import requests
+from modules import api_client
 from datetime import datetime
 from modules.nav import setup_page
 
-# API_BASE_URL = "http://127.0.0.1:5000" # Adjust if backend runs elsewhere
-API_BASE_URL = "http://web-api:4000" # Use Docker service name
 
 # Page Configuration
 st.set_page_config(
@@ -20,52 +19,22 @@ st.session_state.page = 'dashboard'
 # Setup: Theme, Auth, Sidebar
 setup_page("Dashboard") 
 
-# --- Helper function to fetch user resources (GET request) ---
-def get_user_resources(user_id):
+# --- Helper function to fetch everything the dashboard shows (GET request) ---
+@st.cache_data(ttl=30) # Cache data for 30 seconds
+def get_dashboard(user_id):
+    """Fetches the user's groups, resources and potential matches in one request."""
     if not user_id:
         return None, "User ID not provided."
-    resources_url = f"{API_BASE_URL}/users/{user_id}/resources" # Updated URL
+    dashboard_url = f"/users/{user_id}/dashboard"
+    params = {"fields": "groups,resources,potential_matches"}
     try:
-        response = requests.get(resources_url)
-        if response.status_code == 200:
-            return response.json(), None # Return data, no error
-        else:
-            return None, f"API Error: {response.status_code} - {response.text}"
-    except requests.exceptions.RequestException as e:
-        return None, f"Connection Error: {e}"
-
-# --- Helper function to fetch potential matches (GET request) ---
-def get_potential_matches(user_id):
-    """Fetches potential matches for the user."""
-    if not user_id:
-        return None, "User ID not provided."
-    # Uses the new endpoint GET /users/<user_id>/potential-matches
-    matches_url = f"{API_BASE_URL}/users/{user_id}/potential-matches"
-    try:
-        response = requests.get(matches_url)
-        response.raise_for_status()
-        return response.json(), None
-    except requests.exceptions.RequestException as e:
-        return None, str(e)
-    except Exception as e:
-        return None, f"An unexpected error occurred: {str(e)}"
-
-# --- Helper function to fetch user's groups (GET request) ---
-def get_user_groups(user_id):
-    """Fetches groups the user is a member of."""
-    if not user_id:
-        return None, "User ID not provided."
-    # This now uses the new endpoint in the user_profile blueprint
-    groups_url = f"{API_BASE_URL}/users/{user_id}/groups" 
-    try:
-        response = requests.get(groups_url)
+        response = api_client.get(dashboard_url, params=params)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None
     except requests.exceptions.RequestException as e:
         return None, str(e)
     except Exception as e:
         return None, f"An unexpected error occurred: {str(e)}"
-    # Removed the previous commented-out code and return [] statement
 
 # --- Helper function to add a resource (POST request) ---
 def add_user_resource(user_id, link, resource_type):
@@ -73,10 +42,10 @@ def add_user_resource(user_id, link, resource_type):
     if not all([user_id, link, resource_type]):
         return None, "Missing user_id, link, or type."
         
-    add_url = f"{API_BASE_URL}/users/{user_id}/resources"
+    add_url = f"/users/{user_id}/resources"
     payload = {"link": link, "type": resource_type}
     try:
-        response = requests.post(add_url, json=payload)
+        response = api_client.post(add_url, json=payload)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None # Return success/info message
     except requests.exceptions.RequestException as e:
@@ -94,13 +63,16 @@ def add_user_resource(user_id, link, resource_type):
 # --- Page Content ---
 st.title("StudyBuddy Dashboard")
 
+user_id = st.session_state.user.get('id')
+dashboard, dashboard_error = get_dashboard(user_id)
+dashboard = dashboard or {}
+
 left_col, right_col = st.columns(2)
 
 with left_col:
     st.subheader("Your Study Groups")
     # --- Fetch and display user's study groups from API ---
-    user_id = st.session_state.user.get('id')
-    groups, error = get_user_groups(user_id)
+    groups, error = dashboard.get('groups'), dashboard_error
 
     if error:
         st.error(f"Could not load study groups: {error}")
@@ -117,8 +89,7 @@ with left_col:
     
     st.subheader("Study Resources")
     # --- Fetch and display resources from API ---
-    user_id = st.session_state.user.get('id')
-    resources, error = get_user_resources(user_id)
+    resources, error = dashboard.get('resources'), dashboard_error
     
     if error:
         st.error(f"Could not load resources: {error}")
@@ -147,6 +118,7 @@ with left_col:
                         st.error(f"Failed to add resource: {error}")
                     else:
                         st.success(result.get("message", "Resource added successfully!"))
+                        get_dashboard.clear()
                         st.rerun() # Rerun to show the new resource in the list above
                 else:
                     st.warning("Please provide both a link and a type.")
@@ -163,8 +135,7 @@ with right_col:
     
     st.subheader("Potential Study Matches")
     # --- Fetch and display potential matches from API ---
-    user_id = st.session_state.user.get('id')
-    matches, error = get_potential_matches(user_id)
+    matches, error = dashboard.get('potential_matches'), dashboard_error
     
     if error:
         st.error(f"Could not load potential matches: {error}")
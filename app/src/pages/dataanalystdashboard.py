@@ -2,7 +2,7 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import numpy as np
-import requests
+from modules.page_loader import PageLoader
 from modules.nav import setup_page
 import plotly.graph_objects as go
 
@@ -57,27 +57,19 @@ if 'active_groups' not in st.session_state:
     st.session_state.active_groups = 0
     st.session_state.active_groups_change = "0%"
 
-# Top metrics row
-col1, col2 = st.columns(2)
-
-with col1:
-    # Show loading spinner while fetching data
-    with st.spinner('Fetching active groups data...'):
-        try:
-            response = requests.get('http://web-api:4000/a/analytics/study-groups/active', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data['status'] == 'success' and 'metrics' in data:
-                    metrics = data['metrics']
-                    st.session_state.active_groups = metrics['active_groups']
-                    change_pct = metrics['change_percentage']
-                    st.session_state.active_groups_change = f"{'+' if change_pct > 0 else ''}{change_pct}% vs last month"
-            else:
-                st.session_state.active_groups = 0
-                st.session_state.active_groups_change = "Error fetching data"
-        except requests.exceptions.RequestException:
-            st.session_state.active_groups = 0
-            st.session_state.active_groups_change = "API unavailable"
+def render_active_groups(data, error):
+    if error is None:
+        if data['status'] == 'success' and 'metrics' in data:
+            metrics = data['metrics']
+            st.session_state.active_groups = metrics['active_groups']
+            change_pct = metrics['change_percentage']
+            st.session_state.active_groups_change = f"{'+' if change_pct > 0 else ''}{change_pct}% vs last month"
+    elif error.startswith("Connection Error"):
+        st.session_state.active_groups = 0
+        st.session_state.active_groups_change = "API unavailable"
+    else:
+        st.session_state.active_groups = 0
+        st.session_state.active_groups_change = "Error fetching data"
     
     st.metric(
         "Active Study Groups",
@@ -85,21 +77,16 @@ with col1:
         st.session_state.active_groups_change
     )
 
-with col2:
-    # Show loading spinner while fetching data
-    with st.spinner('Fetching retention data...'):
-        try:
-            response = requests.get('http://web-api:4000/a/analytics/retention', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                st.session_state.retention_rate = data.get('retention_rate', 0)
-                st.session_state.retention_change = data.get('retention_change', 0)
-            else:
-                st.session_state.retention_rate = 0
-                st.session_state.retention_change = "Error fetching data"
-        except requests.exceptions.RequestException:
-            st.session_state.retention_rate = 0
-            st.session_state.retention_change = "API unavailable"
+def render_retention(data, error):
+    if error is None:
+        st.session_state.retention_rate = data.get('retention_rate', 0)
+        st.session_state.retention_change = data.get('retention_change', 0)
+    elif error.startswith("Connection Error"):
+        st.session_state.retention_rate = 0
+        st.session_state.retention_change = "API unavailable"
+    else:
+        st.session_state.retention_rate = 0
+        st.session_state.retention_change = "Error fetching data"
     
     st.metric(
         "Retention Rate",
@@ -107,82 +94,92 @@ with col2:
         st.session_state.retention_change
     )
 
-# Create two columns for the charts
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("Student Distribution by Major")
+def render_major_distribution(data, error):
     try:
-        with st.spinner('Loading major distribution...'):
-            response = requests.get('http://web-api:4000/a/analytics/students/major-distribution', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data['status'] == 'success' and 'distribution' in data:
-                    distribution = data['distribution']
-                    
-                    # Create bar chart for major distribution
-                    fig = go.Figure(data=[
-                        go.Bar(
-                            x=distribution.get('majors', []),
-                            y=distribution.get('counts', []),
-                            text=distribution.get('counts', []),
-                            textposition='auto',
-                        )
-                    ])
-                    
-                    fig.update_layout(
-                        title='',
-                        xaxis_title='Major',
-                        yaxis_title='Number of Students',
-                        showlegend=False,
-                        height=400,
-                        margin=dict(t=0, b=0, l=0, r=0),
-                        plot_bgcolor='white'
+        if error is None:
+            if data['status'] == 'success' and 'distribution' in data:
+                distribution = data['distribution']
+                
+                # Create bar chart for major distribution
+                fig = go.Figure(data=[
+                    go.Bar(
+                        x=distribution.get('majors', []),
+                        y=distribution.get('counts', []),
+                        text=distribution.get('counts', []),
+                        textposition='auto',
                     )
-                    
-                    fig.update_xaxes(tickangle=45)
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning("No data available for major distribution")
+                ])
+                
+                fig.update_layout(
+                    title='',
+                    xaxis_title='Major',
+                    yaxis_title='Number of Students',
+                    showlegend=False,
+                    height=400,
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    plot_bgcolor='white'
+                )
+                
+                fig.update_xaxes(tickangle=45)
+                st.plotly_chart(fig, use_container_width=True)
             else:
-                st.error(f"Failed to fetch major distribution data: {response.text}")
+                st.warning("No data available for major distribution")
+        else:
+            st.error(f"Failed to fetch major distribution data: {error}")
     except Exception as e:
         st.error(f"Error loading major distribution: {str(e)}")
 
-with col2:
-    st.subheader("Student Matches Distribution")
+def render_matches_distribution(data, error):
     try:
-        with st.spinner('Loading matches distribution...'):
-            response = requests.get('http://web-api:4000/a/analytics/students/matches-distribution', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data['status'] == 'success' and 'distribution' in data:
-                    distribution = data['distribution']
-                    
-                    # Create bar chart for matches distribution
-                    fig = go.Figure(data=[
-                        go.Bar(
-                            x=distribution.get('categories', []),
-                            y=distribution.get('counts', []),
-                            text=distribution.get('counts', []),
-                            textposition='auto',
-                        )
-                    ])
-                    
-                    fig.update_layout(
-                        title='',
-                        xaxis_title='Number of Matches',
-                        yaxis_title='Number of Students',
-                        showlegend=False,
-                        height=400,
-                        margin=dict(t=0, b=0, l=0, r=0),
-                        plot_bgcolor='white'
+        if error is None:
+            if data['status'] == 'success' and 'distribution' in data:
+                distribution = data['distribution']
+                
+                # Create bar chart for matches distribution
+                fig = go.Figure(data=[
+                    go.Bar(
+                        x=distribution.get('categories', []),
+                        y=distribution.get('counts', []),
+                        text=distribution.get('counts', []),
+                        textposition='auto',
                     )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning("No data available for matches distribution")
+                ])
+                
+                fig.update_layout(
+                    title='',
+                    xaxis_title='Number of Matches',
+                    yaxis_title='Number of Students',
+                    showlegend=False,
+                    height=400,
+                    margin=dict(t=0, b=0, l=0, r=0),
+                    plot_bgcolor='white'
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
             else:
-                st.error(f"Failed to fetch matches distribution data: {response.text}")
+                st.warning("No data available for matches distribution")
+        else:
+            st.error(f"Failed to fetch matches distribution data: {error}")
     except Exception as e:
-        st.error(f"Error loading matches distribution: {str(e)}")
\ No newline at end of file
+        st.error(f"Error loading matches distribution: {str(e)}")
+
+# All four cards load in parallel and render as they arrive
+loader = PageLoader()
+
+# Top metrics row
+col1, col2 = st.columns(2)
+loader.add('active_groups', '/a/analytics/study-groups/active', render_active_groups, slot=col1,
+           loading_text='Fetching active groups data...')
+loader.add('retention', '/a/analytics/retention', render_retention, slot=col2,
+           loading_text='Fetching retention data...')
+
+# Create two columns for the charts
+col1, col2 = st.columns(2)
+col1.subheader("Student Distribution by Major")
+loader.add('major_distribution', '/a/analytics/students/major-distribution', render_major_distribution,
+           slot=col1, loading_text='Loading major distribution...')
+col2.subheader("Student Matches Distribution")
+loader.add('matches_distribution', '/a/analytics/students/matches-distribution', render_matches_distribution,
+           slot=col2, loading_text='Loading matches distribution...')
+
+loader.run()
@@ -2,9 +2,8 @@ import streamlit as st
 from modules.nav import setup_page
 import plotly.express as px
 import pandas as pd
-import requests
+from modules import api_client
 
-API_BASE_URL = "http://web-api:4000"
 
 def normalize_learning_style(style):
     """Normalize the learning style string to match our expected values."""
@@ -25,7 +24,7 @@ def normalize_learning_style(style):
 
 def get_user_learning_style(user_id):
     try:
-        response = requests.get(f"{API_BASE_URL}/users/{user_id}")
+        response = api_client.get(f"/users/{user_id}")
         if response.status_code == 200:
             user_data = response.json()
             return user_data.get('learning_style')
@@ -37,7 +36,7 @@ def get_user_learning_style(user_id):
 
 def get_learning_style_distribution(user_id):
     try:
-        response = requests.get(f"{API_BASE_URL}/learning-style/distribution/{user_id}")
+        response = api_client.get(f"/learning-style/distribution/{user_id}")
         if response.status_code == 200:
             data = response.json()
             return {
@@ -57,7 +56,7 @@ def get_learning_style_distribution(user_id):
 
 def get_learning_profile(user_id):
     try:
-        response = requests.get(f"{API_BASE_URL}/learning-style/profile/{user_id}")
+        response = api_client.get(f"/learning-style/profile/{user_id}")
         if response.status_code == 200:
             data = response.json()
             return {
@@ -72,7 +71,7 @@ def get_learning_profile(user_id):
 
 def get_study_techniques(learning_style):
     try:
-        response = requests.get(f"{API_BASE_URL}/learning-style/techniques/{learning_style}")
+        response = api_client.get(f"/learning-style/techniques/{learning_style}")
         if response.status_code == 200:
             data = response.json()
             return [item['technique_description'] for item in data]
@@ -84,7 +83,7 @@ def get_study_techniques(learning_style):
 
 def get_study_tools(learning_style):
     try:
-        response = requests.get(f"{API_BASE_URL}/learning-style/tools/{learning_style}")
+        response = api_client.get(f"/learning-style/tools/{learning_style}")
         if response.status_code == 200:
             return response.json()
         st.error(f"Error fetching study tools: {response.text}")
@@ -95,7 +94,7 @@ def get_study_tools(learning_style):
 
 def get_group_recommendations(learning_style):
     try:
-        response = requests.get(f"{API_BASE_URL}/learning-style/recommendations/{learning_style}")
+        response = api_client.get(f"/learning-style/recommendations/{learning_style}")
         if response.status_code == 200:
             data = response.json()
             return [item['recommendation_description'] for item in data]
@@ -241,8 +240,8 @@ with update_tab:
         # Submit button
         if st.form_submit_button("Update Preferences"):
             try:
-                response = requests.put(
-                    f"{API_BASE_URL}/user/{user_id}",
+                response = api_client.put(
+                    f"/user/{user_id}",
                     json={
                         "learning_style": new_learning_style.lower(),
                         "preferences": preferences
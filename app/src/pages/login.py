@@ -1,11 +1,12 @@
 # naman
 import streamlit as st
 import requests
+from modules import api_client
 from pathlib import Path
 from modules.nav import apply_basic_theme # Use simplified theme
 
 # Define the backend API endpoint URL
-API_LOGIN_URL = "http://web-api:4000/login"  # Changed to use Docker service name
+LOGIN_PATH = "/login"
 
 def login_form():
     """Displays the login form and handles login attempts via API."""
@@ -26,7 +27,7 @@ def login_form():
             # Try logging in via API
             try:
                 payload = {"email": email, "password": password}
-                response = requests.put(API_LOGIN_URL, json=payload)
+                response = api_client.put(LOGIN_PATH, json=payload)
                 
                 if response.status_code == 200:
                     user_data = response.json()
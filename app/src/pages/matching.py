@@ -1,11 +1,11 @@
 # naman
 import streamlit as st
 import requests # Import requests
+from modules import api_client
 from datetime import datetime # Keep for demo data?
 from modules.nav import setup_page
 
-# API_BASE_URL = "http://127.0.0.1:5000" # Adjust if backend runs elsewhere
-API_BASE_URL = "http://web-api:4000" # Use Docker service name
+PAGE_SIZE = 20 # Users shown per page in the Find Partners tab
 
 # Page Config
 st.set_page_config(
@@ -20,13 +20,20 @@ setup_page("Find Partners")
 
 
 
-def get_all_users_for_display():
-    """Fetches all users for display in the Find Partners tab."""
-    all_users_url = f"{API_BASE_URL}/users/all" # Use the new endpoint
+def get_all_users_for_display(page_cursor=None, major=None, learning_style=None):
+    """Fetches one page of users for display in the Find Partners tab."""
+    all_users_url = "/users/all" # Use the new endpoint
+    params = {"limit": PAGE_SIZE}
+    if page_cursor:
+        params["cursor"] = page_cursor
+    if major:
+        params["major"] = major
+    if learning_style:
+        params["learning_style"] = learning_style
     try:
-        response = requests.get(all_users_url)
+        response = api_client.get(all_users_url, params=params)
         response.raise_for_status()
-        return response.json(), None
+        return response.json(), None # {"users": [...], "next_cursor": ...}
     except requests.exceptions.RequestException as e:
         return None, str(e)
     except Exception as e:
@@ -38,10 +45,10 @@ def record_match(user1_id, user2_id):
     if not user1_id or not user2_id:
         return None, "Missing user IDs for matching."
 
-    match_url = f"{API_BASE_URL}/matches" # Use the new endpoint
+    match_url = "/matches" # Use the new endpoint
     payload = {"user1_id": user1_id, "user2_id": user2_id}
     try:
-        response = requests.post(match_url, json=payload)
+        response = api_client.post(match_url, json=payload)
         response.raise_for_status() # Check for 2xx status codes
         return response.json(), None
     except requests.exceptions.RequestException as e:
@@ -61,10 +68,10 @@ def record_match(user1_id, user2_id):
 def get_my_matches(user_id):
     if not user_id:
         return None, "User ID not provided."
-    # my_matches_url = f"{API_BASE_URL}/u/match/{user_id}/matches"
-    my_matches_url = f"{API_BASE_URL}/users/{user_id}/matches" # Updated URL
+    # my_matches_url = f"/u/match/{user_id}/matches"
+    my_matches_url = f"/users/{user_id}/matches" # Updated URL
     try:
-        response = requests.get(my_matches_url)
+        response = api_client.get(my_matches_url)
         if response.status_code == 200:
             return response.json(), None # Return list of matched users, no error
         else:
@@ -86,9 +93,9 @@ def delete_match(user1_id, user2_id):
     u1 = min(user1_id, user2_id)
     u2 = max(user1_id, user2_id)
     
-    delete_url = f"{API_BASE_URL}/matches/{u1}/{u2}"
+    delete_url = f"/matches/{u1}/{u2}"
     try:
-        response = requests.delete(delete_url)
+        response = api_client.delete(delete_url)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None # Return success message
     except requests.exceptions.RequestException as e:
@@ -111,17 +118,29 @@ find_tab, matches_tab, preferences_tab = st.tabs(["Find Partners", "My Matches",
 with find_tab:
     st.subheader("Available Study Partners")
     
-    # Removed Filters for now, as API returns all users
-    # We can add client-side filtering later if needed
-    
+    # --- Server-side filters ---
+    filter_cols = st.columns(2)
+    major_filter = filter_cols[0].text_input("Filter by Major", key="partner_major_filter")
+    style_filter = filter_cols[1].selectbox(
+        "Filter by Learning Style",
+        ["", "visual", "auditory", "reading_writing", "kinesthetic"],
+        key="partner_style_filter"
+    )
+
+    # The API pages with a cursor, so keep the cursors of the pages we came from to go back
+    filters = (major_filter, style_filter)
+    if st.session_state.get('partner_filters') != filters:
+        st.session_state.partner_filters = filters
+        st.session_state.partner_page_cursors = [None]
+    page_cursors = st.session_state.partner_page_cursors
+
     # --- Fetch and display users from API ---
     current_user_id = st.session_state.user.get('id') 
-    # potential_partners, error = get_potential_matches(current_user_id)
-    all_partners_list, error = get_all_users_for_display()
+    page, error = get_all_users_for_display(page_cursors[-1], major_filter, style_filter)
+    all_partners_list = page.get('users', []) if page else None
     
     if error:
         st.error(f"Could not load potential partners: {error}")
-    # elif potential_partners:
     elif all_partners_list is not None: # Check if fetch was successful (even if list is empty)
         st.write("#### Available Study Partners :-) ")
         if not all_partners_list:
@@ -156,6 +175,15 @@ with find_tab:
                 # --- End Connect Button Logic --- 
                 
                 st.divider()
+
+        # --- Pagination ---
+        prev_col, next_col = st.columns(2)
+        if prev_col.button("← Previous", disabled=len(page_cursors) == 1, key="partners_prev"):
+            page_cursors.pop()
+            st.rerun()
+        if next_col.button("Next →", disabled=not page.get('next_cursor'), key="partners_next"):
+            page_cursors.append(page['next_cursor'])
+            st.rerun()
             
     else: # Error case handled above, this handles case where API returns None unexpectedly
         st.error("An unexpected issue occurred while loading users.")
@@ -1,14 +1,14 @@
 # naman
 import streamlit as st
 import requests # Import requests library bruh this is why it was not working
+from modules import api_client
 from modules.nav import apply_basic_theme
 
-API_BASE_URL = "http://web-api:4000" # Use Docker service name
 
 # --- Helper function to call registration API ---
 def register_user_api(name, email, password, major=None, learning_style=None, availability=None):
     """Calls the backend API to register a new user."""
-    register_url = f"{API_BASE_URL}/login" # POST /login handles registration
+    register_url = "/login" # POST /login handles registration
     payload = {
         "name": name,
         "email": email,
@@ -18,7 +18,7 @@ def register_user_api(name, email, password, major=None, learning_style=None, av
         "availability": availability
     }
     try:
-        response = requests.post(register_url, json=payload)
+        response = api_client.post(register_url, json=payload)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None # Return success data
     except requests.exceptions.RequestException as e:
@@ -1,11 +1,10 @@
 # naman
 import streamlit as st
 import requests # Import requests
+from modules import api_client
 from datetime import datetime # Keep for demo data
 from modules.nav import setup_page
 
-# API_BASE_URL = "http://127.0.0.1:5000"  # Adjust as necessary
-API_BASE_URL = "http://web-api:4000" # Use Docker service name
 
 # Page Config
 st.set_page_config(
@@ -23,9 +22,9 @@ def get_user_study_groups(user_id):
     if not user_id:
         return None, "User ID not found."
     # Use the new endpoint GET /users/<user_id>/groups
-    groups_url = f"{API_BASE_URL}/users/{user_id}/groups"
+    groups_url = f"/users/{user_id}/groups"
     try:
-        response = requests.get(groups_url)
+        response = api_client.get(groups_url)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None
     except requests.exceptions.RequestException as e:
@@ -35,10 +34,10 @@ def get_user_study_groups(user_id):
 
 # --- Helper function to fetch all available study groups (GET request) ---
 def get_available_groups():
-    # groups_url = f"{API_BASE_URL}/u/groups/find"
-    groups_url = f"{API_BASE_URL}/groups/find" # Updated URL
+    # groups_url = "/u/groups/find"
+    groups_url = "/groups/find" # Updated URL
     try:
-        response = requests.get(groups_url)
+        response = api_client.get(groups_url)
         if response.status_code == 200:
             return response.json(), None # Return data, no error
         else:
@@ -51,11 +50,11 @@ def create_study_group(group_name, user_id):
     if not group_name:
         return None, "Group name cannot be empty."
         
-    # create_url = f"{API_BASE_URL}/u/groups/create"
-    create_url = f"{API_BASE_URL}/groups/create" # Updated URL
+    # create_url = "/u/groups/create"
+    create_url = "/groups/create" # Updated URL
     payload = {"group_name": group_name, "user_id": user_id}
     try:
-        response = requests.post(create_url, json=payload)
+        response = api_client.post(create_url, json=payload)
         if response.status_code == 201: # Check for 201 Created status
             return response.json(), None # Return data, no error
         else:
@@ -72,10 +71,10 @@ def join_study_group(group_id, user_id):
     if not group_id or not user_id:
         return None, "Missing group_id or user_id."
         
-    join_url = f"{API_BASE_URL}/groups/{group_id}/join"
+    join_url = f"/groups/{group_id}/join"
     payload = {"user_id": user_id}
     try:
-        response = requests.post(join_url, json=payload)
+        response = api_client.post(join_url, json=payload)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None # Return success/info message
     except requests.exceptions.RequestException as e:
@@ -95,9 +94,9 @@ def leave_study_group(group_id, user_id):
     if not group_id or not user_id:
         return None, "Missing group_id or user_id."
         
-    leave_url = f"{API_BASE_URL}/groups/{group_id}/members/{user_id}"
+    leave_url = f"/groups/{group_id}/members/{user_id}"
     try:
-        response = requests.delete(leave_url)
+        response = api_client.delete(leave_url)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         return response.json(), None # Return success message
     except requests.exceptions.RequestException as e:
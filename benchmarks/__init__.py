@@ -0,0 +1,4 @@
+#------------------------------------------------------------
+# Load-testing and benchmark suite for the REST API.
+# See benchmarks/README.md; run as `python -m benchmarks ...`.
+#------------------------------------------------------------
@@ -0,0 +1,113 @@
+"""
+Command line entry point (run from the repository root):
+
+    python -m benchmarks populate --users 100000 [--seed 1] [--chunk-rows 1000]
+    python -m benchmarks run [--scenario mixed] [--concurrency 16] [--duration 60] [--out FILE]
+    python -m benchmarks compare BASE.json NEW.json [--threshold 10]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from benchmarks import compare, driver, loader, workload
+from datagen.population import Population
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+DEFAULT_MANIFEST = os.path.join(RESULTS_DIR, 'population.json')
+
+
+def populate(args):
+    population = Population(args.users, seed=args.seed, sessions_per_user=args.sessions_per_user,
+                            matches_per_user=args.matches_per_user)
+    conn = loader.connect()
+    try:
+        started = time.monotonic()
+        counts = loader.load(conn, population, chunk_rows=args.chunk_rows)
+    finally:
+        conn.close()
+    manifest = dict(population.manifest(), row_counts=counts,
+                    loaded_in_seconds=round(time.monotonic() - started, 1))
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Loaded {sum(counts.values())} rows in {manifest['loaded_in_seconds']}s; manifest in {args.manifest}")
+    return 0
+
+
+def run(args):
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    results = driver.run(args.base_url, manifest, scenario=args.scenario, concurrency=args.concurrency,
+                         duration=args.duration, warmup=args.warmup, seed=args.seed, timeout=args.timeout)
+    out = args.out
+    if out is None:
+        commit = (results['meta']['git']['commit'] or 'nogit')[:10]
+        stamp = time.strftime('%Y%m%dT%H%M%S')
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{commit}-{args.scenario}-c{args.concurrency}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    total = results['total']
+    print(f"{total['requests']} requests, {total['errors']} errors, {total['throughput_rps']} req/s, "
+          f"p50 {total['latency_ms']['p50']} ms, p95 {total['latency_ms']['p95']} ms, "
+          f"p99 {total['latency_ms']['p99']} ms")
+    print(f"Results written to {out}")
+    return 0
+
+
+def compare_results(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows, regressions = compare.compare(base, new, threshold=args.threshold)
+    print(compare.format_table(rows))
+    if regressions:
+        print(f"Regressed by more than {args.threshold}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('populate', help='generate a population and load it into the benchmark database')
+    p.add_argument('--users', type=int, default=10000)
+    p.add_argument('--seed', type=int, default=1)
+    p.add_argument('--sessions-per-user', type=float, default=4)
+    p.add_argument('--matches-per-user', type=float, default=3)
+    p.add_argument('--chunk-rows', type=int, default=loader.DEFAULT_CHUNK_ROWS)
+    p.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    p.set_defaults(func=populate)
+
+    r = commands.add_parser('run', help='drive the API with a request mix')
+    r.add_argument('--base-url', default=os.getenv('BENCH_API_URL', 'http://localhost:4001'))
+    r.add_argument('--scenario', default='mixed', choices=sorted(workload.SCENARIOS))
+    r.add_argument('--concurrency', type=int, default=8)
+    r.add_argument('--duration', type=float, default=30)
+    r.add_argument('--warmup', type=float, default=5)
+    r.add_argument('--seed', type=int, default=1)
+    r.add_argument('--timeout', type=float, default=10)
+    r.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    r.add_argument('--out', help='results file (default: results/<time>-<commit>-<scenario>-c<N>.json)')
+    r.set_defaults(func=run)
+
+    c = commands.add_parser('compare', help='diff two results files')
+    c.add_argument('base')
+    c.add_argument('new')
+    c.add_argument('--threshold', type=float, default=10.0,
+                   help='percent change in throughput or p95 counted as a regression')
+    c.set_defaults(func=compare_results)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
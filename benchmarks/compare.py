@@ -0,0 +1,47 @@
+#------------------------------------------------------------
+# Diff two benchmark result files.
+#------------------------------------------------------------
+
+
+def _change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(base, new, threshold=10.0):
+    """
+    Return (rows, regressions). Each row is (operation, base rps, new rps, rps change %,
+    base p95, new p95, p95 change %). An operation regresses when its throughput drops,
+    or its p95 latency grows, by more than threshold percent.
+    """
+    rows, regressions = [], []
+    names = ['total'] + sorted(set(base['operations']) | set(new['operations']))
+    for name in names:
+        a = base['total'] if name == 'total' else base['operations'].get(name)
+        b = new['total'] if name == 'total' else new['operations'].get(name)
+        if a is None or b is None:
+            rows.append((name, a and a['throughput_rps'], b and b['throughput_rps'], None,
+                         a and a['latency_ms']['p95'], b and b['latency_ms']['p95'], None))
+            continue
+        rps_change = _change(a['throughput_rps'], b['throughput_rps'])
+        p95_change = _change(a['latency_ms']['p95'], b['latency_ms']['p95'])
+        rows.append((name, a['throughput_rps'], b['throughput_rps'], rps_change,
+                     a['latency_ms']['p95'], b['latency_ms']['p95'], p95_change))
+        if (rps_change is not None and rps_change < -threshold) or (p95_change is not None and p95_change > threshold):
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_table(rows):
+    def num(v):
+        return '-' if v is None else f'{v:.1f}'
+
+    def pct(v):
+        return '' if v is None else f'{v:+.1f}%'
+
+    lines = [f"{'operation':<32} {'rps':>10} {'-> rps':>10} {'':>8} {'p95 ms':>10} {'-> p95':>10} {'':>8}"]
+    for name, rps_a, rps_b, rps_c, p95_a, p95_b, p95_c in rows:
+        lines.append(f"{name:<32} {num(rps_a):>10} {num(rps_b):>10} {pct(rps_c):>8} "
+                     f"{num(p95_a):>10} {num(p95_b):>10} {pct(p95_c):>8}")
+    return '\n'.join(lines)
@@ -0,0 +1,145 @@
+#------------------------------------------------------------
+# Closed-loop load driver.
+#
+# `concurrency` worker threads each keep one request in flight, with
+# their own keep-alive session and Random(seed:worker) stream, for
+# `warmup` + `duration` seconds. Only requests that finish after the
+# warmup are counted. The result is a plain dict (see summarize) that
+# is written as JSON and compared across commits with `compare`.
+#------------------------------------------------------------
+import collections
+import datetime
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks import workload
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class _Recorder:
+
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)   # operation -> [seconds] of 2xx responses
+        self.statuses = collections.defaultdict(collections.Counter)
+        self.lock = threading.Lock()
+
+    def add(self, operation, status, seconds):
+        with self.lock:
+            self.statuses[operation][status] += 1
+            if isinstance(status, int) and 200 <= status < 300:
+                self.latencies[operation].append(seconds)
+
+
+def _worker(index, base_url, manifest, pick, seed, timeout, measure_from, stop_at, recorder, start):
+    rng = random.Random(f'{seed}:{index}')
+    session = requests.Session()
+    start.wait()
+    while True:
+        name, operation = pick(rng)
+        method, path, kwargs = operation(rng, manifest)
+        started = time.monotonic()
+        if started >= stop_at:
+            break
+        try:
+            status = session.request(method, base_url + path, timeout=timeout, **kwargs).status_code
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+        finished = time.monotonic()
+        if finished >= measure_from and finished < stop_at:
+            recorder.add(name, status, finished - started)
+    session.close()
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _latency_summary(latencies):
+    values = sorted(latencies)
+    summary = {f'p{p}': _percentile(values, p) for p in PERCENTILES}
+    summary['mean'] = sum(values) / len(values) if values else None
+    summary['max'] = values[-1] if values else None
+    return {k: (round(v * 1000, 3) if v is not None else None) for k, v in summary.items()}
+
+
+def _operation_summary(statuses, latencies, duration):
+    total = sum(statuses.values())
+    ok = len(latencies)
+    return {
+        'requests': total,
+        'ok': ok,
+        'errors': total - ok,
+        'throughput_rps': round(ok / duration, 3),
+        'statuses': {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+        'latency_ms': _latency_summary(latencies),
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {'commit': commit, 'dirty': dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def run(base_url, manifest, scenario='mixed', concurrency=8, duration=30, warmup=5, seed=1, timeout=10):
+    """Drive the API and return the summarized results."""
+    pick = workload.picker(scenario)
+    recorder = _Recorder()
+    start = threading.Event()
+    began = time.monotonic()
+    measure_from = began + warmup
+    stop_at = measure_from + duration
+    threads = [
+        threading.Thread(target=_worker, daemon=True,
+                         args=(i, base_url.rstrip('/'), manifest, pick, seed, timeout,
+                               measure_from, stop_at, recorder, start))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join(stop_at - time.monotonic() + timeout + 5)
+
+    operations = {
+        name: _operation_summary(recorder.statuses[name], recorder.latencies[name], duration)
+        for name in sorted(recorder.statuses)
+    }
+    all_statuses = collections.Counter()
+    for statuses in recorder.statuses.values():
+        all_statuses.update(statuses)
+    all_latencies = [v for values in recorder.latencies.values() for v in values]
+
+    return {
+        'meta': {
+            'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'base_url': base_url,
+            'scenario': scenario,
+            'concurrency': concurrency,
+            'duration_seconds': duration,
+            'warmup_seconds': warmup,
+            'seed': seed,
+            'population': manifest,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'total': _operation_summary(all_statuses, all_latencies, duration),
+        'operations': operations,
+    }
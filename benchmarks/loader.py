@@ -0,0 +1,119 @@
+#------------------------------------------------------------
+# Load a datagen Population straight into MySQL.
+#
+# Meant for the throwaway database of docker-compose-testing.yaml
+# (db-test, published on port 3201): `reset` empties every
+# user-related table first. Rows go in as chunked multi-row INSERTs,
+# committed per chunk, with foreign key and unique checks off for
+# the duration of the load. The triggers from the API's migrations
+# (match_edge, user_activity_counters) still fire, so derived tables
+# end up consistent. Generated tables the database doesn't have
+# (e.g. learning_style_distribution before migration 0005) are skipped.
+#------------------------------------------------------------
+import logging
+import os
+import time
+
+import pymysql
+from pymysql import cursors
+
+from datagen import population as pop
+
+DEFAULT_CHUNK_ROWS = 1000
+
+# Emptied by reset, children first; tables that don't exist are skipped
+RESET_TABLES = [
+    'match_edge', 'user_activity_counters', 'matched_with', 'matchhistory', 'study_session',
+    'group_student', 'user_resource', 'user_interests', 'compatibility', 'user_flags',
+    'learning_style_distribution', 'learning_style_profile', 'study_group', 'user', 'course',
+    'university', 'interests', 'analytics_snapshot',
+]
+
+_NO_SUCH_TABLE = 1146
+
+
+def connect(host=None, port=None, user=None, password=None, database=None):
+    """Connect with explicit settings, falling back to BENCH_DB_* environment variables."""
+    return pymysql.connect(
+        host=host or os.getenv('BENCH_DB_HOST', '127.0.0.1'),
+        port=int(port or os.getenv('BENCH_DB_PORT', '3201')),
+        user=user or os.getenv('BENCH_DB_USER', 'root'),
+        password=password if password is not None else os.getenv('BENCH_DB_PASSWORD', os.getenv('MYSQL_ROOT_PASSWORD', '')),
+        database=database or os.getenv('BENCH_DB_NAME', 'study_buddy_system'),
+        charset='utf8mb4',
+        cursorclass=cursors.DictCursor,
+        autocommit=False,
+    )
+
+
+def reset(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        try:
+            for table in RESET_TABLES:
+                try:
+                    cursor.execute(f"TRUNCATE TABLE `{table}`")
+                except pymysql.err.ProgrammingError as e:
+                    if e.args[0] != _NO_SUCH_TABLE:
+                        raise
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    conn.commit()
+
+
+def insert_chunks(conn, table, columns, rows, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """INSERT rows chunk_rows at a time as one multi-row statement per chunk; returns the row count."""
+    placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    prefix = f"INSERT INTO `{table}` ({', '.join(columns)}) VALUES "
+    total = 0
+    chunk = []
+    with conn.cursor() as cursor:
+        for row in rows:
+            chunk.extend(row)
+            if len(chunk) >= chunk_rows * len(columns):
+                count = len(chunk) // len(columns)
+                cursor.execute(prefix + ', '.join([placeholders] * count), chunk)
+                conn.commit()
+                total += count
+                chunk = []
+        if chunk:
+            count = len(chunk) // len(columns)
+            cursor.execute(prefix + ', '.join([placeholders] * count), chunk)
+            conn.commit()
+            total += count
+    return total
+
+
+def load(conn, population, chunk_rows=DEFAULT_CHUNK_ROWS, reset_first=True):
+    """Load every table of the population; returns {table: rows inserted}."""
+    if reset_first:
+        reset(conn)
+    counts = {}
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT table_name AS name FROM information_schema.tables WHERE table_schema = DATABASE()")
+        existing = {row['name'] for row in cursor.fetchall()}
+        cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 0, SESSION UNIQUE_CHECKS = 0")
+    try:
+        for table, columns in pop.TABLES:
+            if table not in existing:
+                logging.warning(f"{table}: not in the database, skipped")
+                continue
+            started = time.monotonic()
+            counts[table] = insert_chunks(conn, table, columns, pop.rows(population, table), chunk_rows)
+            logging.info(f"{table}: {counts[table]} rows in {time.monotonic() - started:.1f}s")
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 1, SESSION UNIQUE_CHECKS = 1")
+    bump_cache_versions(conn)
+    return counts
+
+
+def bump_cache_versions(conn):
+    """Make running API workers drop cached responses built from the old data."""
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("UPDATE cache_tag_version SET version = version + 1")
+        except pymysql.err.ProgrammingError as e:
+            if e.args[0] != _NO_SUCH_TABLE:
+                raise
+    conn.commit()
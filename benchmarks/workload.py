@@ -0,0 +1,87 @@
+#------------------------------------------------------------
+# Request mixes for the benchmark driver.
+#
+# An operation turns (rng, manifest) into one HTTP request against the
+# API; a scenario is a weighted list of operations. Ids and logins are
+# drawn from the population manifest written by `populate`, so every
+# request targets a row that exists.
+#------------------------------------------------------------
+
+
+def _userid(rng, manifest):
+    return manifest['first_userid'] + rng.randrange(manifest['users'])
+
+
+def login(rng, manifest):
+    userid = _userid(rng, manifest)
+    return 'PUT', '/login', {'json': {
+        'email': manifest['email_template'].format(id=userid),
+        'password': manifest['password_template'].format(id=userid),
+    }}
+
+
+def study_partners(rng, manifest):
+    # Course mode: candidates are the students with study sessions in the course
+    return 'POST', f'/users/{_userid(rng, manifest)}/study-partners', {'json': {
+        'course_id': 1 + rng.randrange(manifest['courses']),
+        'k': 10,
+    }}
+
+
+def study_partners_shared(rng, manifest):
+    # "shared_courses" mode: ranked by overlap of the students' course sets
+    return 'POST', f'/users/{_userid(rng, manifest)}/study-partners', {'json': {
+        'mode': 'shared_courses',
+        'k': 10,
+    }}
+
+
+def groups_find(rng, manifest):
+    return 'GET', '/groups/find', {}
+
+
+def _get(path):
+    def operation(rng, manifest):
+        return 'GET', path, {}
+    return operation
+
+
+OPERATIONS = {
+    'login': login,
+    'study_partners': study_partners,
+    'study_partners_shared': study_partners_shared,
+    'groups_find': groups_find,
+    'analytics_retention': _get('/a/analytics/retention'),
+    'analytics_academic': _get('/a/analytics/academic'),
+    'analytics_active_groups': _get('/a/analytics/study-groups/active'),
+    'analytics_success_rate': _get('/a/analytics/matching/success-rate'),
+    'analytics_matches_distribution': _get('/a/analytics/students/matches-distribution'),
+    'analytics_recent_matches': _get('/a/analytics/matching/recent-matches'),
+    'analytics_course_performance': _get('/a/analytics/academic/course-performance'),
+}
+
+ANALYTICS = [name for name in OPERATIONS if name.startswith('analytics_')]
+
+# scenario -> [(operation, weight)]
+SCENARIOS = {
+    # Students browsing plus an analyst dashboard open on the side
+    'mixed': [('login', 25), ('study_partners', 20), ('study_partners_shared', 10), ('groups_find', 25)]
+             + [(name, 20 / len(ANALYTICS)) for name in ANALYTICS],
+    'student': [('login', 35), ('study_partners', 25), ('study_partners_shared', 15), ('groups_find', 25)],
+    'analyst': [(name, 1) for name in ANALYTICS],
+}
+# Every operation can also be run on its own
+SCENARIOS.update({name: [(name, 1)] for name in OPERATIONS})
+
+
+def picker(scenario):
+    """Return pick(rng) -> (operation name, operation) for a scenario."""
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario {scenario!r}; choose from {', '.join(sorted(SCENARIOS))}")
+    names = [name for name, _ in SCENARIOS[scenario]]
+    weights = [weight for _, weight in SCENARIOS[scenario]]
+
+    def pick(rng):
+        name = rng.choices(names, weights=weights)[0]
+        return name, OPERATIONS[name]
+    return pick
@@ -183,6 +183,23 @@ create table group_student (
     foreign key (studentid) references user(userid) -- FK to user table
 );
 
+-- Pre-computed analytics payloads, refreshed in the background by
+-- api/backend/data_analyst/snapshots.py and read by the /a/analytics routes
+drop table if exists analytics_snapshot;
+create table analytics_snapshot (
+    metric_key varchar(64) primary key,
+    payload json not null,
+    computed_at timestamp not null default current_timestamp
+);
+
+-- Per-table version counters used to invalidate the API's response cache
+-- across worker processes (see api/backend/response_cache)
+drop table if exists cache_tag_version;
+create table cache_tag_version (
+    tag varchar(64) primary key,
+    version bigint not null default 0
+);
+
 -- data
 
 -- admin
@@ -0,0 +1,4 @@
+#------------------------------------------------------------
+# Synthetic data generator for the study_buddy_system schema.
+# See datagen/README.md; run as `python -m datagen ...`.
+#------------------------------------------------------------
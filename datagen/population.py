@@ -0,0 +1,254 @@
+#------------------------------------------------------------
+# Synthetic populations that follow the database-files schema
+# (01_study_buddy.sql, plus learning_style_distribution as used by
+# 02_sample_data.sql and the learning-style routes).
+#
+# A Population is fully determined by its size and seed: every table
+# draws from its own Random(seed:table) stream, so generating (or
+# re-generating) one table never changes the rows of another. Rows are
+# yielded lazily so a million-user population never sits in memory.
+#
+# Every table gets explicit ids starting at 1, so a population is
+# loaded into empty tables. Users log in as user<id>@bench.example.com
+# with password pw<id> (the API compares plain-text passwords).
+#------------------------------------------------------------
+import datetime
+import math
+import random
+from array import array
+
+MAJORS = [
+    ('Computer Science', 18), ('Data Science', 9), ('Business', 12), ('Biology', 10),
+    ('Mechanical Engineering', 7), ('Psychology', 8), ('Economics', 7), ('Mathematics', 5),
+    ('Physics', 4), ('Chemistry', 5), ('English', 4), ('Political Science', 5),
+    ('Nursing', 6),
+]
+LEARNING_STYLES = [('visual', 35), ('auditory', 20), ('reading_writing', 25), ('kinesthetic', 20)]
+AVAILABILITY = [
+    ('weekdays', 25), ('evenings', 20), ('weekends', 15), ('evenings and weekends', 15),
+    ('weekdays and weekends', 10), ('flexible', 15),
+]
+# (description, major it is most popular with)
+INTERESTS = [
+    ('Software Engineering', 'Computer Science'), ('Machine Learning', 'Computer Science'),
+    ('Web Development', 'Computer Science'), ('Algorithms', 'Computer Science'),
+    ('Statistics', 'Data Science'), ('Data Visualization', 'Data Science'), ('Databases', 'Data Science'),
+    ('Entrepreneurship', 'Business'), ('Marketing', 'Business'), ('Finance', 'Business'),
+    ('Genetics', 'Biology'), ('Ecology', 'Biology'), ('Neuroscience', 'Biology'),
+    ('Robotics', 'Mechanical Engineering'), ('CAD Design', 'Mechanical Engineering'),
+    ('Cognitive Psychology', 'Psychology'), ('Behavioral Research', 'Psychology'),
+    ('Game Theory', 'Economics'), ('Public Policy', 'Economics'),
+    ('Linear Algebra', 'Mathematics'), ('Number Theory', 'Mathematics'),
+    ('Astrophysics', 'Physics'), ('Quantum Mechanics', 'Physics'),
+    ('Organic Chemistry', 'Chemistry'), ('Biochemistry', 'Chemistry'),
+    ('Creative Writing', 'English'), ('Literature', 'English'),
+    ('International Relations', 'Political Science'), ('Law', 'Political Science'),
+    ('Public Health', 'Nursing'), ('Clinical Practice', 'Nursing'),
+]
+STUDY_TYPES = [('group study', 40), ('peer tutoring', 25), ('project collaboration', 20), ('exam review', 15)]
+UNIVERSITIES = ['northeastern university', 'harvard university', 'stanford university', 'mit', 'boston university']
+FIRST_NAMES = ['alex', 'jordan', 'sam', 'taylor', 'morgan', 'casey', 'riley', 'jamie', 'avery', 'quinn',
+               'emily', 'noah', 'olivia', 'liam', 'ava', 'mia', 'lucas', 'sofia', 'ethan', 'priya',
+               'wei', 'fatima', 'diego', 'yuki', 'omar', 'lena', 'kofi', 'ana', 'ivan', 'mei']
+LAST_NAMES = ['smith', 'chen', 'garcia', 'patel', 'nguyen', 'kim', 'johnson', 'williams', 'brown', 'lee',
+              'martinez', 'davis', 'lopez', 'wilson', 'anderson', 'thomas', 'moore', 'jackson', 'white', 'khan']
+
+EMAIL_TEMPLATE = 'user{id}@bench.example.com'
+PASSWORD_TEMPLATE = 'pw{id}'
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _poisson(rng, mean):
+    # Knuth's method is fine for the small means used here
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+class Population:
+    """
+    Row generators for one synthetic population.
+
+    users              number of students (ids 1..users)
+    courses            defaults to one course per 200 students (at least 40)
+    courses_per_user   how many courses each student is "enrolled" in; the schema has
+                       no enrollment table, so enrollment shows up as study sessions
+    sessions_per_user  mean study sessions per student (Poisson)
+    matches_per_user   mean matches each student starts with peers of the same major
+    group_size         mean study-group size; there is one group per 20 students
+    interests_per_user mean interests per student, mostly ones popular with their major
+    days               sessions and matches are spread over the last `days` days
+    """
+
+    def __init__(self, users, seed=1, courses=None, courses_per_user=4, sessions_per_user=4,
+                 matches_per_user=3, group_size=6, interests_per_user=3, days=180, today=None):
+        self.users = users
+        self.seed = seed
+        self.courses = courses or max(40, users // 200)
+        self.courses_per_user = min(courses_per_user, self.courses)
+        self.sessions_per_user = sessions_per_user
+        self.matches_per_user = matches_per_user
+        self.group_size = group_size
+        self.groups = max(1, users // 20)
+        self.days = days
+        self.today = today or datetime.date.today()
+        self.interests_per_user = interests_per_user
+
+        # Majors drive matches and group membership, so they're drawn once up front
+        rng = self._rng('majors')
+        majors = [m for m, _ in MAJORS]
+        self._major_index = array('b', (majors.index(_weighted(rng, MAJORS)) for _ in range(users)))
+        self._by_major = [array('i') for _ in majors]
+        for i, major in enumerate(self._major_index):
+            self._by_major[major].append(i + 1)
+
+    def _rng(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def _recent_date(self, rng):
+        # Skewed toward recent days, like real activity
+        return self.today - datetime.timedelta(days=int(self.days * rng.random() ** 2))
+
+    def manifest(self):
+        """Parameters a workload needs to pick valid ids and logins."""
+        return {
+            'seed': self.seed,
+            'users': self.users,
+            'courses': self.courses,
+            'groups': self.groups,
+            'first_userid': 1,
+            'email_template': EMAIL_TEMPLATE,
+            'password_template': PASSWORD_TEMPLATE,
+        }
+
+    def major_of(self, userid):
+        return MAJORS[self._major_index[userid - 1]][0]
+
+    # --- one generator per table, in load order ---
+
+    def university(self):
+        for i, name in enumerate(UNIVERSITIES, start=1):
+            yield (i, name, 100 + i)
+
+    def course(self):
+        rng = self._rng('course')
+        for courseid in range(1, self.courses + 1):
+            department = _weighted(rng, MAJORS)
+            yield (courseid, rng.randint(1, len(UNIVERSITIES)), department.lower(),
+                   f'{department.lower()} {rng.randint(1000, 4999)}')
+
+    def user(self):
+        rng = self._rng('user')
+        for userid in range(1, self.users + 1):
+            yield (userid,
+                   f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                   EMAIL_TEMPLATE.format(id=userid),
+                   PASSWORD_TEMPLATE.format(id=userid),
+                   self.major_of(userid),
+                   _weighted(rng, LEARNING_STYLES),
+                   _weighted(rng, AVAILABILITY))
+
+    def study_group(self):
+        for groupid in range(1, self.groups + 1):
+            yield (groupid, f'Study Group {groupid}')
+
+    def group_student(self):
+        rng = self._rng('group_student')
+        pools = [pool for pool in self._by_major if pool]
+        for groupid in range(1, self.groups + 1):
+            pool = rng.choice(pools)
+            size = max(2, _poisson(rng, self.group_size))
+            for studentid in {pool[rng.randrange(len(pool))] for _ in range(size)}:
+                yield (groupid, studentid)
+
+    def matched_with(self):
+        rng = self._rng('matched_with')
+        for pool in self._by_major:
+            for pos, userid in enumerate(pool):
+                later = len(pool) - pos - 1
+                if later <= 0:
+                    continue
+                # Each pair is produced from its lower id only, so no pair repeats across users
+                peers = {pool[pos + 1 + rng.randrange(later)] for _ in range(_poisson(rng, self.matches_per_user))}
+                for peer in sorted(peers):
+                    yield (userid, peer, datetime.datetime.combine(self._recent_date(rng), datetime.time(12)))
+
+    def matchhistory(self):
+        # One scored suggestion per accepted match (scored high), plus a few
+        # suggestions each student passed on (scored lower)
+        rng = self._rng('matchhistory')
+        matchid = 0
+        for user1_id, _, match_date in self.matched_with():
+            matchid += 1
+            yield (matchid, user1_id, round(min(99.99, rng.gauss(82, 8)), 2), match_date.date())
+        for userid in range(1, self.users + 1):
+            for _ in range(_poisson(rng, 1)):
+                matchid += 1
+                yield (matchid, userid, round(max(5.0, rng.gauss(55, 15)), 2), self._recent_date(rng))
+
+    def interests(self):
+        for interestid, (description, _) in enumerate(INTERESTS, start=1):
+            yield (interestid, description)
+
+    def user_interests(self):
+        rng = self._rng('user_interests')
+        by_major = {}
+        for interestid, (_, major) in enumerate(INTERESTS, start=1):
+            by_major.setdefault(major, []).append(interestid)
+        for userid in range(1, self.users + 1):
+            own = by_major.get(self.major_of(userid), [])
+            picked = set()
+            for _ in range(max(1, _poisson(rng, self.interests_per_user))):
+                if own and rng.random() < 0.7:
+                    picked.add(rng.choice(own))
+                else:
+                    picked.add(1 + rng.randrange(len(INTERESTS)))
+            for interestid in sorted(picked):
+                yield (userid, interestid)
+
+    def learning_style_distribution(self):
+        # Percentages sum to 100 and the user's stated learning_style dominates
+        styles = [style for style, _ in LEARNING_STYLES]
+        rng = self._rng('learning_style_distribution')
+        for userid, row in enumerate(self.user(), start=1):
+            weights = [rng.gammavariate(2, 1) for _ in styles]
+            weights[styles.index(row[5])] += rng.gammavariate(6, 1)
+            total = sum(weights)
+            shares = [round(w / total * 100, 2) for w in weights]
+            shares[styles.index(row[5])] = round(100 - sum(shares) + shares[styles.index(row[5])], 2)
+            yield (userid, *shares)
+
+    def study_session(self):
+        rng = self._rng('study_session')
+        for userid in range(1, self.users + 1):
+            enrolled = rng.sample(range(1, self.courses + 1), self.courses_per_user)
+            for _ in range(_poisson(rng, self.sessions_per_user)):
+                yield (rng.choice(enrolled), userid, _weighted(rng, STUDY_TYPES), self._recent_date(rng))
+
+
+# (table, columns) in load order, respecting foreign keys; rows come from Population.<table>()
+TABLES = [
+    ('university', ('universityid', 'name', 'coursecatalogid')),
+    ('course', ('courseid', 'universityid', 'department', 'course_name')),
+    ('user', ('userid', 'name', 'email', 'password', 'major', 'learning_style', 'availability')),
+    ('study_group', ('groupid', 'group_name')),
+    ('group_student', ('groupid', 'studentid')),
+    ('matched_with', ('user1_id', 'user2_id', 'match_date')),
+    ('study_session', ('course_id', 'matched_student_id', 'study_type', 'session_date')),
+    ('matchhistory', ('matchid', 'userid', 'matchscore', 'matchdate')),
+    ('interests', ('interestid', 'description')),
+    ('user_interests', ('userid', 'interestid')),
+    ('learning_style_distribution', ('userid', 'visual_percentage', 'auditory_percentage',
+                                     'reading_writing_percentage', 'kinesthetic_percentage')),
+]
+
+
+def rows(population, table):
+    return getattr(population, table)()
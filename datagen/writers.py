@@ -0,0 +1,125 @@
+#------------------------------------------------------------
+# Output formats for a generated population.
+#
+# sql        one script of chunked multi-row INSERTs, committed per
+#            chunk, with foreign key / unique checks off while it runs.
+#            Pipe it into the mysql client.
+# load-data  one tab-separated file per table plus load.sql, a script
+#            of LOAD DATA LOCAL INFILE statements. This is the fastest
+#            way in, but needs local_infile enabled on both ends.
+#
+# Both can start by emptying the tables they write (reset), including
+# match_edge and user_activity_counters, which the migration triggers
+# otherwise fill from the generated rows.
+#------------------------------------------------------------
+import datetime
+import decimal
+import os
+
+from datagen import population as pop
+
+DEFAULT_CHUNK_ROWS = 1000
+
+# Maintained by triggers from the generated tables (see api/backend/migrations)
+DERIVED_TABLES = ['match_edge', 'user_activity_counters']
+
+_SQL_ESCAPES = str.maketrans({'\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': '\\r', '\0': '\\0', '\x1a': '\\Z'})
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def sql_literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return f"'{value.isoformat(sep=' ')}'"
+    if isinstance(value, datetime.date):
+        return f"'{value.isoformat()}'"
+    return "'" + str(value).translate(_SQL_ESCAPES) + "'"
+
+
+def tsv_field(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def _truncate_if_exists(table):
+    # A prepared statement lets the script skip tables that haven't been created yet
+    return (f"SET @stmt = (SELECT IF(COUNT(*) > 0, 'TRUNCATE TABLE `{table}`', 'DO 0') "
+            f"FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = '{table}');\n"
+            "PREPARE stmt FROM @stmt;\nEXECUTE stmt;\nDEALLOCATE PREPARE stmt;\n")
+
+
+def _preamble(tables, reset):
+    lines = ["SET FOREIGN_KEY_CHECKS = 0;\n", "SET UNIQUE_CHECKS = 0;\n"]
+    if reset:
+        for table in DERIVED_TABLES + [table for table, _ in reversed(tables)]:
+            lines.append(_truncate_if_exists(table))
+    return lines
+
+
+_POSTAMBLE = ["SET UNIQUE_CHECKS = 1;\n", "SET FOREIGN_KEY_CHECKS = 1;\n"]
+
+
+def select_tables(names=None):
+    """The (table, columns) entries of pop.TABLES to write, in load order."""
+    if not names:
+        return list(pop.TABLES)
+    known = {table for table, _ in pop.TABLES}
+    unknown = set(names) - known
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+    return [(table, columns) for table, columns in pop.TABLES if table in names]
+
+
+def write_sql(population, out, tables=None, chunk_rows=DEFAULT_CHUNK_ROWS, reset=False):
+    """Write a SQL script to the text stream `out`; returns {table: rows}."""
+    tables = select_tables(tables)
+    out.writelines(_preamble(tables, reset))
+    out.write("SET autocommit = 0;\n")
+    counts = {}
+    for table, columns in tables:
+        prefix = f"INSERT INTO `{table}` ({', '.join(columns)}) VALUES\n"
+        count, chunk = 0, []
+        for row in pop.rows(population, table):
+            chunk.append('(' + ','.join(map(sql_literal, row)) + ')')
+            if len(chunk) >= chunk_rows:
+                out.write(prefix + ',\n'.join(chunk) + ";\nCOMMIT;\n")
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            out.write(prefix + ',\n'.join(chunk) + ";\nCOMMIT;\n")
+            count += len(chunk)
+        counts[table] = count
+    out.write("SET autocommit = 1;\n")
+    out.writelines(_POSTAMBLE)
+    return counts
+
+
+def write_load_data(population, directory, tables=None, reset=False):
+    """Write <table>.tsv files and load.sql into directory; returns {table: rows}."""
+    tables = select_tables(tables)
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    with open(os.path.join(directory, 'load.sql'), 'w', encoding='utf-8') as script:
+        script.writelines(_preamble(tables, reset))
+        for table, columns in tables:
+            filename = f'{table}.tsv'
+            count = 0
+            with open(os.path.join(directory, filename), 'w', encoding='utf-8', newline='\n') as f:
+                for row in pop.rows(population, table):
+                    f.write('\t'.join(map(tsv_field, row)) + '\n')
+                    count += 1
+            counts[table] = count
+            script.write(f"LOAD DATA LOCAL INFILE '{filename}' INTO TABLE `{table}` "
+                         f"CHARACTER SET utf8mb4 ({', '.join(columns)});\n")
+        script.writelines(_POSTAMBLE)
+    return counts